@@ -0,0 +1,202 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from constants.constants import BATCH_JOBS_PER_WORKER
+from contextlib import redirect_stdout
+from exceptions.exceptions import JobTimeoutError
+from models.game import Game, Solver
+from models.search_metrics import SearchMetrics
+from models.solution_cache import SolutionCache
+from strategies.strategies import STRATEGIES
+from typing import Dict, Iterable, Iterator, List
+import io
+import os
+import resource
+import signal
+import time
+
+SOLVED = 'solved'
+NO_SOLUTION_FOUND = 'no_solution'
+TIMEOUT = 'timeout'
+OUT_OF_MEMORY = 'out_of_memory'
+FAILED = 'failed'
+
+
+class BatchJob:
+    """
+    A game to solve with a strategy, given by name so that jobs can be sent to worker processes
+    """
+
+    def __init__(self, game: Game, strategy_name: str, options: Dict = None):
+        self.game = game
+        self.strategy_name = strategy_name
+        self.options = options if options is not None else {}
+
+
+class BatchResult:
+    """
+    Outcome of a BatchJob, the output files themselves are written by the worker
+    The SearchMetrics are only there for the jobs that ended.
+    """
+
+    def __init__(self, game_id, strategy_name: str, status: str, solution_length: int = -1,
+                 elapsed: float = 0.0, error: str = None, from_cache: bool = False, metrics: SearchMetrics = None):
+        self.game_id = game_id
+        self.strategy_name = strategy_name
+        self.status = status
+        self.solution_length = solution_length
+        self.elapsed = elapsed
+        self.error = error
+        self.from_cache = from_cache
+        self.metrics = metrics
+
+    def __str__(self):
+        return '{}\t{}\t{}\t{}\t{:.4f}'.format(self.game_id, self.strategy_name, self.status,
+                                                self.solution_length, self.elapsed)
+
+
+def _raise_timeout(signum, frame):
+    raise JobTimeoutError()
+
+
+def run_job(job: BatchJob, timeout: float = None, memory_limit: int = None, quiet: bool = True,
+            cache: bool = False, metrics_path: str = None) -> BatchResult:
+    """
+    Solves a single job, in the calling process
+    The timeout is enforced with SIGALRM and the memory cap by lowering the soft address space
+    limit of the process for the duration of the job, both are restored afterwards
+    :param job:
+    :param timeout: wall-clock seconds, None for no timeout
+    :param memory_limit: bytes of address space, None for no cap
+    :param quiet: drop what the strategy prints to console
+    :param cache: go through the SolutionCache of the process
+    :param metrics_path: JSON-lines file the SearchMetrics of the job are appended to
+    :return:
+    """
+    previous_handler = None
+    previous_memory_limit = None
+    strategy = None
+    start = time.perf_counter()
+
+    try:
+        if timeout is not None:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        if memory_limit is not None:
+            previous_memory_limit = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, previous_memory_limit[1]))
+
+        strategy = STRATEGIES[job.strategy_name](job.game, **job.options)
+        solver = Solver(strategy, SolutionCache.get_default() if cache else None, metrics_path)
+        if quiet:
+            with redirect_stdout(io.StringIO()):
+                metrics = solver.solve(job.game.get_game_board())
+        else:
+            metrics = solver.solve(job.game.get_game_board())
+
+        solution = strategy.get_solution()
+        return BatchResult(job.game.game_id, job.strategy_name,
+                           SOLVED if len(solution) != 0 else NO_SOLUTION_FOUND,
+                           len(solution) - 1, time.perf_counter() - start, from_cache=solver.from_cache,
+                           metrics=metrics)
+
+    except JobTimeoutError:
+        status, error = TIMEOUT, None
+    except MemoryError:
+        status, error = OUT_OF_MEMORY, None
+    except Exception as exception:
+        status, error = FAILED, repr(exception)
+
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+        if previous_memory_limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, previous_memory_limit)
+
+    # the search file of a job that did not end is not kept
+    if strategy is not None:
+        strategy.trace.discard()
+    return BatchResult(job.game.game_id, job.strategy_name, status, elapsed=time.perf_counter() - start, error=error)
+
+
+class BatchRunner:
+    """
+    Spreads (game, strategy) jobs across a pool of worker processes
+    Every worker writes the usual solution and search files of its jobs, results are returned
+    in input order: games first, then strategies in the given order.
+    Games are consumed as jobs are submitted, at most BATCH_JOBS_PER_WORKER jobs per worker
+    being in flight, so a streamed input is never held in memory as a whole.
+    A worker killed by the system, e.g. by the OOM killer, breaks the whole pool: the jobs in
+    flight in it are reported as FAILED and the batch goes on in a fresh pool.
+    """
+
+    def __init__(self, strategy_names: List[str], workers: int = None, timeout: float = None,
+                 memory_limit: int = None, options: Dict[str, Dict] = None, cache: bool = False,
+                 metrics_path: str = None):
+        """
+        :param strategy_names: names of the strategies to run on every game
+        :param workers: number of worker processes, defaults to the number of cores
+        :param timeout: wall-clock seconds per job
+        :param memory_limit: bytes of address space per job
+        :param options: constructor options of each strategy, by name
+        :param cache: reuse the solutions of the SolutionCache, which the workers share through its file
+        :param metrics_path: JSON-lines file the workers append the SearchMetrics of every job to
+        """
+        self.strategy_names = strategy_names
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.options = options if options is not None else {}
+        self.cache = cache
+        self.metrics_path = metrics_path
+
+    def _build_jobs(self, games: Iterable[Game]) -> Iterator[BatchJob]:
+        return (BatchJob(game, strategy_name, self.options.get(strategy_name))
+                for game in games for strategy_name in self.strategy_names)
+
+    def run(self, games: Iterable[Game]) -> Iterator[BatchResult]:
+        """
+        :param games: iterable of games, consumed as the jobs are submitted
+        :return: generator of the results, in input order
+        """
+        max_in_flight = (self.workers if self.workers is not None else os.cpu_count() or 1) * BATCH_JOBS_PER_WORKER
+        # (job, future, pool it was submitted to)
+        in_flight = deque()
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        def renew(broken: ProcessPoolExecutor):
+            nonlocal executor
+            # the jobs still in flight in the broken pool are reported as they are polled
+            if broken is executor:
+                executor.shutdown()
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        def submit(job: BatchJob):
+            try:
+                future = executor.submit(run_job, job, self.timeout, self.memory_limit, True, self.cache,
+                                         self.metrics_path)
+            except BrokenProcessPool:
+                renew(executor)
+                future = executor.submit(run_job, job, self.timeout, self.memory_limit, True, self.cache,
+                                         self.metrics_path)
+            in_flight.append((job, future, executor))
+
+        def poll() -> BatchResult:
+            job, future, job_executor = in_flight.popleft()
+            try:
+                return future.result()
+            except BrokenProcessPool as exception:
+                renew(job_executor)
+                return BatchResult(job.game.game_id, job.strategy_name, FAILED, error=repr(exception))
+
+        try:
+            for job in self._build_jobs(games):
+                submit(job)
+                if len(in_flight) >= max_in_flight:
+                    yield poll()
+
+            while len(in_flight) != 0:
+                yield poll()
+        finally:
+            executor.shutdown()
@@ -0,0 +1,135 @@
+"""
+Measures the cost and the benefit of every registered heuristic
+
+For every size with a distance table, and every heuristic of the registry:
+    - evaluation cost, in microseconds per board
+    - admissibility violations, boards whose h(n) exceeds their exact distance, and the worst excess
+    - informedness, mean h(n) / distance over the solvable boards
+    - node expansions and solution lengths of A* on random solvable boards
+
+Boards of the 3x3 and 4x4 sizes are all enumerated, 5x5 boards are sampled.
+
+Usage, from the root of the project:
+    python -m benchmarks.heuristic_benchmark [n_games] [seed]
+"""
+
+from contextlib import redirect_stdout
+from constants.constants import DISTANCE_TABLE_SIZES, TRACE_NONE
+from models.distance_table import DistanceTable
+from models.game import BitBoard, Game
+from strategies.heuristics import HEURISTICS
+from strategies.strategies import AStarSearchStrategy
+from typing import List
+import io
+import random
+import sys
+import time
+
+# largest number of boards evaluated per size, the smaller sizes are enumerated
+MAX_SAMPLED_BOARDS = 1 << 16
+# search length allowed to A* on the random boards
+MAX_LENGTH = 20000
+GAME_ID = 'heuristic_benchmark'
+
+
+def sample_boards(size: int, rng: random.Random) -> List[int]:
+    """
+    Solvable boards of the given size, all of them if there are at most MAX_SAMPLED_BOARDS
+    :param size:
+    :param rng:
+    :return: packed states
+    """
+    distance_table = DistanceTable.get(size)
+    n_boards = 1 << size * size
+
+    if n_boards <= MAX_SAMPLED_BOARDS:
+        return [state for state in range(n_boards) if distance_table.distance(state) is not None]
+
+    boards = []
+    while len(boards) < MAX_SAMPLED_BOARDS:
+        state = rng.getrandbits(size * size)
+        if distance_table.distance(state) is not None:
+            boards.append(state)
+    return boards
+
+
+def random_game(size: int, n_touches: int, rng: random.Random) -> Game:
+    """
+    Solvable game made by touching random tokens of the final state
+    All the games share the id GAME_ID, so that their solution files overwrite each other
+    :param size:
+    :param n_touches:
+    :param rng:
+    :return:
+    """
+    toggle_masks = BitBoard.get_toggle_masks(size)
+    state = 0
+    for _ in range(n_touches):
+        state ^= toggle_masks[rng.randrange(size * size)]
+    return Game(size, n_touches + 1, MAX_LENGTH, BitBoard.unpack(state, size), GAME_ID)
+
+
+def benchmark_evaluations(size: int, boards: List[int]):
+    """
+    Evaluation cost, admissibility and informedness of every heuristic on the given boards
+    :param size:
+    :param boards:
+    :return:
+    """
+    distance_table = DistanceTable.get(size)
+    distances = [distance_table.distance(state) for state in boards]
+
+    for heuristic_name, heuristic_class in sorted(HEURISTICS.items()):
+        heuristic = heuristic_class(size)
+        start = time.perf_counter()
+        h_values = [heuristic.evaluate(state) for state in boards]
+        end = time.perf_counter()
+
+        excesses = [h_of_n - distance for h_of_n, distance in zip(h_values, distances) if h_of_n > distance]
+        ratios = [h_of_n / distance for h_of_n, distance in zip(h_values, distances) if distance != 0]
+        print("{}x{} {:<14} {:>8.2f} us/board  violations {:>6}/{:<6} worst excess {:>2}  "
+              "h/distance {:.3f}{}".format(size, size, heuristic_name, (end - start) / len(boards) * 1e6,
+                                           len(excesses), len(boards), max(excesses, default=0),
+                                           sum(ratios) / len(ratios),
+                                           '' if heuristic.admissible else '  (not flagged admissible)'))
+
+
+def benchmark_searches(size: int, n_games: int, rng: random.Random):
+    """
+    Node expansions and solution lengths of A* with every heuristic, on the same random games
+    :param size:
+    :param n_games:
+    :param rng:
+    :return:
+    """
+    distance_table = DistanceTable.get(size)
+    games = [random_game(size, rng.randint(1, size * size // 2), rng) for _ in range(n_games)]
+
+    for heuristic_name in sorted(HEURISTICS):
+        expansions = 0
+        solved = 0
+        optimal = 0
+        start = time.perf_counter()
+        for game in games:
+            strategy = AStarSearchStrategy(game, heuristic=heuristic_name, trace=TRACE_NONE)
+            with redirect_stdout(io.StringIO()):
+                strategy.execute(game.get_game_board())
+            expansions += len(strategy.trace)
+            solution = strategy.get_solution()
+            if len(solution) != 0:
+                solved += 1
+                if len(solution) - 1 == distance_table.distance(BitBoard.from_board(game.get_game_board())):
+                    optimal += 1
+        end = time.perf_counter()
+        print("{}x{} {:<14} A* solved {:>3}/{:<3} optimal {:>3}  {:>9.1f} nodes/game  {:.4f} seconds/game".format(
+            size, size, heuristic_name, solved, n_games, optimal, expansions / n_games, (end - start) / n_games))
+
+
+if __name__ == "__main__":
+    _n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    _rng = random.Random(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+
+    for _size in DISTANCE_TABLE_SIZES:
+        benchmark_evaluations(_size, sample_boards(_size, _rng))
+    for _size in DISTANCE_TABLE_SIZES:
+        benchmark_searches(_size, _n_games, _rng)
@@ -0,0 +1,76 @@
+"""
+Compares the open list backends of the heuristic searches
+
+Usage, from the root of the project:
+    python -m benchmarks.open_list_benchmark [input_file] [repeat]
+"""
+
+from contextlib import redirect_stdout
+from constants.constants import MAPPED_QUEUE, BUCKET_QUEUE
+from game_loader import GameLoader
+from libraries.bucket_queue import BucketQueue
+from libraries.mapped_queue import MappedQueue
+from models.game import OpenListSnapshot
+from strategies.strategies import BestFirstSearchStrategy, AStarSearchStrategy
+import io
+import random
+import sys
+import time
+
+OPEN_LIST_TYPES = [MAPPED_QUEUE, BUCKET_QUEUE]
+
+
+def benchmark_queue_operations(n_elements: int = 100000, max_priority: int = 100, seed: int = 0):
+    """
+    Times pushes, decrease-keys and pops of the same synthetic open list snapshots
+    :param n_elements:
+    :param max_priority:
+    :param seed:
+    :return:
+    """
+    rng = random.Random(seed)
+    snapshots = [OpenListSnapshot(state, state, rng.randrange(max_priority)) for state in range(n_elements)]
+    decreased = [OpenListSnapshot(snapshot.board_state, snapshot.node, snapshot.priority // 2)
+                 for snapshot in snapshots[::10]]
+
+    for queue_class in [MappedQueue, BucketQueue]:
+        queue = queue_class()
+        start = time.perf_counter()
+        for snapshot in snapshots:
+            queue.push(snapshot)
+        for snapshot in decreased:
+            queue.remove(snapshot)
+            queue.push(snapshot)
+        while len(queue) != 0:
+            queue.pop()
+        end = time.perf_counter()
+        print("{:<12} {} elements: {:.3f} seconds".format(queue_class.__name__, n_elements, end - start))
+
+
+def benchmark_strategies(input_file_path: str, repeat: int):
+    """
+    Times BeFS and A* on every game of the input file with both open list backends
+    :param input_file_path:
+    :param repeat:
+    :return:
+    """
+    games = GameLoader(input_file_path).get_games()
+
+    for game in games:
+        for strategy_class in [BestFirstSearchStrategy, AStarSearchStrategy]:
+            for open_list_type in OPEN_LIST_TYPES:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    strategy = strategy_class(game, open_list_type)
+                    with redirect_stdout(io.StringIO()):
+                        strategy.execute(game.get_game_board())
+                end = time.perf_counter()
+                print("game {} {:<6} {:<7} search length {:<6} {:.4f} seconds/run".format(
+                    game.game_id, strategy.name, open_list_type,
+                    len(strategy.trace), (end - start) / repeat))
+
+
+if __name__ == "__main__":
+    benchmark_queue_operations()
+    benchmark_strategies(sys.argv[1] if len(sys.argv) > 1 else "input/sample_input",
+                         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
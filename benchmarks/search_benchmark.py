@@ -0,0 +1,269 @@
+"""
+Reproducible benchmark of the strategies, on random solvable games, against a stored baseline
+
+For every case of the suite, a board size and a solution depth, games are generated from the
+seed by touching depth distinct tokens of the final state, and kept once their shortest
+solution takes exactly depth touches. Every strategy solves the games of a case under Solver,
+in a fresh process so that the peak RSS is its own, with a timeout per game: once a game timed
+out, the next games of the case are left unsolved. The (strategy, size) of SUITE_SKIPPED are
+left out. Recorded per (strategy, case):
+    - games solved within the timeout
+    - nodes expanded per second, over the solved games
+    - mean time to solution and mean solution length, over the solved games
+    - peak RSS, in MB
+
+Results are compared to a baseline file, holding the results of an earlier run of the same
+suite and seed, and the regression thresholds: a case regresses when fewer games are solved,
+when the solutions get longer, or when the expansions, the time, the node throughput or the
+memory get worse by more than their threshold. Times below MIN_TIMED_SECONDS are not compared.
+Timings only compare on the same machine, the baseline is updated with --update-baseline.
+
+Usage, from the root of the project:
+    python -m benchmarks.search_benchmark [--games 5] [--seed 0] [--timeout 10] [--strategies dfs astar ...]
+    python -m benchmarks.search_benchmark --update-baseline
+    python -m benchmarks.search_benchmark --generate input/benchmark_input
+"""
+
+from batch_runner import BatchJob, SOLVED, TIMEOUT, run_job
+from constants.constants import DFS, BeFS, ASTAR, GF2, IDDFS, IDASTAR, BIDIRECTIONAL, ORACLE, CHASE, TRACE_NONE
+from models.game import BitBoard, Game
+from models.search_metrics import SearchMetrics
+from models.solve_basis import SolveBasisCache
+from strategies.strategies import STRATEGIES
+from typing import Dict, List, Tuple
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+
+# (size, solution depth) of the games of every case
+SUITE_CASES = [(3, 3), (3, 5), (4, 4), (4, 6), (5, 3), (5, 5)]
+SUITE_STRATEGIES = [DFS, BeFS, ASTAR, GF2, IDDFS, IDASTAR, BIDIRECTIONAL, ORACLE, CHASE]
+# (strategy, size) left out of the suite, their first game already times out
+SUITE_SKIPPED = {(BeFS, 5), (IDASTAR, 5)}
+# search length allowed to the strategies on the generated games
+MAX_LENGTH = 1 << 20
+# boards drawn for a case before giving up on its depth
+MAX_ATTEMPTS = 10000
+MIN_TIMED_SECONDS = 0.01
+GAME_ID = 'search_benchmark'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# largest relative change of a measure before it counts as a regression
+DEFAULT_THRESHOLDS = {
+    'expanded': 0.05,
+    'time_to_solution': 0.5,
+    'nodes_per_second': 0.35,
+    'peak_rss_mb': 0.25,
+}
+
+
+def solvable_game(size: int, depth: int, rng: random.Random) -> Game:
+    """
+    Game whose shortest solution takes exactly depth touches
+    All the games share the id GAME_ID, so that their solution files overwrite each other
+    :param size:
+    :param depth:
+    :param rng:
+    :return:
+    """
+    toggle_masks = BitBoard.get_toggle_masks(size)
+    solve_basis = SolveBasisCache.get_default().get_basis(size)
+
+    for _ in range(MAX_ATTEMPTS):
+        state = 0
+        for move_index in rng.sample(range(size * size), depth):
+            state ^= toggle_masks[move_index]
+        # the null space may make some touches cancel out
+        if bin(solve_basis.solve(state)).count('1') == depth:
+            # the root sits at depth 1 of the depth-limited searches
+            return Game(size, depth + 1, MAX_LENGTH, BitBoard.unpack(state, size), GAME_ID)
+
+    raise ValueError('No board of size {} found with a shortest solution of {} touches'.format(size, depth))
+
+
+def case_games(size: int, depth: int, n_games: int, seed: int) -> List[Game]:
+    """
+    Games of a case, the same ones for a given seed whatever the other cases
+    :param size:
+    :param depth:
+    :param n_games:
+    :param seed:
+    :return:
+    """
+    rng = random.Random('{}/{}/{}'.format(seed, size, depth))
+    return [solvable_game(size, depth, rng) for _ in range(n_games)]
+
+
+def case_key(strategy_name: str, size: int, depth: int) -> str:
+    return '{}/{}x{}/d{}'.format(strategy_name, size, size, depth)
+
+
+def run_case(strategy_name: str, size: int, depth: int, n_games: int, seed: int, timeout: float) -> Dict:
+    """
+    Solves the games of a case with a strategy, in the calling process
+    :return: measures of the case
+    """
+    solved = 0
+    expanded = 0
+    elapsed = 0.0
+    solution_lengths = 0
+
+    for game in case_games(size, depth, n_games, seed):
+        result = run_job(BatchJob(game, strategy_name, {'trace': TRACE_NONE}), timeout)
+        if result.status == TIMEOUT:
+            # the next games of the case would likely time out too
+            break
+        if result.status != SOLVED:
+            continue
+        solved += 1
+        expanded += result.metrics.n_expanded
+        elapsed += result.metrics.elapsed
+        solution_lengths += result.solution_length
+
+    # the process only ran the case
+    metrics = SearchMetrics()
+    metrics.measure_peak_rss()
+    return {
+        'solved': solved,
+        'expanded': expanded,
+        'nodes_per_second': expanded / elapsed if elapsed > 0 else 0.0,
+        'time_to_solution': elapsed / solved if solved != 0 else None,
+        'solution_length': solution_lengths / solved if solved != 0 else None,
+        'peak_rss_mb': metrics.peak_rss / (1 << 20),
+    }
+
+
+def run_suite(strategy_names: List[str], n_games: int, seed: int, timeout: float) -> Dict:
+    """
+    Runs every strategy on every case, one fresh process per (strategy, case)
+    :return: results, in the format of the baseline file
+    """
+    results = {}
+    with multiprocessing.Pool(processes=1, maxtasksperchild=1) as pool:
+        for size, depth in SUITE_CASES:
+            for strategy_name in strategy_names:
+                if (strategy_name, size) in SUITE_SKIPPED:
+                    continue
+                measures = pool.apply(run_case, (strategy_name, size, depth, n_games, seed, timeout))
+                results[case_key(strategy_name, size, depth)] = measures
+                print("{:<16} solved {}/{}  {:>10.0f} nodes/s  {}  length {}  {:>7.1f} MB".format(
+                    case_key(strategy_name, size, depth), measures['solved'], n_games,
+                    measures['nodes_per_second'],
+                    '{:>8.4f} s'.format(measures['time_to_solution'])
+                    if measures['time_to_solution'] is not None else '       - s',
+                    measures['solution_length'], measures['peak_rss_mb']))
+
+    return {
+        'seed': seed,
+        'games': n_games,
+        'timeout': timeout,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(results: Dict, baseline: Dict) -> List[Tuple[str, str]]:
+    """
+    :param results: results of run_suite
+    :param baseline: contents of a baseline file
+    :return: (case, description) of every regression
+    """
+    if (results['seed'], results['games']) != (baseline['seed'], baseline['games']):
+        raise ValueError('The baseline was run with seed {} and {} games per case'.format(
+            baseline['seed'], baseline['games']))
+
+    thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}))
+    regressions = []
+    for key, measures in sorted(results['results'].items()):
+        if key not in baseline['results']:
+            continue
+        base = baseline['results'][key]
+
+        if measures['solved'] < base['solved']:
+            regressions.append((key, 'solved {} games instead of {}'.format(measures['solved'], base['solved'])))
+            continue
+        if base['solution_length'] is not None and measures['solution_length'] > base['solution_length']:
+            regressions.append((key, 'solution length {} instead of {}'.format(measures['solution_length'],
+                                                                                 base['solution_length'])))
+
+        # larger is worse, but for the node throughput
+        for measure in ['expanded', 'time_to_solution', 'peak_rss_mb']:
+            if base[measure] is None or base[measure] == 0:
+                continue
+            if measure == 'time_to_solution' and base[measure] < MIN_TIMED_SECONDS:
+                continue
+            if measures[measure] > base[measure] * (1 + thresholds[measure]):
+                regressions.append((key, '{} {:.4g} instead of {:.4g}'.format(measure, measures[measure],
+                                                                              base[measure])))
+        if base['nodes_per_second'] != 0 and base['time_to_solution'] is not None \
+                and base['time_to_solution'] >= MIN_TIMED_SECONDS \
+                and measures['nodes_per_second'] < base['nodes_per_second'] * (1 - thresholds['nodes_per_second']):
+            regressions.append((key, 'nodes_per_second {:.4g} instead of {:.4g}'.format(
+                measures['nodes_per_second'], base['nodes_per_second'])))
+
+    return regressions
+
+
+def write_input_file(path: str, n_games: int, seed: int):
+    """
+    Writes the games of the suite as an input file of the solver
+    :param path:
+    :param n_games: games per case
+    :param seed:
+    :return:
+    """
+    with open(path, 'w') as out_f:
+        for size, depth in SUITE_CASES:
+            for game in case_games(size, depth, n_games, seed):
+                out_f.write('{} {} {} {}\n'.format(game.size, game.max_depth, game.max_length, game.board_stream))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of the strategies on random solvable games')
+    parser.add_argument('--games', type=int, default=5, help='games per (size, depth) case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=SUITE_STRATEGIES)
+    parser.add_argument('--timeout', type=float, default=10, help='wall-clock seconds per game')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline file to compare with')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store the results as the baseline, keeping its thresholds')
+    parser.add_argument('--output', default=None, help='also write the results to this file')
+    parser.add_argument('--generate', default=None, metavar='PATH',
+                        help='only write the games of the suite as an input file')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    _args = parse_args()
+    if _args.generate is not None:
+        write_input_file(_args.generate, _args.games, _args.seed)
+        sys.exit()
+
+    # map the solve bases before the first case, building them on first run
+    SolveBasisCache.get_default()
+    _results = run_suite(_args.strategies, _args.games, _args.seed, _args.timeout)
+    if _args.output is not None:
+        with open(_args.output, 'w') as _out_f:
+            json.dump(_results, _out_f, indent=2, sort_keys=True)
+
+    _baseline = None
+    if os.path.exists(_args.baseline):
+        with open(_args.baseline, 'r') as _baseline_f:
+            _baseline = json.load(_baseline_f)
+
+    if _args.update_baseline:
+        _results['thresholds'] = _baseline['thresholds'] if _baseline is not None else DEFAULT_THRESHOLDS
+        with open(_args.baseline, 'w') as _baseline_f:
+            json.dump(_results, _baseline_f, indent=2, sort_keys=True)
+        print("\nBaseline written to {}".format(_args.baseline))
+    elif _baseline is not None:
+        _regressions = compare(_results, _baseline)
+        for _key, _description in _regressions:
+            print("REGRESSION {:<16} {}".format(_key, _description))
+        print("\n{} regressions against {}".format(len(_regressions), _args.baseline))
+        if len(_regressions) != 0:
+            sys.exit(1)
@@ -7,6 +7,64 @@ NO_SOLUTION = 'No solution found'
 DFS = 'dfs'
 BeFS = 'befs'
 ASTAR = 'astar'
+GF2 = 'gf2'
+IDDFS = 'iddfs'
+IDASTAR = 'idastar'
+BIDIRECTIONAL = 'bidir'
+ORACLE = 'oracle'
+CHASE = 'chase'
+HDASTAR = 'hdastar'
+
+CHECKERED = 'checkered'
+EXACT_DISTANCE = 'exact'
+BLACK_DOTS = 'black_dots'
+ROW_PARTITION = 'row_partition'
+PERFECT_CODE = 'perfect_code'
+
+# board sizes small enough for an exhaustive distance table, one byte per board
+DISTANCE_TABLE_SIZES = (3, 4, 5)
+
+# default number of states held by a transposition table
+TRANSPOSITION_TABLE_SIZE = 1 << 20
+# number of cached solutions kept decoded in memory, the others are read from the cache file
+SOLUTION_CACHE_SIZE = 1 << 12
+
+# children sent at once by a worker of the hash-distributed A*, and nodes it expands between two
+# reads of its inbox
+HDA_BATCH_SIZE = 256
+HDA_EXPANSIONS_PER_ROUND = 64
+
+# depth of the boards the parallel depth-first search hands to its workers as subtrees
+PARALLEL_DFS_SPLIT_DEPTH = 2
+
+# default seconds between two checkpoints of a resumable search, and nodes of the search tree
+# written at once to a checkpoint
+CHECKPOINT_INTERVAL = 600
+CHECKPOINT_CHUNK_NODES = 1 << 16
+
+# jobs submitted ahead per worker process of a batch, the next games are read as jobs complete
+BATCH_JOBS_PER_WORKER = 4
+
+ANY_SOLUTION = 'any'
+OPTIMAL_SOLUTION = 'optimal'
+# number of iterations between two checks of the cancellation of a search
+CANCELLATION_CHECK_INTERVAL = 256
+
+MAPPED_QUEUE = 'mapped'
+BUCKET_QUEUE = 'bucket'
+
+# search file modes: streamed as text, as gzip-compressed text, as fixed-width binary records, or not kept
+TRACE_TEXT = 'text'
+TRACE_GZIP = 'gzip'
+TRACE_BINARY = 'binary'
+TRACE_NONE = 'none'
+# visited nodes rendered between two writes of the search file, and its file buffer in bytes
+TRACE_FLUSH_RECORDS = 1 << 14
+TRACE_BUFFER_SIZE = 1 << 20
 
 REL_PATH_TO_SOLUTION = "./../output/{}_{}_solution.txt"
 REL_PATH_TO_SEARCH = "./../output/{}_{}_search.txt"
+REL_PATH_TO_CHECKPOINT = "./../output/{}_{}_checkpoint.bin"
+REL_PATH_TO_SOLVE_BASIS = "./../cache/solve_basis.bin"
+REL_PATH_TO_DISTANCE_TABLE = "./../cache/distance_{}.bin"
+REL_PATH_TO_SOLUTION_CACHE = "./../cache/solutions.bin"
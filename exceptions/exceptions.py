@@ -10,3 +10,45 @@ class ExceedingSearchPathLengthError(Exception):
             return 'ExceedingSearchPathLengthError, {0} '.format(self.message)
         else:
             return 'ExceedingSearchPathLengthError: the search path exceeded requirements'
+
+
+class JobTimeoutError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return 'JobTimeoutError, {0} '.format(self.message)
+        else:
+            return 'JobTimeoutError: the job exceeded its wall-clock timeout'
+
+
+class SearchCancelledError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return 'SearchCancelledError, {0} '.format(self.message)
+        else:
+            return 'SearchCancelledError: the search was cancelled before it ended'
+
+
+class InvalidGameError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return 'InvalidGameError, {0} '.format(self.message)
+        else:
+            return 'InvalidGameError: a line of the input file does not describe a game'
@@ -1,24 +1,72 @@
+from constants.constants import MAX_BOARD_SIZE, MIN_BOARD_SIZE
+from exceptions.exceptions import InvalidGameError
 from models.game import Game
+from typing import Iterator
+import sys
 
 
 class GameLoader:
     """
     Parses input file and sets up the games
+    Lines are read and turned into games one at a time, as the games are consumed, so solving
+    starts with the first line and memory does not grow with the size of the file.
+    A line holds the size, the maximum depth, the maximum search length and the board stream,
+    separated by spaces. Empty lines are skipped, the id of a game is the index of its line.
     """
 
-    def __init__(self, input_file_path):
+    def __init__(self, input_file_path, skip_invalid: bool = False):
+        """
+        :param input_file_path:
+        :param skip_invalid: report invalid lines on stderr and go on, instead of raising InvalidGameError
+        """
         self.input_file_path = input_file_path
-        self.games = []
-        self.__parse_input()
+        self.skip_invalid = skip_invalid
 
-    def __parse_input(self):
-        file = open(self.input_file_path, "r")
-        lines = file.readlines()
+    def __iter__(self) -> Iterator[Game]:
+        return self.get_games()
 
-        for index, line in enumerate(lines):
-            info = line.strip('\n').split(" ")
-            parseable_info = [int(info[0]), int(info[1]), int(info[2]), info[3], index]
-            self.games.append(Game(*parseable_info))
+    @staticmethod
+    def parse_line(line: str, index: int) -> Game:
+        """
+        :param line: line of the input file, without its line feed
+        :param index: index of the line, from 0
+        :return:
+        """
+        info = line.split()
+        if len(info) != 4:
+            raise InvalidGameError('line {}: expected 4 fields, found {}'.format(index + 1, len(info)))
 
-    def get_games(self):
-        return self.games
+        try:
+            size, max_depth, max_length = int(info[0]), int(info[1]), int(info[2])
+        except ValueError:
+            raise InvalidGameError('line {}: size, max depth and max length must be integers'.format(index + 1))
+
+        board_stream = info[3]
+        if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+            raise InvalidGameError('line {}: size {} is out of bounds [{}, {}]'.format(
+                index + 1, size, MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+        if max_depth < 0 or max_length < 0:
+            raise InvalidGameError('line {}: max depth and max length must not be negative'.format(index + 1))
+        if len(board_stream) != size * size:
+            raise InvalidGameError('line {}: a board of size {} has {} tokens, found {}'.format(
+                index + 1, size, size * size, len(board_stream)))
+        if board_stream.strip('01') != '':
+            raise InvalidGameError('line {}: tokens must be 0 or 1'.format(index + 1))
+
+        return Game(size, max_depth, max_length, board_stream, index)
+
+    def get_games(self) -> Iterator[Game]:
+        """
+        :return: generator of the games, in the order of the file
+        """
+        with open(self.input_file_path, "r") as input_f:
+            for index, line in enumerate(input_f):
+                if line.strip() == '':
+                    continue
+
+                try:
+                    yield GameLoader.parse_line(line, index)
+                except InvalidGameError as error:
+                    if not self.skip_invalid:
+                        raise
+                    print(error, file=sys.stderr)
@@ -0,0 +1,102 @@
+"""Bucket priority queue for small non-negative integer priorities.
+"""
+
+from collections import deque
+
+__all__ = ['BucketQueue']
+
+
+class BucketQueue(object):
+    """
+    Priority queue holding one bucket per integer priority
+    Drop-in alternative to MappedQueue for elements whose priority is a small
+    bounded integer, such as f(n) or h(n) of the heuristic searches:
+        - push is O(1)
+        - pop is O(1) amortized, a cursor only moves up between decrease-keys
+        - remove is O(1), removed elements are left in their bucket and skipped
+          when popped
+    Like MappedQueue, elements are matched by hash/equality and the queue cannot
+    contain duplicate elements.
+    Ties within a priority are broken by the optional tie_breaker key, smallest
+    first (e.g. `lambda elt: -g(elt)` to prefer higher g), then in FIFO order, or
+    LIFO order if lifo is set.
+    """
+
+    def __init__(self, data=[], priority=None, tie_breaker=None, lifo=False):
+        self.priority = priority if priority is not None else (lambda elt: elt.priority)
+        self.tie_breaker = tie_breaker
+        self.lifo = lifo
+        self.buckets = []  # priority -> {tie key: deque of elements}
+        self.d = dict()  # element -> queued instance, stale instances are skipped
+        self.min_priority = 0
+        for elt in data:
+            self.push(elt)
+
+    def __len__(self):
+        return len(self.d)
+
+    def __iter__(self):
+        """Iterate over the elements by priority and tie, then in the order
+        they were pushed, which pushing them in that order into an empty queue
+        restores."""
+        for bucket in self.buckets:
+            for tie in sorted(bucket):
+                for elt in bucket[tie]:
+                    # skip instances that were removed or replaced
+                    if self.d.get(elt) is elt:
+                        yield elt
+
+    def push(self, elt):
+        """Add an element to the queue."""
+        # If element is already in queue, do nothing
+        if elt in self.d:
+            return False
+
+        priority = self.priority(elt)
+        if priority < 0:
+            raise ValueError('BucketQueue only holds non-negative priorities')
+        while len(self.buckets) <= priority:
+            self.buckets.append(dict())
+
+        tie = self.tie_breaker(elt) if self.tie_breaker is not None else 0
+        bucket = self.buckets[priority]
+        if tie not in bucket:
+            bucket[tie] = deque()
+        bucket[tie].append(elt)
+        self.d[elt] = elt
+
+        if priority < self.min_priority or len(self.d) == 1:
+            self.min_priority = priority
+        return True
+
+    def pop(self):
+        """Remove and return the element with the smallest priority."""
+        if not self.d:
+            raise IndexError('pop from an empty BucketQueue')
+
+        while True:
+            bucket = self.buckets[self.min_priority]
+            if not bucket:
+                self.min_priority += 1
+                continue
+
+            tie = min(bucket) if len(bucket) > 1 else next(iter(bucket))
+            entries = bucket[tie]
+            elt = entries.pop() if self.lifo else entries.popleft()
+            if not entries:
+                del bucket[tie]
+
+            # skip instances that were removed or replaced since they were queued
+            if self.d.get(elt) is elt:
+                del self.d[elt]
+                return elt
+
+    def update(self, elt, new):
+        """Replace an element in the queue with a new one."""
+        self.remove(elt)
+        self.push(new)
+
+    def remove(self, elt):
+        """Remove an element from the queue."""
+        # Raises KeyError if not in queue, like MappedQueue
+        del self.d[elt]
@@ -0,0 +1,118 @@
+"""
+Linear algebra over GF(2) on rows packed as integers
+
+A row holds one coefficient per variable, variable k being bit k of the integer.
+Addition is XOR, so eliminating a pivot from another row is a single XOR.
+"""
+
+from typing import List, Optional, Tuple
+
+__all__ = ['reduce_rows', 'null_space', 'solve', 'popcount', 'min_weight_solution']
+
+
+def popcount(value: int) -> int:
+    """
+    Number of set bits of a non-negative integer
+    :param value:
+    :return:
+    """
+    return bin(value).count('1')
+
+
+def reduce_rows(rows: List[int], n_vars: int) -> Tuple[List[int], List[int]]:
+    """
+    Gauss-Jordan elimination of the given rows, bits at or above n_vars are carried
+    along (augmented columns) but are never used as pivots
+    :param rows: rows packed as integers, left untouched
+    :param n_vars: number of variable columns
+    :return: reduced rows (pivot rows first, in pivot order) and the pivot column of each
+    """
+    reduced = list(rows)
+    pivots = []  # type: List[int]
+    rank = 0
+
+    for column in range(n_vars - 1, -1, -1):
+        column_bit = 1 << column
+        pivot_row = next((i for i in range(rank, len(reduced)) if reduced[i] & column_bit), None)
+        if pivot_row is None:
+            continue
+
+        reduced[rank], reduced[pivot_row] = reduced[pivot_row], reduced[rank]
+        pivot = reduced[rank]
+        for i in range(len(reduced)):
+            if i != rank and reduced[i] & column_bit:
+                reduced[i] ^= pivot
+
+        pivots.append(column)
+        rank += 1
+
+    return reduced, pivots
+
+
+def null_space(reduced: List[int], pivots: List[int], n_vars: int) -> List[int]:
+    """
+    Basis of the null space of reduced rows, one vector per free variable
+    :param reduced: rows as returned by reduce_rows
+    :param pivots: pivot columns as returned by reduce_rows
+    :param n_vars: number of variable columns
+    :return:
+    """
+    variables_mask = (1 << n_vars) - 1
+    pivot_set = set(pivots)
+    null_basis = []
+
+    for free in range(n_vars - 1, -1, -1):
+        if free in pivot_set:
+            continue
+        vector = 1 << free
+        for row, pivot in zip(reduced, pivots):
+            if (row & variables_mask) >> free & 1:
+                vector |= 1 << pivot
+        null_basis.append(vector)
+
+    return null_basis
+
+
+def solve(rows: List[int], rhs: List[int], n_vars: int) -> Tuple[Optional[int], List[int]]:
+    """
+    Solves the system rows . x = rhs
+    :param rows: coefficient rows packed as integers
+    :param rhs: right-hand side bit (0 or 1) of every row
+    :param n_vars: number of variables
+    :return: a particular solution (None if the system is inconsistent) and a basis of the null space
+    """
+    rhs_bit = 1 << n_vars
+    reduced, pivots = reduce_rows([row | (bit << n_vars) for row, bit in zip(rows, rhs)], n_vars)
+
+    # a row reduced to 0 = 1 means there is no solution
+    if any(row == rhs_bit for row in reduced[len(pivots):]):
+        particular = None
+    else:
+        particular = 0
+        for row, pivot in zip(reduced, pivots):
+            if row & rhs_bit:
+                particular |= 1 << pivot
+
+    return particular, null_space(reduced, pivots, n_vars)
+
+
+def min_weight_solution(particular: int, null_basis: List[int]) -> int:
+    """
+    Enumerates the coset particular + span(null_basis) in Gray code order, one XOR per step,
+    and returns the element with the fewest set bits
+    :param particular:
+    :param null_basis:
+    :return:
+    """
+    best = particular
+    best_weight = popcount(particular)
+    current = particular
+
+    for step in range(1, 1 << len(null_basis)):
+        # the bit flipping between consecutive Gray codes is the lowest set bit of step
+        current ^= null_basis[(step & -step).bit_length() - 1]
+        weight = popcount(current)
+        if weight < best_weight:
+            best, best_weight = current, weight
+
+    return best
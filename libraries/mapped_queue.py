@@ -62,6 +62,11 @@ class MappedQueue(object):
     def __len__(self):
         return len(self.h)
 
+    def __iter__(self):
+        """Iterate over the elements in heap order, which pushing them
+        in that order into an empty queue restores."""
+        return iter(self.h)
+
     def _heapify(self):
         """Restore heap invariant and recalculate map."""
         heapq.heapify(self.h)
@@ -0,0 +1,85 @@
+"""Bounded transposition table keeping the shallowest depth each state was reached at.
+"""
+
+from collections import OrderedDict
+
+__all__ = ['TranspositionTable', 'REPLACE_LRU', 'REPLACE_DEEPEST']
+
+REPLACE_LRU = 'lru'
+REPLACE_DEEPEST = 'deepest'
+
+
+class TranspositionTable(object):
+    """
+    Maps states to the shallowest depth at which a depth-limited search reached them
+    A state reached again at the same depth or deeper has nothing left to offer and can be
+    pruned, while a state reached shallower must be explored again with its larger budget.
+    Once the table holds capacity states, an entry is replaced according to the policy:
+        - REPLACE_LRU: the least recently recorded or looked up state is evicted
+        - REPLACE_DEEPEST: the deepest state is evicted, but only for a shallower one, as
+          shallow entries prune the largest subtrees
+    """
+
+    def __init__(self, capacity=None, policy=REPLACE_DEEPEST):
+        if policy not in (REPLACE_LRU, REPLACE_DEEPEST):
+            raise ValueError('Unknown replacement policy {}'.format(policy))
+        self.capacity = capacity
+        self.policy = policy
+        self.d = OrderedDict()  # state -> shallowest depth
+        self.by_depth = dict()  # depth -> states, for REPLACE_DEEPEST
+
+    def __len__(self):
+        return len(self.d)
+
+    def __contains__(self, state):
+        return state in self.d
+
+    def clear(self):
+        self.d.clear()
+        self.by_depth.clear()
+
+    def get(self, state, default=None):
+        """Shallowest depth state was recorded at."""
+        return self.d.get(state, default)
+
+    def visit(self, state, depth):
+        """
+        Records that state is reached at depth
+        Returns False when the state was already reached at depth or shallower, in which case
+        it can be pruned, True otherwise.
+        """
+        recorded = self.d.get(state)
+        if recorded is not None:
+            if recorded <= depth:
+                if self.policy == REPLACE_LRU:
+                    self.d.move_to_end(state)
+                return False
+            self.__discard(state, recorded)
+        elif self.capacity is not None and len(self.d) >= self.capacity:
+            if not self.__evict(depth):
+                return True
+
+        self.d[state] = depth
+        if self.policy == REPLACE_DEEPEST:
+            self.by_depth.setdefault(depth, set()).add(state)
+        return True
+
+    def __discard(self, state, depth):
+        del self.d[state]
+        if self.policy == REPLACE_DEEPEST:
+            states = self.by_depth[depth]
+            states.discard(state)
+            if not states:
+                del self.by_depth[depth]
+
+    def __evict(self, depth):
+        """Makes room for a state reached at depth, returns False if it should not be stored."""
+        if self.policy == REPLACE_LRU:
+            self.d.popitem(last=False)
+            return True
+
+        deepest = max(self.by_depth)
+        if deepest <= depth:
+            return False
+        self.__discard(next(iter(self.by_depth[deepest])), deepest)
+        return True
@@ -1,29 +1,131 @@
+from batch_runner import BatchRunner
+from constants.constants import DFS, BeFS, ASTAR, GF2, IDASTAR, HDASTAR, CHECKERED, ANY_SOLUTION, OPTIMAL_SOLUTION, \
+    TRACE_TEXT, TRACE_GZIP, TRACE_BINARY, TRACE_NONE, CHECKPOINT_INTERVAL
+from exceptions.exceptions import InvalidGameError
 from game_loader import GameLoader
 from models.game import Solver
-from strategies.strategies import \
-    DepthFirstSearchStrategy, \
-    BestFirstSearchStrategy,\
-    AStarSearchStrategy
+from models.solution_cache import SolutionCache
+from models.solve_basis import SolveBasisCache
+from strategies.heuristics import HEURISTICS
+from strategies.strategies import STRATEGIES
+import argparse
+import sys
+
+DEFAULT_STRATEGIES = [DFS, BeFS, ASTAR, GF2]
+# strategies guided by a heuristic
+HEURISTIC_STRATEGIES = [BeFS, ASTAR, IDASTAR, HDASTAR]
+# strategies searching with worker processes
+PARALLEL_STRATEGIES = [DFS, HDASTAR]
+# strategies checkpointing their search
+CHECKPOINT_STRATEGIES = [DFS, BeFS, ASTAR]
+
+
+def positive_int(value: str) -> int:
+    """
+    argparse type of the counts of worker processes
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('expected at least 1, got {}'.format(value))
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Indonesian Dot Puzzle solver')
+    parser.add_argument('input_file', nargs='?', default='input/sample_input')
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=DEFAULT_STRATEGIES,
+                        help='strategies to run on every game')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='solve the games with a pool of worker processes')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='wall-clock seconds per (game, strategy) job, with --workers')
+    parser.add_argument('--memory', type=int, default=None,
+                        help='memory cap in MB per (game, strategy) job, with --workers')
+    parser.add_argument('--portfolio', choices=[ANY_SOLUTION, OPTIMAL_SOLUTION], default=None,
+                        help='race the strategies on every game and keep the first solution of this quality')
+    parser.add_argument('--heuristic', choices=sorted(HEURISTICS), default=CHECKERED,
+                        help='heuristic of {}, exact falling back on perfect_code for the sizes without a distance '
+                             'table'.format(', '.join(HEURISTIC_STRATEGIES)))
+    parser.add_argument('--search-workers', type=positive_int, default=None,
+                        help='worker processes of {} for every game'.format(', '.join(PARALLEL_STRATEGIES)))
+    parser.add_argument('--trace', choices=[TRACE_TEXT, TRACE_GZIP, TRACE_BINARY, TRACE_NONE], default=TRACE_TEXT,
+                        help='write the search files as text, as gzip-compressed text, as binary records, '
+                             'or not at all, removing those of earlier runs')
+    parser.add_argument('--symmetry', action='store_true',
+                        help='deduplicate boards up to the rotations and reflections of the board')
+    parser.add_argument('--cache', action='store_true',
+                        help='reuse the solutions of the boards already solved, kept under cache/')
+    parser.add_argument('--checkpoint', action='store_true',
+                        help='checkpoint the searches of {} under output/, to resume them'.format(
+                            ', '.join(CHECKPOINT_STRATEGIES)))
+    parser.add_argument('--checkpoint-interval', type=float, default=CHECKPOINT_INTERVAL, metavar='SECONDS',
+                        help='seconds between two checkpoints of a search, with --checkpoint')
+    parser.add_argument('--resume', action='store_true',
+                        help='resume the searches of {} from their checkpoint, if any'.format(
+                            ', '.join(CHECKPOINT_STRATEGIES)))
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                        help='append the metrics of every (game, strategy) to a JSON-lines file')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='report the invalid lines of the input file and solve the others')
+    return parser.parse_args()
 
 
 def main():
-    game_loader = GameLoader("input/sample_input")
+    args = parse_args()
+
+    # map the solve bases before the first game, building them on first run
+    SolveBasisCache.get_default()
+
+    game_loader = GameLoader(args.input_file, args.skip_invalid)
     games = game_loader.get_games()
 
+    options = {strategy_name: {'symmetry': args.symmetry, 'trace': args.trace} for strategy_name in args.strategies}
+    for strategy_name in HEURISTIC_STRATEGIES:
+        if strategy_name in options:
+            options[strategy_name]['heuristic'] = args.heuristic
+    for strategy_name in PARALLEL_STRATEGIES:
+        if strategy_name in options and args.search_workers is not None:
+            options[strategy_name]['workers'] = args.search_workers
+    for strategy_name in CHECKPOINT_STRATEGIES:
+        if strategy_name in options:
+            if args.checkpoint:
+                options[strategy_name]['checkpoint_interval'] = args.checkpoint_interval
+            if args.resume:
+                options[strategy_name]['resume'] = True
+
+    if args.workers is not None:
+        batch_runner = BatchRunner(args.strategies, args.workers, args.timeout,
+                                   args.memory * 1024 * 1024 if args.memory is not None else None,
+                                   options, args.cache, args.metrics)
+        hits = misses = 0
+        for result in batch_runner.run(games):
+            print(result)
+            if result.from_cache:
+                hits += 1
+            else:
+                misses += 1
+        if args.cache:
+            print("\nSolution cache: {} hits, {} misses".format(hits, misses))
+        return
+
+    cache = SolutionCache.get_default() if args.cache else None
     for game in games:
         game_board = game.get_game_board()
-        dfs_strategy = DepthFirstSearchStrategy(game)
-        befs_strategy = BestFirstSearchStrategy(game)
-        astar_strategy = AStarSearchStrategy(game)
+        strategies = [STRATEGIES[strategy_name](game, **options[strategy_name]) for strategy_name in args.strategies]
+
+        if args.portfolio is not None:
+            Solver(strategies[0]).solve_portfolio(game_board, strategies, args.portfolio)
+            continue
 
-        solver_dfs = Solver(dfs_strategy)
-        solver_befs = Solver(befs_strategy)
-        solver_astar = Solver(astar_strategy)
+        for strategy in strategies:
+            Solver(strategy, cache, args.metrics).solve(game_board)
 
-        solver_dfs.solve(game_board)
-        solver_befs.solve(game_board)
-        solver_astar.solve(game_board)
+    if cache is not None:
+        print("\nSolution cache: {} hits, {} misses".format(cache.hits, cache.misses))
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except InvalidGameError as error:
+        sys.exit(str(error))
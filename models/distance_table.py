@@ -0,0 +1,153 @@
+"""
+Exhaustive distance tables of the small board sizes
+
+Usage, from the root of the project, to generate the tables ahead of time:
+    python -m models.distance_table [size ...]
+"""
+
+from constants.constants import DISTANCE_TABLE_SIZES, REL_PATH_TO_DISTANCE_TABLE
+from models.game import BitBoard
+from typing import Dict, List, Optional
+import mmap
+import os
+import struct
+import sys
+
+TABLE_MAGIC = b'IDPD'
+TABLE_VERSION = 1
+HEADER_FORMAT = '>4sHH'  # magic, version, size
+# distance of the boards no sequence of touches can clear
+UNREACHABLE = 0xFF
+
+
+class DistanceTable:
+    """
+    Minimum number of touches to clear every board of a given size, one byte per packed state
+    The file is generated once, then memory-mapped: the distance of a board is a single lookup
+    at its packed state, UNREACHABLE for the boards that cannot be solved.
+    Layout: header, then the 2^(size^2) distances in packed state order
+    """
+
+    _tables = {}  # type: Dict[int, DistanceTable]
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.toggle_masks = BitBoard.get_toggle_masks(size)
+
+        if not os.path.exists(self.path) or not self.__load():
+            self.__write()
+            if not self.__load():
+                raise Exception('Could not load distance table {}'.format(self.path))
+
+    @classmethod
+    def get(cls, size: int) -> 'DistanceTable':
+        """
+        Shared table of the given size, stored next to the project and generated on first use
+        :param size: one of DISTANCE_TABLE_SIZES
+        :return:
+        """
+        if size not in DISTANCE_TABLE_SIZES:
+            raise ValueError('No distance table for size {}'.format(size))
+
+        if size not in cls._tables:
+            cur_dir = os.path.dirname(__file__)
+            cls._tables[size] = DistanceTable(
+                os.path.normpath(os.path.join(cur_dir, REL_PATH_TO_DISTANCE_TABLE.format(size))), size)
+        return cls._tables[size]
+
+    @staticmethod
+    def build(size: int) -> bytearray:
+        """
+        Computes the distance of every board
+        Touches commute and touching a token twice cancels out, so every board reachable from the
+        final state is reached by touching a set of tokens, and its distance is the size of the
+        smallest such set. Sets are enumerated in Gray code order, each one differing from the
+        previous one by a single token, which is a single XOR of the board.
+        :param size:
+        :return: distances indexed by packed state
+        """
+        n_cells = size * size
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        distances = bytearray([UNREACHABLE]) * (1 << n_cells)
+        distances[0] = 0
+
+        state = 0
+        touched = 0
+        n_touched = 0
+        for step in range(1, 1 << n_cells):
+            # the token flipped by the Gray code is the lowest set bit of the step
+            move_index = (step & -step).bit_length() - 1
+            state ^= toggle_masks[move_index]
+            touched ^= 1 << move_index
+            n_touched += 1 if touched >> move_index & 1 else -1
+            if n_touched < distances[state]:
+                distances[state] = n_touched
+
+        return distances
+
+    def __write(self):
+        """
+        Generates the table and writes the file atomically
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'wb') as table_f:
+            table_f.write(struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_VERSION, self.size))
+            table_f.write(DistanceTable.build(self.size))
+        os.replace(tmp_path, self.path)
+
+    def __load(self) -> bool:
+        """
+        Memory-maps the file and checks its header
+        :return: False if the file is not a valid table of the expected size
+        """
+        with open(self.path, 'rb') as table_f:
+            try:
+                self.mapped = mmap.mmap(table_f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return False
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(self.mapped) != header_size + (1 << self.size * self.size):
+            return False
+
+        magic, version, size = struct.unpack_from(HEADER_FORMAT, self.mapped, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION or size != self.size:
+            return False
+
+        self.distances = memoryview(self.mapped)[header_size:]
+        return True
+
+    def distance(self, state: int) -> Optional[int]:
+        """
+        :param state: packed board state
+        :return: minimum number of touches to clear the board, None if it cannot be solved
+        """
+        distance = self.distances[state]
+        return None if distance == UNREACHABLE else distance
+
+    def solution_moves(self, state: int) -> Optional[List[int]]:
+        """
+        Reads a shortest solution off the table: every touch leads to a board one touch closer
+        :param state: packed board state
+        :return: touched tokens, None if the board cannot be solved
+        """
+        distance = self.distances[state]
+        if distance == UNREACHABLE:
+            return None
+
+        moves = []
+        while distance != 0:
+            for move_index, toggle_mask in enumerate(self.toggle_masks):
+                if self.distances[state ^ toggle_mask] == distance - 1:
+                    state ^= toggle_mask
+                    distance -= 1
+                    moves.append(move_index)
+                    break
+        return moves
+
+
+if __name__ == '__main__':
+    for _size in (int(arg) for arg in sys.argv[1:]) if len(sys.argv) > 1 else DISTANCE_TABLE_SIZES:
+        print('Distance table {}x{}: {}'.format(_size, _size, DistanceTable.get(_size).path))
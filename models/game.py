@@ -1,6 +1,11 @@
-from constants.constants import MAX_BOARD_SIZE, MIN_BOARD_SIZE
+from constants.constants import MAX_BOARD_SIZE, MIN_BOARD_SIZE, ANY_SOLUTION, OPTIMAL_SOLUTION
+from exceptions.exceptions import SearchCancelledError
+from models.search_metrics import SearchMetrics
+from models.solution_cache import CachedSolution
 from string import ascii_uppercase
-from typing import List
+from typing import Dict, List, Tuple
+import multiprocessing
+import queue
 import time
 
 alphabet = list(ascii_uppercase)
@@ -73,15 +78,229 @@ class Board:
         return self.get_state_stream() < other.get_state_stream()
 
 
+class BitBoard:
+    """
+    Compact representation of a board state as a single integer
+    The token at (row, col) is held by bit n^2 - 1 - (col + row * n), so that the binary
+    form of the integer reads exactly like the state stream of the board. Comparing two
+    packed states of the same size is therefore equivalent to comparing their streams.
+    Black faces are set bits, hence the final state is 0.
+    """
+
+    _toggle_masks = {}  # type: Dict[int, List[int]]
+    _identifiers = {}  # type: Dict[int, List[str]]
+    _symmetry_tables = {}  # type: Dict[int, List[List[List[int]]]]
+
+    # the 8 rotations and reflections of a square board, as the image (row, col) of a cell
+    SYMMETRIES = [
+        lambda row, col, last: (row, col),  # identity
+        lambda row, col, last: (col, last - row),  # quarter turn clockwise
+        lambda row, col, last: (last - row, last - col),  # half turn
+        lambda row, col, last: (last - col, row),  # quarter turn counterclockwise
+        lambda row, col, last: (row, last - col),  # mirror left-right
+        lambda row, col, last: (last - row, col),  # mirror top-bottom
+        lambda row, col, last: (col, row),  # transpose
+        lambda row, col, last: (last - col, last - row),  # anti-transpose
+    ]
+    # index of the symmetry undoing each of SYMMETRIES
+    SYMMETRY_INVERSES = [0, 3, 2, 1, 4, 5, 6, 7]
+
+    @staticmethod
+    def pack(state_stream: str) -> int:
+        """
+        Packs a state stream of '0' and '1' into an integer
+        :param state_stream:
+        :return:
+        """
+        return int(state_stream, 2)
+
+    @staticmethod
+    def unpack(state: int, size: int) -> str:
+        """
+        Unpacks an integer into the state stream of a board of given size
+        :param state:
+        :param size:
+        :return:
+        """
+        return format(state, '0{}b'.format(size * size))
+
+    @staticmethod
+    def to_spaced_stream(state: int, size: int) -> str:
+        """
+        Renders a packed state the same way Board.__str__ does
+        :param state:
+        :param size:
+        :return:
+        """
+        return ' '.join(format(state, '0{}b'.format(size * size)))
+
+    @staticmethod
+    def from_board(board: 'Board') -> int:
+        return BitBoard.pack(board.get_state_stream())
+
+    @staticmethod
+    def to_board(state: int, size: int) -> 'Board':
+        return Board(BitBoard.unpack(state, size), size)
+
+    @staticmethod
+    def __build_toggle_masks(size: int) -> List[int]:
+        """
+        Builds, for every cell, the mask of the tokens flipped when touching it
+        :param size:
+        :return:
+        """
+        last_bit = size * size - 1
+        masks = []
+
+        for row in range(size):
+            for col in range(size):
+                mask = 1 << (last_bit - (col + row * size))
+                if row > 0:
+                    mask |= 1 << (last_bit - (col + (row - 1) * size))
+                if row < size - 1:
+                    mask |= 1 << (last_bit - (col + (row + 1) * size))
+                if col > 0:
+                    mask |= 1 << (last_bit - (col - 1 + row * size))
+                if col < size - 1:
+                    mask |= 1 << (last_bit - (col + 1 + row * size))
+                masks.append(mask)
+
+        return masks
+
+    @classmethod
+    def get_toggle_masks(cls, size: int) -> List[int]:
+        """
+        Toggle masks of every cell, indexed by col + row * size. Touching a cell is a
+        single XOR of the packed state with its mask.
+        :param size:
+        :return:
+        """
+        if size not in cls._toggle_masks:
+            cls._toggle_masks[size] = cls.__build_toggle_masks(size)
+        return cls._toggle_masks[size]
+
+    @classmethod
+    def get_identifiers(cls, size: int) -> List[str]:
+        """
+        Token identifiers of every cell, indexed by col + row * size
+        :param size:
+        :return:
+        """
+        if size not in cls._identifiers:
+            cls._identifiers[size] = ["{}{}".format(alphabet[row], col)
+                                      for row in range(size) for col in range(size)]
+        return cls._identifiers[size]
+
+    @staticmethod
+    def __build_symmetry_tables(size: int) -> List[List[List[int]]]:
+        """
+        Builds, for every symmetry and every row, the image of each of the 2^size values the row
+        can take, so that a board is transformed by OR-ing one lookup per row
+        :param size:
+        :return: tables[symmetry][row][row_bits]
+        """
+        last_bit = size * size - 1
+        tables = []
+
+        for symmetry in BitBoard.SYMMETRIES:
+            symmetry_tables = []
+            for row in range(size):
+                # image of every token of the row, first token first
+                images = []
+                for col in range(size):
+                    image_row, image_col = symmetry(row, col, size - 1)
+                    images.append(1 << (last_bit - (image_col + image_row * size)))
+
+                row_table = [0] * (1 << size)
+                for row_bits in range(1, 1 << size):
+                    # the lowest set bit is the last token of the row still set
+                    low_bit = row_bits & -row_bits
+                    row_table[row_bits] = row_table[row_bits ^ low_bit] | images[size - low_bit.bit_length()]
+                symmetry_tables.append(row_table)
+            tables.append(symmetry_tables)
+
+        return tables
+
+    @classmethod
+    def get_symmetry_tables(cls, size: int) -> List[List[List[int]]]:
+        """
+        Row lookup tables of every symmetry, built on first use as they take 8 * size * 2^size entries
+        :param size:
+        :return:
+        """
+        if size not in cls._symmetry_tables:
+            cls._symmetry_tables[size] = cls.__build_symmetry_tables(size)
+        return cls._symmetry_tables[size]
+
+    @classmethod
+    def transform(cls, state: int, size: int, symmetry: int) -> int:
+        """
+        Rotates or reflects a packed state
+        :param state:
+        :param size:
+        :param symmetry: index in SYMMETRIES
+        :return:
+        """
+        row_mask = (1 << size) - 1
+        row_tables = cls.get_symmetry_tables(size)[symmetry]
+        transformed = 0
+        for row in range(size):
+            transformed |= row_tables[row][state >> ((size - 1 - row) * size) & row_mask]
+        return transformed
+
+    @classmethod
+    def canonical_form(cls, state: int, size: int) -> Tuple[int, int]:
+        """
+        Smallest of the 8 rotations and reflections of a packed state
+        Touching tokens commutes with the symmetries of the board and the final state is
+        symmetric, so all the variants of a board are the same number of touches away from it.
+        :param state:
+        :param size:
+        :return: the canonical state and the index in SYMMETRIES of the symmetry giving it
+        """
+        row_mask = (1 << size) - 1
+        rows = [state >> ((size - 1 - row) * size) & row_mask for row in range(size)]
+        canonical, canonical_symmetry = state, 0
+
+        for symmetry, row_tables in enumerate(cls.get_symmetry_tables(size)):
+            transformed = 0
+            for row_table, row_bits in zip(row_tables, rows):
+                transformed |= row_table[row_bits]
+            if transformed < canonical:
+                canonical, canonical_symmetry = transformed, symmetry
+
+        return canonical, canonical_symmetry
+
+    @classmethod
+    def transform_move(cls, move_index: int, size: int, symmetry: int) -> int:
+        """
+        Token touched on a transformed board in place of token move_index on the original one
+        :param move_index: col + row * size
+        :param size:
+        :param symmetry: index in SYMMETRIES
+        :return:
+        """
+        image_row, image_col = cls.SYMMETRIES[symmetry](*divmod(move_index, size), size - 1)
+        return image_col + image_row * size
+
+
+# precompute masks for every supported board size
+for _size in range(MIN_BOARD_SIZE, MAX_BOARD_SIZE + 1):
+    BitBoard.get_toggle_masks(_size)
+    BitBoard.get_identifiers(_size)
+
+
 class MoveSnapshot:
     """
     Model that will keep track of a token that was touched, as well as the resulting
     board state that resulted from the touch
+    The board is kept packed and only rendered when the snapshot is printed
     """
 
-    def __init__(self, token_id: str, board: str, depth: int = 0):
+    def __init__(self, token_id: str, board_state: int, size: int, depth: int = 0):
         self.token = token_id
-        self.board_snapshot = board
+        self.board_state = board_state
+        self.size = size
         # store the depth at which the board snapshot was taken, to make sure to restore
         # the correct state of the answer path while backtracking
         self.depth = depth
@@ -89,6 +308,10 @@ class MoveSnapshot:
         self.h_of_n = 0
         self.f_of_n = 0
 
+    @property
+    def board_snapshot(self) -> str:
+        return BitBoard.to_spaced_stream(self.board_state, self.size)
+
     def set_eval(self, g: int, h: int):
         self.g_of_n = g
         self.h_of_n = h
@@ -100,19 +323,25 @@ class MoveSnapshot:
 
 class OpenListSnapshot:
     """
-    Model that holds MoveSnapshot and Board states but also a priority representation
+    Model that holds a packed board state and its node in the search tree, but also
+    a priority representation
     """
 
-    def __init__(self, board: Board, move_snapshot: MoveSnapshot, priority: int):
-        self.board = board
-        self.move_snapshot = move_snapshot
+    def __init__(self, board_state: int, node: int, priority: int, g: int = 0, h: int = 0, key: int = None):
+        self.board_state = board_state
+        # identifies the snapshot in the open list, the canonical form of the board when
+        # symmetric boards are deduplicated
+        self.key = board_state if key is None else key
+        self.node = node
         self.priority = priority
+        self.g_of_n = g
+        self.h_of_n = h
 
-    def get_board(self):
-        return self.board
+    def get_board_state(self):
+        return self.board_state
 
-    def get_move_snapshot(self):
-        return self.move_snapshot
+    def get_node(self):
+        return self.node
 
     def __lt__(self, other):
         return self.priority < other.priority
@@ -121,10 +350,10 @@ class OpenListSnapshot:
         return self.priority > other.priority
 
     def __hash__(self):
-        return hash(self.board.get_state_stream())
+        return hash(self.key)
 
     def __eq__(self, other):
-        return self.board.get_state_stream() == other.board.get_state_stream()
+        return self.key == other.key
 
 
 class Game:
@@ -133,13 +362,11 @@ class Game:
     """
 
     def __init__(self, size: int, max_depth: int, max_length: int, board_stream: str, game_id: int):
+        if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+            raise ValueError('Board size {} is out of bounds [{}, {}]'.format(size, MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+
         self.game_id = game_id
         self.size = size
-        if MIN_BOARD_SIZE > size > MAX_BOARD_SIZE:
-            print("Given size is out of bounds, defaulting to minimum size...")
-            self.size = MIN_BOARD_SIZE
-        else:
-            self.size = size
 
         self.max_depth = max_depth
         self.max_length = max_length
@@ -152,16 +379,128 @@ class Game:
 class Solver:
     """
     Context for SearchStrategy/Solver for the puzzle
+    With a SolutionCache, a board already solved by a strategy of the same class is not searched
+    again: the cached solution is output as the strategy would have.
+    The SearchMetrics of every solve are returned, and appended to a JSON-lines file if given one.
     """
 
-    def __init__(self, strategy):
+    def __init__(self, strategy, cache=None, metrics_path: str = None):
         self.strategy = strategy
+        self.cache = cache
+        self.metrics_path = metrics_path
+        # whether the last solution came from the cache
+        self.from_cache = False
 
     def set_strategy(self, strategy):
         self.strategy = strategy
 
-    def solve(self, initial_board: Board):
+    def solve(self, initial_board: Board) -> SearchMetrics:
+        """
+        :param initial_board:
+        :return: metrics of the strategy, completed with the elapsed time, the solution length and the peak RSS
+        """
+        size = initial_board.size
+        initial_state = BitBoard.from_board(initial_board)
+        self.from_cache = False
+        start = time.perf_counter()
+
+        cached_solution = None
+        if self.cache is not None:
+            cached_solution = self.cache.get(size, initial_state, self.strategy.cache_class())
+        if cached_solution is not None:
+            self.strategy.restore(initial_board, cached_solution.moves)
+            self.from_cache = True
+            print("\nCached solution for {}, found in {} seconds after visiting {} nodes".format(
+                type(self.strategy).__name__, cached_solution.elapsed, cached_solution.n_visited))
+        else:
+            self.strategy.execute(initial_board)
+            print("\nTime for {} : {} seconds".format(type(self.strategy).__name__, time.perf_counter() - start))
+        end = time.perf_counter()
+
+        solution = self.strategy.get_solution()
+        if self.cache is not None and not self.from_cache:
+            identifiers = BitBoard.get_identifiers(size)
+            moves = [identifiers.index(move_snapshot.token) for move_snapshot in solution[1:]] \
+                if len(solution) != 0 else None
+            self.cache.put(size, initial_state, self.strategy.cache_class(),
+                           CachedSolution(moves, len(self.strategy.trace), end - start))
+
+        metrics = self.strategy.metrics
+        metrics.game_id = self.strategy.game.game_id
+        metrics.strategy_name = self.strategy.name
+        metrics.from_cache = self.from_cache
+        metrics.n_visited = len(self.strategy.trace)
+        metrics.solution_length = len(solution) - 1
+        metrics.elapsed = end - start
+        metrics.measure_peak_rss()
+        if self.metrics_path is not None:
+            metrics.export(self.metrics_path)
+        return metrics
+
+    def solve_portfolio(self, initial_board: Board, strategies: List, quality: str = ANY_SOLUTION):
+        """
+        Races the strategies on the same board, one process each, and keeps the first result of
+        the requested quality. The other strategies are then cancelled, they stop at their next
+        cancellation check without writing their output files.
+        A result is accepted when it holds a solution (from an optimal strategy for OPTIMAL_SOLUTION),
+        or when a complete strategy shows that the board has no solution.
+        :param initial_board:
+        :param strategies: strategies to race, not executed yet
+        :param quality: ANY_SOLUTION or OPTIMAL_SOLUTION
+        :return: the winning strategy and its solution as touched token identifiers, or (None, None)
+        if no strategy produced an acceptable result
+        """
+        if quality == OPTIMAL_SOLUTION:
+            strategies = [strategy for strategy in strategies if strategy.is_optimal]
+        if len(strategies) == 0:
+            raise ValueError('No strategy can provide a solution of quality {}'.format(quality))
+
         start = time.time()
-        self.strategy.execute(initial_board)
-        end = time.time()
-        print("\nTime for {} : {} seconds".format(type(self.strategy).__name__, end - start))
+        cancel_event = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_run_portfolio_member,
+                                             args=(index, strategy, initial_board, cancel_event, results))
+                     for index, strategy in enumerate(strategies)]
+        for process in processes:
+            process.start()
+
+        winner, solution = None, None
+        pending = len(processes)
+        try:
+            while pending != 0:
+                try:
+                    index, member_solution = results.get(timeout=0.1)
+                except queue.Empty:
+                    # a member that died without reporting (e.g. killed when out of memory) never will
+                    if not any(process.is_alive() for process in processes) and results.empty():
+                        break
+                    continue
+
+                pending -= 1
+                if member_solution is not None or strategies[index].is_complete:
+                    winner, solution = strategies[index], member_solution
+                    break
+        finally:
+            cancel_event.set()
+            for process in processes:
+                process.join()
+
+        if winner is not None:
+            self.strategy = winner
+            print("\nPortfolio won by {} in {} seconds".format(type(winner).__name__, time.time() - start))
+        return winner, solution
+
+
+def _run_portfolio_member(index: int, strategy, initial_board: Board, cancel_event, results):
+    """
+    Runs a strategy of a portfolio in its own process and reports its solution, if any
+    """
+    strategy.cancel_event = cancel_event
+    try:
+        strategy.execute(initial_board)
+    except SearchCancelledError:
+        strategy.trace.discard()
+        return
+
+    solution = strategy.get_solution()
+    results.put((index, [move_snapshot.token for move_snapshot in solution[1:]] if len(solution) != 0 else None))
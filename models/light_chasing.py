@@ -0,0 +1,91 @@
+from libraries.gf2 import popcount
+from typing import Dict, List, Optional
+
+
+class LightChaser:
+    """
+    Constructive solver chasing the black tokens down the board
+    Touching the token below every black token of a row clears that row, so going down row by
+    row leaves black tokens on the last row only. Which last row is left by touching a set of top
+    row tokens before chasing only depends on the size: the table of every last row a top row
+    touch can clear is built once per size, from the 2^size top rows. Solving a board is then a
+    chase, one lookup and a second chase, O(size^2) row operations, and the solution is valid
+    but not always the shortest.
+    Rows are handled as integers of size bits, the first token of the row being the highest bit.
+    """
+
+    _chasers = {}  # type: Dict[int, LightChaser]
+
+    def __init__(self, size: int):
+        self.size = size
+        self.row_mask = (1 << size) - 1
+        # top row touches clearing each last row, None if the last row cannot be cleared
+        self.top_rows = [None] * (1 << size)  # type: List[Optional[int]]
+
+        for top_row in range(1 << size):
+            rows = [0] * size
+            self.__touch_row(rows, 0, top_row)
+            self.__chase(rows, [0] * size)
+            last_row = rows[-1]
+            if self.top_rows[last_row] is None or popcount(top_row) < popcount(self.top_rows[last_row]):
+                self.top_rows[last_row] = top_row
+
+    @classmethod
+    def get(cls, size: int) -> 'LightChaser':
+        """
+        Shared chaser of the given size, its table is built on first use
+        :param size:
+        :return:
+        """
+        if size not in cls._chasers:
+            cls._chasers[size] = LightChaser(size)
+        return cls._chasers[size]
+
+    def __touch_row(self, rows: List[int], row: int, touched: int):
+        """
+        Touches the given tokens of a row
+        :param rows: board, one integer per row
+        :param row:
+        :param touched: tokens of the row to touch
+        """
+        rows[row] ^= (touched ^ (touched << 1) ^ (touched >> 1)) & self.row_mask
+        if row > 0:
+            rows[row - 1] ^= touched
+        if row < self.size - 1:
+            rows[row + 1] ^= touched
+
+    def __chase(self, rows: List[int], touched_rows: List[int]):
+        """
+        Touches the token below every black token, row by row, leaving black tokens on the last row only
+        :param rows: board, one integer per row
+        :param touched_rows: touched tokens, one integer per row, updated
+        """
+        for row in range(self.size - 1):
+            touched = rows[row]
+            self.__touch_row(rows, row + 1, touched)
+            touched_rows[row + 1] ^= touched
+
+    def solve(self, state: int) -> Optional[int]:
+        """
+        Set of tokens to touch to clear the board
+        :param state: packed board state
+        :return: touched tokens packed like a board state, None if the board cannot be solved
+        """
+        size = self.size
+        rows = [state >> ((size - 1 - row) * size) & self.row_mask for row in range(size)]
+        touched_rows = [0] * size
+
+        self.__chase(rows, touched_rows)
+        top_row = self.top_rows[rows[-1]]
+        if top_row is None:
+            return None
+
+        if top_row != 0:
+            self.__touch_row(rows, 0, top_row)
+            touched_rows[0] ^= top_row
+            self.__chase(rows, touched_rows)
+
+        touched = 0
+        for touched_row in touched_rows:
+            touched = (touched << size) | touched_row
+        return touched
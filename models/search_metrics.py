@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+from typing import Dict
+import json
+import os
+import resource
+import sys
+import time
+
+# phases of a search whose time is measured
+EXPANSION = 'expansion'
+HEURISTIC = 'heuristic'
+OUTPUT = 'output'
+
+
+class SearchMetrics:
+    """
+    What a search took, filled in by the strategy as it searches and completed by Solver.solve
+    Nodes: expanded, children generated, and children rejected as duplicates, by the closed list
+    or whatever stands for it. Open list: its peak size, and the pushes, pops and removals.
+    Phases: seconds spent uncovering children, evaluating them (part of the expansion) and
+    writing the output files, measured with time.perf_counter.
+    The peak RSS is the one of the process, or of its largest worker process, since it started:
+    a process solving several games reports the largest of them.
+    """
+
+    def __init__(self):
+        self.game_id = None
+        self.strategy_name = None
+        self.n_expanded = 0
+        self.n_generated = 0
+        self.n_duplicates = 0
+        self.open_list_peak = 0
+        self.n_pushes = 0
+        self.n_pops = 0
+        self.n_removes = 0
+        self.phase_times = {EXPANSION: 0.0, HEURISTIC: 0.0, OUTPUT: 0.0}  # type: Dict[str, float]
+        self.n_visited = 0
+        self.solution_length = -1
+        self.elapsed = 0.0
+        self.peak_rss = 0
+        self.from_cache = False
+
+    def pushed(self, open_list_size: int, n_pushes: int = 1):
+        """
+        Counts pushes to the open list
+        :param open_list_size: size of the open list once pushed
+        :param n_pushes:
+        :return:
+        """
+        self.n_pushes += n_pushes
+        if open_list_size > self.open_list_peak:
+            self.open_list_peak = open_list_size
+
+    @contextmanager
+    def timing(self, phase: str):
+        """
+        Adds the time spent in the block to a phase, EXPANSION, HEURISTIC or OUTPUT
+        Hot loops add to phase_times directly instead.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[phase] += time.perf_counter() - start
+
+    def add(self, other: 'SearchMetrics'):
+        """
+        Adds the counts and the phase times of a part of the search, e.g. run by a worker process
+        :param other:
+        :return:
+        """
+        self.n_expanded += other.n_expanded
+        self.n_generated += other.n_generated
+        self.n_duplicates += other.n_duplicates
+        self.open_list_peak = max(self.open_list_peak, other.open_list_peak)
+        self.n_pushes += other.n_pushes
+        self.n_pops += other.n_pops
+        self.n_removes += other.n_removes
+        for phase, seconds in other.phase_times.items():
+            self.phase_times[phase] += seconds
+
+    def measure_peak_rss(self):
+        """
+        Reads the peak RSS of the process and of its terminated worker processes, in bytes
+        """
+        peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                       resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        # kilobytes on Linux, bytes on macOS
+        self.peak_rss = peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+    def to_dict(self) -> Dict:
+        return {
+            'game_id': self.game_id,
+            'strategy': self.strategy_name,
+            'from_cache': self.from_cache,
+            'solution_length': self.solution_length,
+            'visited': self.n_visited,
+            'expanded': self.n_expanded,
+            'generated': self.n_generated,
+            'duplicates': self.n_duplicates,
+            'open_list_peak': self.open_list_peak,
+            'pushes': self.n_pushes,
+            'pops': self.n_pops,
+            'removes': self.n_removes,
+            'elapsed': self.elapsed,
+            'expansion_time': self.phase_times[EXPANSION],
+            'heuristic_time': self.phase_times[HEURISTIC],
+            'output_time': self.phase_times[OUTPUT],
+            'peak_rss': self.peak_rss,
+        }
+
+    @staticmethod
+    def from_dict(values: Dict) -> 'SearchMetrics':
+        """
+        Counts and phase times of metrics exported by to_dict, e.g. those of a checkpointed search
+        :param values:
+        :return:
+        """
+        metrics = SearchMetrics()
+        metrics.n_expanded = values['expanded']
+        metrics.n_generated = values['generated']
+        metrics.n_duplicates = values['duplicates']
+        metrics.open_list_peak = values['open_list_peak']
+        metrics.n_pushes = values['pushes']
+        metrics.n_pops = values['pops']
+        metrics.n_removes = values['removes']
+        metrics.phase_times = {EXPANSION: values['expansion_time'], HEURISTIC: values['heuristic_time'],
+                               OUTPUT: values['output_time']}
+        return metrics
+
+    def export(self, path: str):
+        """
+        Appends the metrics to a JSON-lines file, one line per (game, strategy)
+        The line is appended by a single write, so the worker processes of a batch can share the file
+        :param path:
+        :return:
+        """
+        line = json.dumps(self.to_dict()) + '\n'
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
@@ -0,0 +1,114 @@
+from array import array
+from models.game import BitBoard, MoveSnapshot
+from typing import List
+
+ROOT_MOVE = 255
+
+
+class SearchTree:
+    """
+    Array-backed search tree
+    Node i is only described by its parent, the index of the token touched to reach it, its
+    depth and the id of its record in the search file once visited, which takes a few bytes per
+    node. Board states are not stored: a path is rebuilt once, by walking up the parents and
+    replaying the moves from the initial state.
+    """
+
+    def __init__(self):
+        self.parents = array('i')
+        self.moves = array('B')
+        self.depths = array('H')
+        self.records = array('i')
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add_root(self) -> int:
+        return self.add(-1, ROOT_MOVE)
+
+    def add(self, parent: int, move_index: int) -> int:
+        """
+        Adds a node reached by touching token move_index from parent
+        :param parent: parent node, -1 for a root
+        :param move_index: index of the touched token, col + row * size
+        :return: the new node
+        """
+        self.parents.append(parent)
+        self.moves.append(move_index)
+        self.depths.append(0 if parent < 0 else self.depths[parent] + 1)
+        self.records.append(-1)
+        return len(self.parents) - 1
+
+    def get_depth(self, node: int) -> int:
+        return self.depths[node]
+
+    def get_move(self, node: int) -> int:
+        return self.moves[node]
+
+    def set_record(self, node: int, record: int):
+        """
+        :param node:
+        :param record: id of the record of node in the search file
+        """
+        self.records[node] = record
+
+    def get_parent_record(self, node: int) -> int:
+        """
+        :param node:
+        :return: id of the record of the parent of node in the search file, -1 for a root
+        """
+        parent = self.parents[node]
+        return -1 if parent < 0 else self.records[parent]
+
+    def get_token(self, node: int, size: int) -> str:
+        """
+        Identifier of the token touched to reach node, '0 ' for a root as in the output files
+        :param node:
+        :param size:
+        :return:
+        """
+        move_index = self.moves[node]
+        return '0 ' if move_index == ROOT_MOVE else BitBoard.get_identifiers(size)[move_index]
+
+    def get_path_moves(self, node: int) -> List[int]:
+        """
+        Moves from the root to node
+        :param node:
+        :return:
+        """
+        moves = []
+        while self.parents[node] >= 0:
+            moves.append(self.moves[node])
+            node = self.parents[node]
+        moves.reverse()
+        return moves
+
+    def build_move_snapshots(self, node: int, initial_state: int, size: int) -> List[MoveSnapshot]:
+        """
+        Rebuilds the path from the root to node, starting with the initial board
+        :param node:
+        :param initial_state: packed state of the root
+        :param size:
+        :return:
+        """
+        return SearchTree.replay_moves(self.get_path_moves(node), initial_state, size)
+
+    @staticmethod
+    def replay_moves(moves: List[int], initial_state: int, size: int) -> List[MoveSnapshot]:
+        """
+        Touches the given tokens in order, starting with the initial board
+        :param moves: indices of the touched tokens
+        :param initial_state: packed state of the initial board
+        :param size:
+        :return: a snapshot of the initial board, then one per move
+        """
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        identifiers = BitBoard.get_identifiers(size)
+        state = initial_state
+        move_snapshots = [MoveSnapshot('0 ', state, size)]
+
+        for depth, move_index in enumerate(moves, 1):
+            state ^= toggle_masks[move_index]
+            move_snapshots.append(MoveSnapshot(identifiers[move_index], state, size, depth))
+
+        return move_snapshots
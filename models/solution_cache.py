@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from constants.constants import REL_PATH_TO_SOLUTION_CACHE, SOLUTION_CACHE_SIZE
+from typing import Dict, List, Optional, Tuple
+import os
+import struct
+import zlib
+
+ENTRY_MARKER = b'IDPS'
+ENTRY_HEADER_FORMAT = '>4sII'  # marker, payload length, payload CRC-32
+KEY_FORMAT = '>BH'  # size, length of the strategy class
+STATS_FORMAT = '>QdH'  # visited nodes, seconds, number of moves
+# number of moves of a board the strategy found no solution for
+NO_SOLUTION_MOVES = 0xFFFF
+
+
+class CachedSolution:
+    """
+    Result of a strategy on a board: the touched tokens and what it took to find them
+    """
+
+    def __init__(self, moves: Optional[List[int]], n_visited: int, elapsed: float):
+        """
+        :param moves: indices of the touched tokens, None if no solution was found
+        :param n_visited: number of nodes visited by the search
+        :param elapsed: seconds taken by the search
+        """
+        self.moves = moves
+        self.n_visited = n_visited
+        self.elapsed = elapsed
+
+
+class SolutionCache:
+    """
+    Solutions of the boards already solved, by board size, packed state and strategy class
+    Entries are appended to a log file, each one written at once and checked by a CRC-32, which
+    the worker processes of a batch can share. An index of the entries of the file is built by
+    scanning it, then kept up to date with the entries appended since, and the least recently
+    used decoded solutions are kept in memory, up to capacity. A later entry of the same key
+    replaces an earlier one.
+    The strategy class names the strategy and the options changing its result, see
+    SearchStrategy.cache_class, so a cached solution is the one the strategy would find again.
+    """
+
+    _default = None  # type: SolutionCache
+
+    def __init__(self, path: str, capacity: int = SOLUTION_CACHE_SIZE):
+        self.path = path
+        self.capacity = capacity
+        self.solutions = OrderedDict()  # type: OrderedDict[Tuple[int, int, str], CachedSolution]
+        # offset and length of the payload of every entry in the file
+        self.index = {}  # type: Dict[Tuple[int, int, str], Tuple[int, int]]
+        self.scanned_size = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self.__scan()
+
+    @classmethod
+    def get_default(cls) -> 'SolutionCache':
+        """
+        Shared cache of the process, stored next to the project
+        :return:
+        """
+        if cls._default is None:
+            cur_dir = os.path.dirname(__file__)
+            cls._default = SolutionCache(os.path.normpath(os.path.join(cur_dir, REL_PATH_TO_SOLUTION_CACHE)))
+        return cls._default
+
+    def __scan(self):
+        """
+        Indexes the entries appended to the file since the last scan
+        An entry still being written by another process is left for the next scan, a corrupted
+        one is skipped.
+        """
+        file_size = os.fstat(self.fd).st_size
+        if file_size <= self.scanned_size:
+            return
+
+        data = os.pread(self.fd, file_size - self.scanned_size, self.scanned_size)
+        header_size = struct.calcsize(ENTRY_HEADER_FORMAT)
+        position = 0
+
+        while position + header_size <= len(data):
+            marker, length, checksum = struct.unpack_from(ENTRY_HEADER_FORMAT, data, position)
+            next_marker = data.find(ENTRY_MARKER, position + 1)
+            if marker == ENTRY_MARKER and position + header_size + length > len(data) and next_marker < 0:
+                # still being written
+                break
+
+            payload = data[position + header_size:position + header_size + length]
+            if marker == ENTRY_MARKER and len(payload) == length and zlib.crc32(payload) == checksum:
+                key, _ = SolutionCache.__decode_key(payload)
+                self.index[key] = (self.scanned_size + position + header_size, length)
+                self.solutions.pop(key, None)
+                position += header_size + length
+            else:
+                # torn by a process that died while writing it, the next entry starts at a marker
+                position = next_marker if next_marker >= 0 else len(data)
+
+        self.scanned_size += position
+
+    @staticmethod
+    def __decode_key(payload: bytes) -> Tuple[Tuple[int, int, str], int]:
+        """
+        :param payload:
+        :return: key of the entry and the offset of its stats in the payload
+        """
+        size, class_length = struct.unpack_from(KEY_FORMAT, payload, 0)
+        offset = struct.calcsize(KEY_FORMAT)
+        state_bytes = (size * size + 7) // 8
+        state = int.from_bytes(payload[offset:offset + state_bytes], 'big')
+        offset += state_bytes
+        strategy_class = payload[offset:offset + class_length].decode()
+        return (size, state, strategy_class), offset + class_length
+
+    @staticmethod
+    def __encode(key: Tuple[int, int, str], solution: CachedSolution) -> bytes:
+        size, state, strategy_class = key
+        class_bytes = strategy_class.encode()
+        moves = solution.moves if solution.moves is not None else []
+        return b''.join([struct.pack(KEY_FORMAT, size, len(class_bytes)),
+                         state.to_bytes((size * size + 7) // 8, 'big'),
+                         class_bytes,
+                         struct.pack(STATS_FORMAT, solution.n_visited, solution.elapsed,
+                                     len(moves) if solution.moves is not None else NO_SOLUTION_MOVES),
+                         bytes(moves)])
+
+    def __read(self, key: Tuple[int, int, str]) -> CachedSolution:
+        offset, length = self.index[key]
+        payload = os.pread(self.fd, length, offset)
+        _, stats_offset = SolutionCache.__decode_key(payload)
+        n_visited, elapsed, n_moves = struct.unpack_from(STATS_FORMAT, payload, stats_offset)
+        moves_offset = stats_offset + struct.calcsize(STATS_FORMAT)
+        moves = None if n_moves == NO_SOLUTION_MOVES else list(payload[moves_offset:moves_offset + n_moves])
+        return CachedSolution(moves, n_visited, elapsed)
+
+    def __remember(self, key: Tuple[int, int, str], solution: CachedSolution):
+        self.solutions[key] = solution
+        self.solutions.move_to_end(key)
+        if len(self.solutions) > self.capacity:
+            self.solutions.popitem(last=False)
+
+    def get(self, size: int, state: int, strategy_class: str) -> Optional[CachedSolution]:
+        """
+        :param size:
+        :param state: packed state of the initial board
+        :param strategy_class:
+        :return: the cached solution, None if the board was not solved by a strategy of the class
+        """
+        key = (size, state, strategy_class)
+        if key in self.solutions:
+            self.solutions.move_to_end(key)
+            self.hits += 1
+            return self.solutions[key]
+
+        if key not in self.index:
+            # it may have been solved by another process since
+            self.__scan()
+        if key not in self.index:
+            self.misses += 1
+            return None
+
+        solution = self.__read(key)
+        self.__remember(key, solution)
+        self.hits += 1
+        return solution
+
+    def put(self, size: int, state: int, strategy_class: str, solution: CachedSolution):
+        """
+        Appends the solution of a board to the file
+        :param size:
+        :param state: packed state of the initial board
+        :param strategy_class:
+        :param solution:
+        :return:
+        """
+        key = (size, state, strategy_class)
+        payload = SolutionCache.__encode(key, solution)
+        # a single write of the whole entry, appended as one block by O_APPEND
+        os.write(self.fd, struct.pack(ENTRY_HEADER_FORMAT, ENTRY_MARKER, len(payload), zlib.crc32(payload)) + payload)
+        self.__remember(key, solution)
+
+    def close(self):
+        os.close(self.fd)
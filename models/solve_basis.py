@@ -0,0 +1,183 @@
+from constants.constants import MAX_BOARD_SIZE, MIN_BOARD_SIZE, REL_PATH_TO_SOLVE_BASIS
+from libraries.gf2 import min_weight_solution, null_space, popcount, reduce_rows
+from models.game import BitBoard
+from typing import Dict, List, Optional
+import mmap
+import os
+import struct
+
+BASIS_MAGIC = b'IDPB'
+BASIS_VERSION = 1
+HEADER_FORMAT = '>4sHH'  # magic, version, number of sizes
+ENTRY_FORMAT = '>BBHHHI'  # size, record width, columns, checks, null vectors, offset
+
+
+class SolveBasis:
+    """
+    Linear map solving every board of a given size
+    The solution of a board only depends on its state through a fixed GF(2) linear map,
+    so it is precomputed once per size:
+        - columns: pseudo-inverse of the toggle matrix, one column per state bit
+        - checks: vectors orthogonal to every solvable state
+        - null_basis: touches that leave any board unchanged
+    Solving a board is then one XOR per black token, plus the null space enumeration.
+    """
+
+    def __init__(self, size: int, columns: List[int], checks: List[int], null_basis: List[int]):
+        self.size = size
+        self.columns = columns
+        self.checks = checks
+        self.null_basis = null_basis
+
+    @staticmethod
+    def build(size: int) -> 'SolveBasis':
+        """
+        Builds the basis by reducing [A | I], where A is the toggle matrix
+        The identity part of a pivot row tells which state bits its pivot variable depends on,
+        the identity part of a zero row is a consistency check
+        :param size:
+        :return:
+        """
+        n_cells = size * size
+        last_bit = n_cells - 1
+        toggle_masks = BitBoard.get_toggle_masks(size)
+
+        augmented = [toggle_mask | (1 << (last_bit - index)) << n_cells
+                     for index, toggle_mask in enumerate(toggle_masks)]
+        reduced, pivots = reduce_rows(augmented, n_cells)
+
+        columns = [0] * n_cells
+        for row, pivot in zip(reduced, pivots):
+            dependencies = row >> n_cells
+            for state_bit in range(n_cells):
+                if dependencies >> state_bit & 1:
+                    columns[state_bit] |= 1 << pivot
+
+        checks = [row >> n_cells for row in reduced[len(pivots):]]
+
+        return SolveBasis(size, columns, checks, null_space(reduced, pivots, n_cells))
+
+    def solve(self, state: int) -> Optional[int]:
+        """
+        Minimum set of tokens to touch to clear the board
+        :param state: packed board state
+        :return: touched tokens packed like a board state, None if the board cannot be solved
+        """
+        for check in self.checks:
+            if popcount(check & state) & 1:
+                return None
+
+        particular = 0
+        remaining = state
+        while remaining:
+            lowest_bit = remaining & -remaining
+            particular ^= self.columns[lowest_bit.bit_length() - 1]
+            remaining ^= lowest_bit
+
+        return min_weight_solution(particular, self.null_basis)
+
+
+class SolveBasisCache:
+    """
+    On-disk cache of the solve basis of every supported board size
+    The file is built once, then memory-mapped, and a basis is decoded the first time
+    its size is queried.
+    Layout: header, one entry per size, then fixed-width big-endian records
+    (columns, then checks, then null vectors) of ceil(size^2 / 8) bytes each
+    """
+
+    _default = None  # type: SolveBasisCache
+
+    def __init__(self, path: str):
+        self.path = path
+        self.bases = {}  # type: Dict[int, SolveBasis]
+        self.entries = {}  # type: Dict[int, tuple]
+
+        if not os.path.exists(self.path) or not self.__load():
+            self.__write()
+            if not self.__load():
+                raise Exception('Could not load solve basis cache {}'.format(self.path))
+
+    @classmethod
+    def get_default(cls) -> 'SolveBasisCache':
+        """
+        Shared cache, stored next to the project
+        :return:
+        """
+        if cls._default is None:
+            cur_dir = os.path.dirname(__file__)
+            cls._default = SolveBasisCache(os.path.join(cur_dir, REL_PATH_TO_SOLVE_BASIS))
+        return cls._default
+
+    def __write(self):
+        """
+        Builds every basis and writes the file atomically
+        """
+        sizes = range(MIN_BOARD_SIZE, MAX_BOARD_SIZE + 1)
+        offset = struct.calcsize(HEADER_FORMAT) + len(sizes) * struct.calcsize(ENTRY_FORMAT)
+        entries = []
+        data = []
+
+        for size in sizes:
+            basis = SolveBasis.build(size)
+            width = (size * size + 7) // 8
+            entries.append(struct.pack(ENTRY_FORMAT, size, width, len(basis.columns),
+                                       len(basis.checks), len(basis.null_basis), offset))
+            for vector in basis.columns + basis.checks + basis.null_basis:
+                data.append(vector.to_bytes(width, 'big'))
+            offset += width * (len(basis.columns) + len(basis.checks) + len(basis.null_basis))
+            self.bases[size] = basis
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as basis_f:
+            basis_f.write(struct.pack(HEADER_FORMAT, BASIS_MAGIC, BASIS_VERSION, len(entries)))
+            basis_f.write(b''.join(entries))
+            basis_f.write(b''.join(data))
+        os.replace(tmp_path, self.path)
+
+    def __load(self) -> bool:
+        """
+        Memory-maps the file and reads its entries
+        :return: False if the file is not a valid cache
+        """
+        with open(self.path, 'rb') as basis_f:
+            try:
+                self.mapped = mmap.mmap(basis_f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return False
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        entry_size = struct.calcsize(ENTRY_FORMAT)
+        if len(self.mapped) < header_size:
+            return False
+
+        magic, version, n_entries = struct.unpack_from(HEADER_FORMAT, self.mapped, 0)
+        if magic != BASIS_MAGIC or version != BASIS_VERSION:
+            return False
+
+        for i in range(n_entries):
+            entry = struct.unpack_from(ENTRY_FORMAT, self.mapped, header_size + i * entry_size)
+            self.entries[entry[0]] = entry[1:]
+
+        return all(size in self.entries for size in range(MIN_BOARD_SIZE, MAX_BOARD_SIZE + 1))
+
+    def get_basis(self, size: int) -> SolveBasis:
+        """
+        Basis of the given size, decoded from the mapped file on first use
+        :param size:
+        :return:
+        """
+        if size not in self.bases:
+            if size in self.entries:
+                width, n_columns, n_checks, n_null, offset = self.entries[size]
+                vectors = [int.from_bytes(self.mapped[start:start + width], 'big')
+                           for start in range(offset, offset + width * (n_columns + n_checks + n_null), width)]
+                self.bases[size] = SolveBasis(size,
+                                              vectors[:n_columns],
+                                              vectors[n_columns:n_columns + n_checks],
+                                              vectors[n_columns + n_checks:])
+            else:
+                self.bases[size] = SolveBasis.build(size)
+
+        return self.bases[size]
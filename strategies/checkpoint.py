@@ -0,0 +1,218 @@
+"""
+Checkpoints of the long-running searches, written periodically so that a search killed before
+it ended can be resumed where it stopped, see SearchStrategy.checkpoint_interval
+"""
+
+from array import array
+from constants.constants import CHECKPOINT_CHUNK_NODES
+from models.search_metrics import SearchMetrics
+from models.search_tree import SearchTree
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import json
+import os
+import struct
+import sys
+import zlib
+
+CHECKPOINT_MAGIC = b'IDPC'
+CHECKPOINT_VERSION = 1
+HEADER_FORMAT = '>4sHQI'  # magic, version, payload length, payload CRC-32
+# size, length of the strategy class, length of the path of the search file, length of the metrics
+KEY_FORMAT = '>BHHI'
+# best node, records and bytes of the search file, nodes of the search tree, open list entries,
+# open list priorities, closed keys
+COUNTS_FORMAT = '>iQQQQQQ'
+# open list entries are (packed state, node, priority, g(n), h(n))
+ENTRY_TYPECODES = ('i', 'H', 'H', 'H')
+PRIORITY_TYPECODE = 'H'
+
+
+class SearchCheckpoint:
+    """
+    State of a search between two iterations: its search tree, its open list in the order it is
+    polled, the priorities of the boards queued so far, its closed list, and the best node found
+    The search file itself is streamed by the trace sink, the checkpoint holds the path and the
+    length of the part written before it, see TraceSink.checkpoint.
+    Layout: header, then the payload, checked by a CRC-32
+        - key: board size, strategy class, initial board, search file and metrics (JSON)
+        - counts, see COUNTS_FORMAT
+        - arrays of the search tree, big-endian
+        - open list entries, their packed states then one array per field
+        - packed keys and priorities of the queued boards, then packed closed keys
+    Packed states take (size^2 + 7) // 8 bytes, as in the search files.
+    """
+
+    def __init__(self, strategy_class: str, size: int, initial_state: int, search_tree: SearchTree,
+                 open_entries: List[Tuple[int, int, int, int, int]], open_priorities: Dict[int, int],
+                 closed_keys: Set[int], best_node: int = -1, metrics: Optional[SearchMetrics] = None,
+                 trace_path: Optional[str] = None, trace_length: int = 0, n_records: int = 0):
+        """
+        :param strategy_class: see SearchStrategy.cache_class
+        :param size:
+        :param initial_state: packed state of the initial board
+        :param search_tree:
+        :param open_entries: (packed state, node, priority, g(n), h(n)) of the open list, in the order it is polled
+        :param open_priorities: priority of every board queued so far, by key
+        :param closed_keys: keys of the closed list
+        :param best_node: node of the best solution found so far, -1 if none
+        :param metrics:
+        :param trace_path: temporary file of the search file, None if it is not kept
+        :param trace_length: bytes of the search file at the checkpoint
+        :param n_records: records of the search file at the checkpoint
+        """
+        self.strategy_class = strategy_class
+        self.size = size
+        self.initial_state = initial_state
+        self.search_tree = search_tree
+        self.open_entries = open_entries
+        self.open_priorities = open_priorities
+        self.closed_keys = closed_keys
+        self.best_node = best_node
+        self.metrics = metrics if metrics is not None else SearchMetrics()
+        self.trace_path = trace_path
+        self.trace_length = trace_length
+        self.n_records = n_records
+
+    @staticmethod
+    def __pack_states(states: Iterable[int], state_bytes: int) -> Iterable[bytes]:
+        chunk = []
+        for state in states:
+            chunk.append(state.to_bytes(state_bytes, 'big'))
+            if len(chunk) >= CHECKPOINT_CHUNK_NODES:
+                yield b''.join(chunk)
+                chunk.clear()
+        yield b''.join(chunk)
+
+    @staticmethod
+    def __unpack_states(data: memoryview, state_bytes: int) -> List[int]:
+        return [int.from_bytes(data[position:position + state_bytes], 'big')
+                for position in range(0, len(data), state_bytes)]
+
+    @staticmethod
+    def __pack_array(values: array) -> Iterable[bytes]:
+        for position in range(0, len(values), CHECKPOINT_CHUNK_NODES):
+            chunk = values[position:position + CHECKPOINT_CHUNK_NODES]
+            if sys.byteorder == 'little':
+                chunk.byteswap()
+            yield chunk.tobytes()
+
+    @staticmethod
+    def __unpack_array(typecode: str, data: memoryview) -> array:
+        values = array(typecode)
+        values.frombytes(data)
+        if sys.byteorder == 'little':
+            values.byteswap()
+        return values
+
+    def __chunks(self) -> Iterable[bytes]:
+        """
+        Payload of the checkpoint, by chunks so that it is never held in memory as a whole
+        """
+        state_bytes = (self.size * self.size + 7) // 8
+        class_bytes = self.strategy_class.encode()
+        path_bytes = self.trace_path.encode() if self.trace_path is not None else b''
+        metrics_bytes = json.dumps(self.metrics.to_dict()).encode()
+
+        yield struct.pack(KEY_FORMAT, self.size, len(class_bytes), len(path_bytes), len(metrics_bytes))
+        yield b''.join([class_bytes, self.initial_state.to_bytes(state_bytes, 'big'), path_bytes, metrics_bytes])
+        yield struct.pack(COUNTS_FORMAT, self.best_node, self.n_records, self.trace_length, len(self.search_tree),
+                          len(self.open_entries), len(self.open_priorities), len(self.closed_keys))
+
+        for values in (self.search_tree.parents, self.search_tree.moves, self.search_tree.depths,
+                       self.search_tree.records):
+            yield from SearchCheckpoint.__pack_array(values)
+
+        yield from SearchCheckpoint.__pack_states((entry[0] for entry in self.open_entries), state_bytes)
+        for field, typecode in enumerate(ENTRY_TYPECODES, 1):
+            yield from SearchCheckpoint.__pack_array(array(typecode, (entry[field] for entry in self.open_entries)))
+
+        yield from SearchCheckpoint.__pack_states(self.open_priorities.keys(), state_bytes)
+        yield from SearchCheckpoint.__pack_array(array(PRIORITY_TYPECODE, self.open_priorities.values()))
+        yield from SearchCheckpoint.__pack_states(self.closed_keys, state_bytes)
+
+    def write(self, path: str):
+        """
+        Writes the checkpoint atomically: it goes to a temporary file, synced to disk then renamed
+        over the previous checkpoint, so a search killed while writing it still has the previous one
+        :param path:
+        :return:
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        header_size = struct.calcsize(HEADER_FORMAT)
+        try:
+            with open(tmp_path, 'wb') as checkpoint_f:
+                # the header is completed once the payload is written
+                checkpoint_f.write(bytes(header_size))
+                length = 0
+                checksum = 0
+                for chunk in self.__chunks():
+                    checkpoint_f.write(chunk)
+                    length += len(chunk)
+                    checksum = zlib.crc32(chunk, checksum)
+
+                checkpoint_f.seek(0)
+                checkpoint_f.write(struct.pack(HEADER_FORMAT, CHECKPOINT_MAGIC, CHECKPOINT_VERSION, length, checksum))
+                checkpoint_f.flush()
+                os.fsync(checkpoint_f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            # e.g. a timeout raised while writing
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def read(path: str) -> 'SearchCheckpoint':
+        """
+        :param path:
+        :return:
+        """
+        header_size = struct.calcsize(HEADER_FORMAT)
+        with open(path, 'rb') as checkpoint_f:
+            header = checkpoint_f.read(header_size)
+            if len(header) < header_size:
+                raise ValueError('Not a checkpoint {}'.format(path))
+            magic, version, length, checksum = struct.unpack(HEADER_FORMAT, header)
+            if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+                raise ValueError('Not a checkpoint {}'.format(path))
+            payload = checkpoint_f.read(length)
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            raise ValueError('Corrupted checkpoint {}'.format(path))
+
+        data = memoryview(payload)
+        size, class_length, path_length, metrics_length = struct.unpack_from(KEY_FORMAT, data, 0)
+        position = struct.calcsize(KEY_FORMAT)
+        state_bytes = (size * size + 7) // 8
+
+        def take(n_bytes: int) -> memoryview:
+            nonlocal position
+            position += n_bytes
+            return data[position - n_bytes:position]
+
+        strategy_class = bytes(take(class_length)).decode()
+        initial_state = int.from_bytes(take(state_bytes), 'big')
+        trace_path = bytes(take(path_length)).decode() if path_length != 0 else None
+        metrics = SearchMetrics.from_dict(json.loads(bytes(take(metrics_length)).decode()))
+        best_node, n_records, trace_length, n_nodes, n_entries, n_priorities, n_closed = struct.unpack(
+            COUNTS_FORMAT, take(struct.calcsize(COUNTS_FORMAT)))
+
+        search_tree = SearchTree()
+        for name in ('parents', 'moves', 'depths', 'records'):
+            typecode = getattr(search_tree, name).typecode
+            setattr(search_tree, name, SearchCheckpoint.__unpack_array(
+                typecode, take(n_nodes * array(typecode).itemsize)))
+
+        entry_states = SearchCheckpoint.__unpack_states(take(n_entries * state_bytes), state_bytes)
+        entry_fields = [SearchCheckpoint.__unpack_array(typecode, take(n_entries * array(typecode).itemsize))
+                        for typecode in ENTRY_TYPECODES]
+        open_entries = list(zip(entry_states, *entry_fields))
+
+        priority_keys = SearchCheckpoint.__unpack_states(take(n_priorities * state_bytes), state_bytes)
+        priorities = SearchCheckpoint.__unpack_array(PRIORITY_TYPECODE,
+                                                     take(n_priorities * array(PRIORITY_TYPECODE).itemsize))
+        closed_keys = set(SearchCheckpoint.__unpack_states(take(n_closed * state_bytes), state_bytes))
+
+        return SearchCheckpoint(strategy_class, size, initial_state, search_tree, open_entries,
+                                dict(zip(priority_keys, priorities)), closed_keys, best_node, metrics, trace_path,
+                                trace_length, n_records)
@@ -0,0 +1,201 @@
+"""
+Worker processes of the hash-distributed A* search, see HashDistributedAStarStrategy
+"""
+
+from constants.constants import HDA_BATCH_SIZE, HDA_EXPANSIONS_PER_ROUND
+from models.game import BitBoard
+from strategies.heuristics import build_heuristic
+from typing import Dict, List, Tuple
+import heapq
+import os
+import queue
+
+# incumbent cost before any solution is found
+NO_INCUMBENT = 1 << 30
+# fields of a worker in the status array
+STATUS_SENT, STATUS_RECEIVED, STATUS_IDLE = range(3)
+STATUS_FIELDS = 3
+# seconds an idle worker waits for children before checking whether the search stopped
+IDLE_WAIT = 0.005
+
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+
+def owner_of(key: int, workers: int) -> int:
+    """
+    Worker owning a board: its open list and closed list hold the board, wherever it is reached
+    :param key: key of the board, its canonical form when symmetric boards are deduplicated
+    :param workers:
+    :return:
+    """
+    return ((((key ^ (key >> 64)) * HASH_MULTIPLIER) & HASH_MASK) >> 32) % workers
+
+
+class HashDistributedWorker:
+    """
+    Searches the boards it owns
+    Children are sent to their owner in batches, as (state, g(n), h(n), touched) tuples: touches
+    commute, so the touched tokens, bit i standing for token i, stand for the whole path to a board.
+    The best g(n) of every board reached is kept: a board reached again with a smaller one is
+    searched again, as another worker may have expanded it first through a longer path.
+    Nodes whose f(n) is not below the cost of the best solution found by any worker can be dropped,
+    their paths would not be shorter.
+    """
+
+    def __init__(self, index: int, workers: int, size: int, heuristic: str, symmetry: bool,
+                 inboxes: List, results, status, expanded, incumbent, stop_event):
+        """
+        :param index: index of the worker
+        :param workers: number of workers
+        :param size:
+        :param heuristic: name of the heuristic, from HEURISTICS
+        :param symmetry: key the boards by their canonical form
+        :param inboxes: queue of every worker, receiving batches of children
+        :param results: queue receiving the (g(n), touched) of the solutions found
+        :param status: shared array of the sent and received children and the idleness of every worker
+        :param expanded: shared number of nodes expanded by all the workers
+        :param incumbent: shared cost of the best solution found
+        :param stop_event: set once the search is over
+        """
+        self.index = index
+        self.workers = workers
+        self.size = size
+        self.heuristic = build_heuristic(heuristic, size)
+        self.symmetry = symmetry
+        self.inboxes = inboxes
+        self.results = results
+        self.status = status
+        self.expanded = expanded
+        self.incumbent = incumbent
+        self.stop_event = stop_event
+
+        self.toggle_masks = BitBoard.get_toggle_masks(size)
+        self.open_list = []  # type: List[Tuple[int, int, int, int, int, int]]
+        self.best_g = {}  # type: Dict[int, int]
+        self.out_batches = [[] for _ in range(workers)]  # type: List[List[Tuple[int, int, int, int]]]
+        self.sent = 0
+        self.received = 0
+        self.idle = False
+        self.bound = NO_INCUMBENT
+        self.parent_pid = os.getppid()
+
+    def __key(self, state: int) -> int:
+        return BitBoard.canonical_form(state, self.size)[0] if self.symmetry else state
+
+    def __publish(self, idle: bool):
+        with self.status.get_lock():
+            offset = self.index * STATUS_FIELDS
+            self.status[offset + STATUS_SENT] = self.sent
+            self.status[offset + STATUS_RECEIVED] = self.received
+            self.status[offset + STATUS_IDLE] = int(idle)
+        self.idle = idle
+
+    def __add(self, state: int, g_of_n: int, h_of_n: int, touched: int):
+        """
+        Adds a child owned by the worker to its open list
+        """
+        if g_of_n + h_of_n >= self.bound:
+            return
+        key = self.__key(state)
+        if self.best_g.get(key, NO_INCUMBENT) <= g_of_n:
+            return
+        self.best_g[key] = g_of_n
+        # among equal f(n), the deepest node first
+        heapq.heappush(self.open_list, (g_of_n + h_of_n, -g_of_n, key, state, h_of_n, touched))
+
+    def __receive(self, batch: List[Tuple[int, int, int, int]]):
+        if self.idle:
+            self.__publish(False)
+        for state, g_of_n, h_of_n, touched in batch:
+            self.__add(state, g_of_n, h_of_n, touched)
+        self.received += len(batch)
+
+    def __found(self, g_of_n: int, touched: int):
+        with self.incumbent.get_lock():
+            if g_of_n < self.incumbent.value:
+                self.incumbent.value = g_of_n
+                self.results.put((g_of_n, touched))
+        self.bound = min(self.bound, g_of_n)
+
+    def __flush(self, owner: int):
+        batch = self.out_batches[owner]
+        self.sent += len(batch)
+        self.inboxes[owner].put(batch)
+        self.out_batches[owner] = []
+
+    def __expand_round(self) -> int:
+        """
+        Expands up to HDA_EXPANSIONS_PER_ROUND nodes of the open list
+        :return: number of expanded nodes
+        """
+        n_expanded = 0
+        while len(self.open_list) != 0 and n_expanded < HDA_EXPANSIONS_PER_ROUND:
+            f_of_n, negative_g, key, state, h_of_n, touched = heapq.heappop(self.open_list)
+            g_of_n = -negative_g
+            if f_of_n >= self.bound:
+                # no node left can lead to a shorter solution
+                self.open_list.clear()
+                break
+            if self.best_g[key] < g_of_n:
+                # reached again through a shorter path since
+                continue
+
+            n_expanded += 1
+            for move_index, toggle_mask in enumerate(self.toggle_masks):
+                new_state = state ^ toggle_mask
+                new_touched = touched ^ 1 << move_index
+                if new_state == 0:
+                    self.__found(g_of_n + 1, new_touched)
+                    continue
+
+                new_h = self.heuristic.evaluate_child(state, h_of_n, move_index, new_state)
+                owner = owner_of(self.__key(new_state), self.workers)
+                if owner == self.index:
+                    self.__add(new_state, g_of_n + 1, new_h, new_touched)
+                elif g_of_n + 1 + new_h < self.bound:
+                    self.out_batches[owner].append((new_state, g_of_n + 1, new_h, new_touched))
+                    if len(self.out_batches[owner]) >= HDA_BATCH_SIZE:
+                        self.__flush(owner)
+
+        for owner in range(self.workers):
+            if len(self.out_batches[owner]) != 0:
+                self.__flush(owner)
+        return n_expanded
+
+    def run(self):
+        # children still queued once the search is over are dropped, instead of blocking the exit
+        for other_inbox in self.inboxes:
+            other_inbox.cancel_join_thread()
+
+        inbox = self.inboxes[self.index]
+        # workers also stop when the strategy was killed, e.g. out of memory
+        while not self.stop_event.is_set() and os.getppid() == self.parent_pid:
+            while True:
+                try:
+                    self.__receive(inbox.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.bound = min(self.bound, self.incumbent.value)
+            n_expanded = self.__expand_round()
+            if n_expanded != 0:
+                with self.expanded.get_lock():
+                    self.expanded.value += n_expanded
+                continue
+
+            # nothing left to expand: the counters are published before waiting, so that the
+            # search ends once every worker waits and every child sent was received
+            if not self.idle:
+                self.__publish(True)
+            try:
+                self.__receive(inbox.get(timeout=IDLE_WAIT))
+            except queue.Empty:
+                pass
+
+
+def run_worker(*args):
+    """
+    Entry point of a worker process
+    """
+    HashDistributedWorker(*args).run()
@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+from constants.constants import CHECKERED, EXACT_DISTANCE, BLACK_DOTS, ROW_PARTITION, PERFECT_CODE, \
+    DISTANCE_TABLE_SIZES
+from libraries.gf2 import popcount
+from models.distance_table import DistanceTable
+from models.game import BitBoard
+from typing import Dict, Type
+
+
+class Heuristic(ABC):
+    """
+    Heuristic interface used by the heuristic-based searches
+    Estimates the number of touches left to clear a packed board of a given size. Searches call
+    evaluate_child when they expand a node, so that heuristics able to derive the child's value
+    from its parent's only pay for the tokens touched by the move.
+    """
+
+    # never overestimates the number of touches left, searches relying on it are then optimal.
+    # The admissible heuristics below are also consistent: a touch lowers them by one at most
+    admissible = False
+
+    def __init__(self, size: int):
+        self.size = size
+        self.toggle_masks = BitBoard.get_toggle_masks(size)
+
+    @property
+    @abstractmethod
+    def name(self):
+        pass
+
+    @abstractmethod
+    def evaluate(self, state: int) -> int:
+        """
+        :param state: packed board state
+        :return: h(n)
+        """
+        pass
+
+    def evaluate_child(self, parent_state: int, parent_h: int, move_index: int, child_state: int) -> int:
+        """
+        Value of the child reached by touching token move_index from the parent
+        Defaults to a full evaluation of the child
+        :param parent_state: packed state of the parent
+        :param parent_h: h(n) of the parent
+        :param move_index: index of the touched token, col + row * size
+        :param child_state: packed state of the child
+        :return: h(n) of the child
+        """
+        return self.evaluate(child_state)
+
+
+class CheckeredHeuristic(Heuristic):
+    """
+    Looks for the number of inconsistencies from an expected state where all the tokens are
+    positioned in a checkered position relative to one another, the first token giving the
+    colour of its checker.
+    Assumed to be admissible, see report for example, but benchmarks.heuristic_benchmark finds
+    boards whose distance it overestimates, so it is not flagged admissible
+    """
+
+    name = CHECKERED
+
+    def __init__(self, size: int):
+        Heuristic.__init__(self, size)
+        self.n_cells = size * size
+        self.first_bit = self.n_cells - 1
+        self.full_mask = (1 << self.n_cells) - 1
+        # checker holding the first token, the other checker is its complement
+        self.first_checker = sum(1 << (self.first_bit - (col + row * size))
+                                 for row in range(size) for col in range(size) if (row + col) % 2 == 0)
+        self.toggle_weights = [popcount(toggle_mask) for toggle_mask in self.toggle_masks]
+        self.touches_first_token = [toggle_mask >> self.first_bit & 1 == 1 for toggle_mask in self.toggle_masks]
+
+    def __expected_state(self, state: int) -> int:
+        return self.first_checker if state >> self.first_bit & 1 else self.first_checker ^ self.full_mask
+
+    def evaluate(self, state: int) -> int:
+        # if board is perfect set to max priority
+        if state == 0:
+            return 0
+
+        return popcount(state ^ self.__expected_state(state))
+
+    def evaluate_child(self, parent_state: int, parent_h: int, move_index: int, child_state: int) -> int:
+        """
+        Only the touched tokens can change their consistency: the child has every inconsistency of
+        the parent outside of the move, plus the touched tokens that were consistent. Touching the
+        first token swaps the expected checker, turning every inconsistency into a consistency.
+        """
+        if child_state == 0:
+            return 0
+        elif parent_state == 0:
+            return self.evaluate(child_state)
+
+        toggle_mask = self.toggle_masks[move_index]
+        touched_inconsistencies = popcount((parent_state ^ self.__expected_state(parent_state)) & toggle_mask)
+        inconsistencies = parent_h + self.toggle_weights[move_index] - 2 * touched_inconsistencies
+
+        if self.touches_first_token[move_index]:
+            return self.n_cells - inconsistencies
+        return inconsistencies
+
+
+class ExactDistanceHeuristic(Heuristic):
+    """
+    Reads the exact number of touches left from the distance table of the size, only available
+    for DISTANCE_TABLE_SIZES. Boards that cannot be solved are given more touches than any board
+    that can.
+    """
+
+    name = EXACT_DISTANCE
+    admissible = True
+
+    def __init__(self, size: int):
+        Heuristic.__init__(self, size)
+        self.distance_table = DistanceTable.get(size)
+        self.unreachable = size * size + 1
+
+    def evaluate(self, state: int) -> int:
+        distance = self.distance_table.distance(state)
+        return self.unreachable if distance is None else distance
+
+
+class BlackDotsHeuristic(Heuristic):
+    """
+    A touch flips five tokens at most, so at least ceil(black tokens / 5) touches are left
+    """
+
+    name = BLACK_DOTS
+    admissible = True
+
+    def evaluate(self, state: int) -> int:
+        return (popcount(state) + 4) // 5
+
+
+class RowPartitionHeuristic(Heuristic):
+    """
+    Row-chasing lower bound
+    A touch flips three tokens of a row at most, and only the touches of rows r - 1 to r + 1 flip
+    tokens of row r, so rows three apart never share a touch. Over the rows of a residue modulo 3,
+    at least the sum of ceil(black tokens of the row / 3) touches are left.
+    The bound is the largest over the three residues, of the rows and of the columns.
+    """
+
+    name = ROW_PARTITION
+    admissible = True
+
+    def __init__(self, size: int):
+        Heuristic.__init__(self, size)
+        last_bit = size * size - 1
+        row_masks = [sum(1 << (last_bit - (col + row * size)) for col in range(size)) for row in range(size)]
+        col_masks = [sum(1 << (last_bit - (col + row * size)) for row in range(size)) for col in range(size)]
+        # lines sharing a residue modulo 3, of the rows then of the columns
+        self.line_groups = [lines[residue::3] for lines in (row_masks, col_masks) for residue in range(3)]
+
+    def evaluate(self, state: int) -> int:
+        return max(sum((popcount(state & line) + 2) // 3 for line in lines) for lines in self.line_groups)
+
+
+class PerfectCodeHeuristic(Heuristic):
+    """
+    Tokens (row, col) with the same (row + 2 * col) mod 5 are at least three steps apart, so no
+    touch flips two of them: every black token of such a class needs a touch of its own.
+    The bound is the largest number of black tokens in one of the five classes.
+    """
+
+    name = PERFECT_CODE
+    admissible = True
+
+    def __init__(self, size: int):
+        Heuristic.__init__(self, size)
+        last_bit = size * size - 1
+        self.class_masks = [sum(1 << (last_bit - (col + row * size))
+                                for row in range(size) for col in range(size) if (row + 2 * col) % 5 == residue)
+                            for residue in range(5)]
+
+    def evaluate(self, state: int) -> int:
+        return max(popcount(state & class_mask) for class_mask in self.class_masks)
+
+
+# heuristics by name, for the strategies to pick from
+HEURISTICS = {
+    CHECKERED: CheckeredHeuristic,
+    BLACK_DOTS: BlackDotsHeuristic,
+    ROW_PARTITION: RowPartitionHeuristic,
+    PERFECT_CODE: PerfectCodeHeuristic,
+    EXACT_DISTANCE: ExactDistanceHeuristic,
+}  # type: Dict[str, Type[Heuristic]]
+
+
+def build_heuristic(name: str, size: int) -> Heuristic:
+    """
+    Builds a heuristic of HEURISTICS for a board size
+    The exact distances are only tabulated for DISTANCE_TABLE_SIZES, the other sizes fall back on
+    PERFECT_CODE, admissible as well.
+    :param name:
+    :param size:
+    :return:
+    """
+    if name == EXACT_DISTANCE and size not in DISTANCE_TABLE_SIZES:
+        name = PERFECT_CODE
+    return HEURISTICS[name](size)
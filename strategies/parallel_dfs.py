@@ -0,0 +1,209 @@
+"""
+Worker processes of the parallel depth-first search, see DepthFirstSearchStrategy
+"""
+
+from collections import namedtuple
+from constants.constants import CANCELLATION_CHECK_INTERVAL
+from models.game import BitBoard
+from models.search_metrics import EXPANSION, SearchMetrics
+from models.search_tree import SearchTree
+from strategies.hda_star import IDLE_WAIT
+from strategies.trace import NO_PARENT, FileTraceSink, open_trace
+from typing import FrozenSet, List, Optional, Tuple
+import os
+import queue
+import time
+
+# depth of the shortest solution before any solution is found
+NO_SHORTEST = 1 << 30
+# donor of the subtrees split by the strategy, whose parent records are in its own search file
+NO_DONOR = -1
+
+# subtree rooted at a board: the moves reaching it from the initial board, and the task and the
+# record id of its parent in the search file of that task
+SubtreeTask = namedtuple('SubtreeTask', ['task_id', 'prefix_moves', 'state', 'donor', 'parent'])
+# part of the search file of a task, the moves of the solution it found, None if none was shorter,
+# and the SearchMetrics of the task
+SubtreeResult = namedtuple('SubtreeResult', ['task_id', 'part_path', 'n_records', 'moves', 'donor', 'parent',
+                                             'metrics'])
+
+
+def part_path_of(search_path: str, task_id: int) -> str:
+    """
+    :param search_path: path of the search file in the text format
+    :param task_id:
+    :return: path of the part of the search file written by the task
+    """
+    root, extension = os.path.splitext(search_path)
+    return '{}.part{}{}'.format(root, task_id, extension)
+
+
+class SubtreeWorker:
+    """
+    Searches subtrees depth first, as DepthFirstSearchStrategy does
+    Tasks are pulled from a shared queue. While another worker waits for one, the shallowest
+    board left on the stack of the task is handed over as a new task, so unbalanced subtrees
+    are shared out. The depth of the shortest solution found by any worker bounds the search of
+    all of them.
+    Every task has its own closed list, holding the boards expanded by the strategy before the
+    split, and writes its own part of the search file.
+    """
+
+    def __init__(self, size: int, max_depth: int, symmetry: bool, trace_mode: str, search_path: str,
+                 strategy_name: str, prefix_keys: FrozenSet[int], tasks, results, pending, idle, next_task_id,
+                 shortest, stop_event):
+        """
+        :param size:
+        :param max_depth:
+        :param symmetry: key the boards by their canonical form
+        :param trace_mode: mode of the search file
+        :param search_path: path of the search file in the text format, see part_path_of
+        :param strategy_name:
+        :param prefix_keys: keys of the boards expanded by the strategy
+        :param tasks: queue of the SubtreeTask left
+        :param results: queue receiving a SubtreeResult per task
+        :param pending: shared number of tasks not completed
+        :param idle: shared number of workers waiting for a task
+        :param next_task_id: shared id of the next task handed over
+        :param shortest: shared depth of the shortest solution found
+        :param stop_event: set once the search is over
+        """
+        self.size = size
+        self.max_depth = max_depth
+        self.symmetry = symmetry
+        self.trace_mode = trace_mode
+        self.search_path = search_path
+        self.strategy_name = strategy_name
+        self.prefix_keys = prefix_keys
+        self.tasks = tasks
+        self.results = results
+        self.pending = pending
+        self.idle = idle
+        self.next_task_id = next_task_id
+        self.shortest = shortest
+        self.stop_event = stop_event
+
+        self.toggle_masks = BitBoard.get_toggle_masks(size)
+        self.parent_pid = os.getppid()
+
+    def __key(self, state: int) -> int:
+        return BitBoard.canonical_form(state, self.size)[0] if self.symmetry else state
+
+    def __hand_over(self, task: SubtreeTask, search_tree: SearchTree, stack: List[Tuple[int, int]]):
+        """
+        Hands the shallowest board of the stack over to a waiting worker
+        """
+        state, node = stack.pop(0)
+        with self.next_task_id.get_lock():
+            task_id = self.next_task_id.value
+            self.next_task_id.value += 1
+        with self.pending.get_lock():
+            self.pending.value += 1
+        self.tasks.put(SubtreeTask(task_id, task.prefix_moves + search_tree.get_path_moves(node), state,
+                                   task.task_id, search_tree.get_parent_record(node)))
+
+    def __search(self, task: SubtreeTask) -> Optional[SubtreeResult]:
+        """
+        :param task:
+        :return: None if the search stopped before the task was completed
+        """
+        trace = open_trace(self.trace_mode, part_path_of(self.search_path, task.task_id), self.size, False,
+                           self.strategy_name)
+        search_tree = SearchTree()
+        closed_list_set = set(self.prefix_keys)
+        root = search_tree.add_root()
+        stack = [(task.state, root)]  # type: List[Tuple[int, int]]
+        root_depth = len(task.prefix_moves)
+        shortest_node = -1
+        bound = self.shortest.value
+        iteration = 0
+        metrics = SearchMetrics()
+
+        try:
+            while len(stack) != 0:
+                iteration += 1
+                if iteration % CANCELLATION_CHECK_INTERVAL == 0:
+                    if self.stop_event.is_set():
+                        trace.discard()
+                        return None
+                    bound = min(bound, self.shortest.value)
+                    if self.idle.value != 0 and len(stack) > 1 and self.tasks.empty():
+                        self.__hand_over(task, search_tree, stack)
+
+                state, node = stack.pop()
+                metrics.n_pops += 1
+                depth = root_depth + search_tree.get_depth(node)
+                # the root of the part is linked to its parent when the parts are merged
+                search_tree.set_record(node, trace.record(
+                    state, task.prefix_moves[-1] if node == root else search_tree.get_move(node), depth,
+                    parent=NO_PARENT if node == root else search_tree.get_parent_record(node)))
+
+                if state == 0:
+                    with self.shortest.get_lock():
+                        if depth < self.shortest.value:
+                            self.shortest.value = depth
+                            shortest_node = node
+                    bound = min(bound, depth)
+                    continue
+
+                closed_list_set.add(self.__key(state))
+
+                if depth + 1 >= self.max_depth or depth + 1 >= bound:
+                    continue
+
+                start = time.perf_counter()
+                children = []  # type: List[Tuple[int, int]]
+                for move_index, toggle_mask in enumerate(self.toggle_masks):
+                    new_state = state ^ toggle_mask
+                    if self.__key(new_state) not in closed_list_set:
+                        children.append((new_state, move_index))
+
+                children.sort(key=lambda _state_move_tuple: _state_move_tuple[0], reverse=True)
+                stack += [(new_state, search_tree.add(node, move_index)) for new_state, move_index in children]
+
+                metrics.n_expanded += 1
+                metrics.n_generated += len(self.toggle_masks)
+                metrics.n_duplicates += len(self.toggle_masks) - len(children)
+                metrics.pushed(len(stack), len(children))
+                metrics.phase_times[EXPANSION] += time.perf_counter() - start
+
+            trace.close()
+        except BaseException:
+            trace.discard()
+            raise
+
+        moves = None if shortest_node < 0 else task.prefix_moves + search_tree.get_path_moves(shortest_node)
+        return SubtreeResult(task.task_id, trace.path if isinstance(trace, FileTraceSink) else None, len(trace),
+                             moves, task.donor, task.parent, metrics)
+
+    def run(self):
+        waiting = False
+        # workers also stop when the strategy was killed, e.g. out of memory
+        while not self.stop_event.is_set() and os.getppid() == self.parent_pid and self.pending.value != 0:
+            try:
+                task = self.tasks.get(timeout=IDLE_WAIT)
+            except queue.Empty:
+                if not waiting:
+                    waiting = True
+                    with self.idle.get_lock():
+                        self.idle.value += 1
+                continue
+
+            if waiting:
+                waiting = False
+                with self.idle.get_lock():
+                    self.idle.value -= 1
+
+            result = self.__search(task)
+            if result is None:
+                break
+            self.results.put(result)
+            with self.pending.get_lock():
+                self.pending.value -= 1
+
+
+def run_subtree_worker(*args):
+    """
+    Entry point of a worker process
+    """
+    SubtreeWorker(*args).run()
@@ -1,18 +1,52 @@
 from abc import ABC, abstractmethod
-from exceptions.exceptions import ExceedingSearchPathLengthError
-from models.game import Board, MoveSnapshot, Game, OpenListSnapshot, Token
-from typing import List, Tuple, Set
+from exceptions.exceptions import ExceedingSearchPathLengthError, SearchCancelledError
+from models.distance_table import DistanceTable
+from models.game import BitBoard, Board, MoveSnapshot, Game, OpenListSnapshot
+from models.light_chasing import LightChaser
+from models.search_metrics import EXPANSION, HEURISTIC, OUTPUT, SearchMetrics
+from models.search_tree import ROOT_MOVE, SearchTree
+from models.solve_basis import SolveBasisCache
+from strategies.checkpoint import SearchCheckpoint
+from strategies.hda_star import IDLE_WAIT, NO_INCUMBENT, STATUS_FIELDS, STATUS_IDLE, STATUS_RECEIVED, STATUS_SENT, \
+    owner_of, run_worker
+from strategies.heuristics import build_heuristic
+from strategies.parallel_dfs import NO_DONOR, NO_SHORTEST, SubtreeTask, run_subtree_worker
+from strategies.trace import NO_PARENT, TraceSink, open_trace
+from strategies.vectorized import VectorizedExpander
+from typing import Dict, List, Optional, Tuple, Set
 from constants.constants import \
     NO_SOLUTION, \
     FOUND_SOLUTION, \
     DFS, \
     REL_PATH_TO_SEARCH, \
+    REL_PATH_TO_CHECKPOINT, \
     REL_PATH_TO_SOLUTION, \
     BeFS, \
-    ASTAR
+    ASTAR, \
+    GF2, \
+    MAPPED_QUEUE, \
+    CHECKERED, \
+    TRACE_TEXT, \
+    BUCKET_QUEUE, \
+    CANCELLATION_CHECK_INTERVAL, \
+    IDDFS, \
+    IDASTAR, \
+    BIDIRECTIONAL, \
+    ORACLE, \
+    CHASE, \
+    HDASTAR, \
+    DISTANCE_TABLE_SIZES, \
+    TRANSPOSITION_TABLE_SIZE, \
+    PARALLEL_DFS_SPLIT_DEPTH
+import glob
+import multiprocessing
 import os
+import queue
+import time
 
+from libraries.bucket_queue import BucketQueue
 from libraries.mapped_queue import MappedQueue
+from libraries.transposition_table import TranspositionTable, REPLACE_DEEPEST
 
 
 class SearchStrategy(ABC):
@@ -21,11 +55,44 @@ class SearchStrategy(ABC):
     to solve Indonesian Dot Puzzle
     """
 
+    # solutions are known to be the shortest ones
+    is_optimal = False
+    # finding no solution means the board has none
+    is_complete = False
+    # set by the Solver to stop a search cooperatively
+    cancel_event = None
+    # boards are deduplicated up to the rotations and reflections of the board
+    symmetry = False
+    # seconds between two checkpoints of the search, None for no checkpoint, and whether the
+    # search resumes from the checkpoint of the game if there is one
+    checkpoint_interval = None
+    resume = False
+
     @property
     @abstractmethod
     def name(self):
         pass
 
+    def _check_cancelled(self, iteration: int):
+        """
+        Stops the search, every CANCELLATION_CHECK_INTERVAL iterations, if it was cancelled
+        :param iteration:
+        :return:
+        """
+        if self.cancel_event is not None and iteration % CANCELLATION_CHECK_INTERVAL == 0 \
+                and self.cancel_event.is_set():
+            raise SearchCancelledError(self.name)
+
+    def _state_key(self, state: int) -> int:
+        """
+        Key of a board in the closed list and the open list, its canonical form when symmetric
+        boards are deduplicated. Boards are still expanded as reached, so that solution paths
+        keep the orientation of the initial board.
+        :param state: packed board state
+        :return:
+        """
+        return BitBoard.canonical_form(state, self.game.size)[0] if self.symmetry else state
+
     @abstractmethod
     def _generate_output(self):
         raise NotImplementedError
@@ -34,49 +101,260 @@ class SearchStrategy(ABC):
     def execute(self, initial_board: Board):
         pass
 
+    @abstractmethod
+    def get_solution(self) -> List[MoveSnapshot]:
+        """
+        :return: solution path starting with the initial board, empty if no solution was found
+        """
+        pass
+
+    @abstractmethod
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        """
+        :param move_snapshots: solution path starting with the initial board, empty if there is none
+        """
+        pass
+
+    def cache_class(self) -> str:
+        """
+        Class of the strategy in the SolutionCache: its name and the options changing its result,
+        a board solved again by a strategy of the same class gets the same solution
+        :return:
+        """
+        return '{}/{}/{}/{}'.format(self.name, self.game.max_depth, self.game.max_length, int(self.symmetry))
+
+    def restore(self, initial_board: Board, moves: Optional[List[int]]):
+        """
+        Outputs the solution found by an earlier run of a strategy of the same class, instead of
+        searching. The search file holds the boards along the solution path.
+        :param initial_board:
+        :param moves: indices of the touched tokens, None if no solution was found
+        :return:
+        """
+        move_snapshots = [] if moves is None else SearchTree.replay_moves(moves, BitBoard.from_board(initial_board),
+                                                                          initial_board.size)
+        self._set_solution(move_snapshots)
+
+        if len(move_snapshots) != 0:
+            print("\n{}\n".format(FOUND_SOLUTION))
+            for move_snapshot in move_snapshots:
+                print(move_snapshot)
+        else:
+            print("\n{}".format(NO_SOLUTION))
+
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(move_snapshots)
+            self._record_path(move_snapshots)
+            self.trace.close()
+
+    def _output_path(self, rel_path: str) -> str:
+        """
+        :param rel_path: REL_PATH_TO_SOLUTION or REL_PATH_TO_SEARCH
+        :return: path of the output file of the game for the strategy
+        """
+        return os.path.join(os.path.dirname(__file__), rel_path.format(self.game.game_id, self.name))
+
+    def _open_trace(self, mode: str, evaluated: bool) -> TraceSink:
+        """
+        Sink of the search file, streamed while the search runs
+        :param mode: TRACE_TEXT, TRACE_GZIP, TRACE_BINARY or TRACE_NONE
+        :param evaluated: whether lines hold f(n), g(n), h(n) and the touched token
+        :return:
+        """
+        return open_trace(mode, self._output_path(REL_PATH_TO_SEARCH), self.game.size, evaluated, self.name)
+
+    def _checkpoint_due(self, iteration: int) -> bool:
+        """
+        Whether a checkpoint of the search is due, checked every CANCELLATION_CHECK_INTERVAL iterations
+        :param iteration:
+        :return:
+        """
+        return self.checkpoint_interval is not None and iteration % CANCELLATION_CHECK_INTERVAL == 0 \
+            and time.perf_counter() - self.last_checkpoint >= self.checkpoint_interval
+
+    def _write_checkpoint(self, initial_state: int, open_entries: List[Tuple[int, int, int, int, int]],
+                          open_priorities: Dict[int, int], best_node: int = -1):
+        """
+        Checkpoints a search keeping a search tree and a closed list, between two iterations
+        :param initial_state:
+        :param open_entries: (packed state, node, priority, g(n), h(n)) of the open list, in the order it is polled
+        :param open_priorities: priority of every board queued so far, by key
+        :param best_node: node of the best solution found so far, -1 if none
+        :return:
+        """
+        trace_path, trace_length = self.trace.checkpoint()
+        SearchCheckpoint(self.cache_class(), self.game.size, initial_state, self.search_tree, open_entries,
+                         open_priorities, self.closed_list_set, best_node, self.metrics, trace_path, trace_length,
+                         len(self.trace)).write(self._output_path(REL_PATH_TO_CHECKPOINT))
+        self.last_checkpoint = time.perf_counter()
+
+    def _read_checkpoint(self, initial_state: int) -> Optional[SearchCheckpoint]:
+        """
+        When resuming, restores the search tree, the closed list, the metrics and the search file
+        of the checkpoint of the game, the strategy then restores its open list
+        :param initial_state:
+        :return: the checkpoint, None if there is none and the search starts from the initial board
+        """
+        self.last_checkpoint = time.perf_counter()
+        path = self._output_path(REL_PATH_TO_CHECKPOINT)
+        if self.checkpoint_interval is not None or self.resume:
+            self.__remove_partial_checkpoints(path)
+        if not self.resume or not os.path.exists(path):
+            return None
+
+        checkpoint = SearchCheckpoint.read(path)
+        if (checkpoint.strategy_class, checkpoint.size, checkpoint.initial_state) \
+                != (self.cache_class(), self.game.size, initial_state):
+            raise ValueError('The checkpoint {} is not the one of this search'.format(path))
+        self.trace.resume(checkpoint.trace_path, checkpoint.trace_length, checkpoint.n_records)
+        self.search_tree = checkpoint.search_tree
+        self.closed_list_set = checkpoint.closed_keys
+        self.metrics = checkpoint.metrics
+        return checkpoint
+
+    @staticmethod
+    def __remove_partial_checkpoints(path: str):
+        """
+        Removes the temporary files of the checkpoints whose write was killed, e.g. by a
+        preemption, which the process writing them could not clean up
+        :param path: path of the checkpoint
+        :return:
+        """
+        own_tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        for tmp_path in glob.glob(glob.escape(path) + '.*.tmp'):
+            if tmp_path != own_tmp_path:
+                os.remove(tmp_path)
+
+    def _remove_checkpoint(self):
+        """
+        Removes the checkpoint of a search that ended, and the partial ones left behind
+        """
+        path = self._output_path(REL_PATH_TO_CHECKPOINT)
+        if self.checkpoint_interval is None and not self.resume:
+            return
+        self.__remove_partial_checkpoints(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _record_node(self, search_tree: SearchTree, state: int, node: int, g: int, h: int = 0):
+        """
+        Records a visited node of a search tree, linked to the record of its parent
+        :param search_tree:
+        :param state: packed board state of node
+        :param node:
+        :param g: g(n)
+        :param h: h(n)
+        :return:
+        """
+        search_tree.set_record(node, self.trace.record(state, search_tree.get_move(node), g, h,
+                                                       search_tree.get_parent_record(node)))
+
+    def _record_path(self, move_snapshots: List[MoveSnapshot]):
+        """
+        Records the boards along a solution path, each one the parent of the next, for the
+        strategies exploring no state space
+        :param move_snapshots:
+        :return:
+        """
+        identifiers = BitBoard.get_identifiers(self.game.size)
+        parent = NO_PARENT
+        for move_snapshot in move_snapshots:
+            move_index = ROOT_MOVE if parent == NO_PARENT else identifiers.index(move_snapshot.token)
+            parent = self.trace.record(move_snapshot.board_state, move_index, move_snapshot.depth, parent=parent)
+
+    def _write_output(self, rel_path: str, lines):
+        """
+        Writes an output file atomically: lines go to a temporary file that is renamed over the
+        output once complete, so concurrent workers never leave a partial file behind
+        :param rel_path: REL_PATH_TO_SOLUTION or REL_PATH_TO_SEARCH
+        :param lines: iterable of lines, including their line feed
+        :return:
+        """
+        abs_path = self._output_path(rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(abs_path, os.getpid())
+        try:
+            with open(tmp_path, "w") as out_f:
+                out_f.writelines(lines)
+            os.replace(tmp_path, abs_path)
+        except BaseException:
+            # e.g. a timeout raised while writing
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_solution(self, move_snapshots: List[MoveSnapshot]):
+        """
+        Writes the solution file, one move snapshot per line
+        :param move_snapshots: solution path, empty if no solution was found
+        :return:
+        """
+        if len(move_snapshots) == 0:
+            self._write_output(REL_PATH_TO_SOLUTION, [NO_SOLUTION])
+        else:
+            self._write_output(REL_PATH_TO_SOLUTION,
+                               (move_snapshot.__str__() + '\n' for move_snapshot in move_snapshots))
+
 
 class DepthFirstSearchStrategy(SearchStrategy):
     """
     Depth-first search strategy
     Follows the concept of depth-limited search
+    Children can be uncovered by the NumPy VectorizedExpander when vectorized is set
+    The search file is streamed by a trace sink as boards are visited, see TRACE_TEXT/GZIP/NONE
+    With more than one worker, the strategy searches down to split_depth and hands the boards
+    reached there to worker processes, as subtrees searched depth first, see SubtreeWorker.
+    Workers share the depth of the shortest solution found, so branches which cannot beat it are
+    pruned in all of them, and the solution is still the shortest one found within max_depth.
+    Each subtree has its own closed list, so boards pruned by the sequential search may be
+    searched again in another subtree. The parts of the search file written by the subtrees are
+    appended in the order the subtrees were split.
+    Only the sequential search is checkpointed, see SearchCheckpoint.
     """
 
     name = DFS
 
-    def __init__(self, game: Game):
+    def __init__(self, game: Game, vectorized: bool = False, symmetry: bool = False, trace: str = TRACE_TEXT,
+                 workers: int = 1, split_depth: int = PARALLEL_DFS_SPLIT_DEPTH, checkpoint_interval: float = None,
+                 resume: bool = False):
+        if workers > 1 and (checkpoint_interval is not None or resume):
+            raise ValueError('Only the sequential DFS is checkpointed')
         self.game = game
-        self.current_depth = 0
+        self.symmetry = symmetry
         self.max_depth = game.max_depth
-        self.open_list = []  # type: List[Tuple[Board, MoveSnapshot]]
-        self.closed_list_set = set()
-        self.result_move_snapshots = []  # type: List[MoveSnapshot]
+        self.expander = VectorizedExpander(game.size) if vectorized else None
+        self.workers = workers
+        self.split_depth = max(split_depth, 1)
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.trace_mode = trace
+        self.search_tree = SearchTree()
+        self.open_list = []  # type: List[Tuple[int, int]]
+        self.closed_list_set = set()  # type: Set[int]
         self.shortest_move_snapshots = []  # type: List[MoveSnapshot]
-        self.search_seq_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=False)
+
+    def cache_class(self) -> str:
+        # subtrees do not share their closed lists, which may change the solution
+        return SearchStrategy.cache_class(self) + ('/parallel' if self.workers > 1 else '')
 
     def _generate_output(self):
         """
         Generates the solution and search files for DFS
         Particularity: finds the shortest path, as per the problem statement
         """
-        cur_dir = os.path.dirname(__file__)
-        # solution file
-        abs_sol_path = os.path.join(cur_dir, REL_PATH_TO_SOLUTION.format(self.game.game_id, self.name))
-        sol_f = open(abs_sol_path, "w+")
-        if len(self.shortest_move_snapshots) == 0:
-            sol_f.write(NO_SOLUTION)
-        else:
-            for shortest_move_snapshot in self.shortest_move_snapshots:
-                sol_f.write(shortest_move_snapshot.__str__() + '\n')
-        sol_f.close()
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(self.shortest_move_snapshots)
+            self.trace.close()
+
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.shortest_move_snapshots
 
-        # search file
-        abs_srch_path = os.path.join(cur_dir, REL_PATH_TO_SEARCH.format(self.game.game_id, self.name))
-        srch_f = open(abs_srch_path, "w+")
-        for search_seq_snapshot in self.search_seq_snapshots:
-            srch_f.write("0\t0\t0\t{}\n".format(search_seq_snapshot.board_snapshot.replace(' ', '')))
-        srch_f.close()
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.shortest_move_snapshots = move_snapshots
 
-    def __alert_end(self):
+    def _alert_end(self):
         """
         Prints to console the shortest path for DFS and/or status of the search
         """
@@ -90,129 +368,255 @@ class DepthFirstSearchStrategy(SearchStrategy):
             print("\n{}".format(NO_SOLUTION))
         self._generate_output()
 
+    def __search_subtrees(self, subtrees: List[Tuple[int, int]], shortest_depth: int, size: int) -> Optional[List[int]]:
+        """
+        Runs the workers until every subtree was searched, appending the parts of the search file
+        :param subtrees: (state, node) of the roots of the subtrees, in the order they were split
+        :param shortest_depth: depth of the shortest solution found before the split
+        :param size:
+        :return: moves of the shortest solution found in the subtrees, None if none was shorter
+        """
+        tasks = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+        pending = multiprocessing.Value('i', len(subtrees))
+        idle = multiprocessing.Value('i', 0)
+        next_task_id = multiprocessing.Value('i', len(subtrees))
+        shortest = multiprocessing.Value('i', shortest_depth)
+        stop_event = multiprocessing.Event()
+
+        for task_id, (state, node) in enumerate(subtrees):
+            tasks.put(SubtreeTask(task_id, self.search_tree.get_path_moves(node), state, NO_DONOR,
+                                  self.search_tree.get_parent_record(node)))
+
+        search_path = self._output_path(REL_PATH_TO_SEARCH)
+        processes = [multiprocessing.Process(target=run_subtree_worker,
+                                             args=(size, self.max_depth, self.symmetry, self.trace_mode, search_path,
+                                                   self.name, frozenset(self.closed_list_set), tasks, results,
+                                                   pending, idle, next_task_id, shortest, stop_event),
+                                             daemon=True)
+                     for _ in range(min(self.workers, len(subtrees)))]
+
+        completed = {}  # type: Dict[int, Tuple]
+        # first record id of every merged part, their tasks may have handed subtrees over
+        offsets = {}  # type: Dict[int, int]
+        shortest_moves = None
+        try:
+            for process in processes:
+                process.start()
+
+            while pending.value != 0 or len(offsets) < next_task_id.value:
+                self._check_cancelled(0)
+                try:
+                    result = results.get(timeout=IDLE_WAIT)
+                    completed[result.task_id] = result
+                except queue.Empty:
+                    if not all(process.is_alive() for process in processes) and pending.value != 0:
+                        raise Exception('A worker of DFS ended before the search')
+
+                # parts are merged in the order of their tasks, after the part of their donor
+                while len(offsets) in completed:
+                    result = completed.pop(len(offsets))
+                    offsets[result.task_id] = len(self.trace)
+                    parent = result.parent if result.donor == NO_DONOR else offsets[result.donor] + result.parent
+                    self.trace.merge(result.part_path, result.n_records, parent)
+                    self.metrics.add(result.metrics)
+                    if result.moves is not None \
+                            and (shortest_moves is None or len(result.moves) < len(shortest_moves)):
+                        shortest_moves = result.moves
+
+        finally:
+            stop_event.set()
+            for process in processes:
+                if process.pid is None:
+                    # not started
+                    continue
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+
+            # parts of a search that did not end
+            while True:
+                try:
+                    result = results.get_nowait()
+                    completed[result.task_id] = result
+                except queue.Empty:
+                    break
+            for result in completed.values():
+                if result.part_path is not None and os.path.exists(result.part_path):
+                    os.remove(result.part_path)
+
+        return shortest_moves
+
     def execute(self, board: Board):
-        self.current_depth = 1
-        self.open_list.append((board, MoveSnapshot('0 ', board.__str__(), self.current_depth)))
+        size = board.size
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        initial_state = BitBoard.from_board(board)
+        shortest_node = -1
+        # roots of the subtrees handed to the workers
+        subtrees = []  # type: List[Tuple[int, int]]
+
+        checkpoint = self._read_checkpoint(initial_state)
+        if checkpoint is not None:
+            self.open_list = [(state, node) for state, node, _, _, _ in checkpoint.open_entries]
+            shortest_node = checkpoint.best_node
+        else:
+            self.open_list.append((initial_state, self.search_tree.add_root()))
 
         while len(self.open_list) != 0:
-            board_to_test, snapshot = self.open_list.pop()
-            self.search_seq_snapshots.append(snapshot)
+            self._check_cancelled(len(self.trace))
+            if self._checkpoint_due(len(self.trace)):
+                self._write_checkpoint(initial_state, [(state, node, 0, 0, 0) for state, node in self.open_list], {},
+                                       shortest_node)
+            state_to_test, node = self.open_list.pop()
+            self.metrics.n_pops += 1
+            depth = self.search_tree.get_depth(node)
+            if self.workers > 1 and depth == self.split_depth and state_to_test != 0:
+                subtrees.append((state_to_test, node))
+                continue
 
-            if board_to_test.is_final_state():
-                self.result_move_snapshots.append(snapshot)
+            self._record_node(self.search_tree, state_to_test, node, depth)
 
+            if state_to_test == 0:
                 # keep state of shortest path
-                if len(self.result_move_snapshots) < len(self.shortest_move_snapshots) \
-                        or len(self.shortest_move_snapshots) == 0:
-                    self.shortest_move_snapshots = self.result_move_snapshots.copy()
-                self.result_move_snapshots.pop()
-            else:
-                self.closed_list_set.add(board_to_test.get_state_stream())
+                if shortest_node < 0 or depth < self.search_tree.get_depth(shortest_node):
+                    shortest_node = node
+                continue
 
-            # analyze board state from open list
-            if self.current_depth + 1 > self.max_depth:
-                self.current_depth = snapshot.depth
-                self.result_move_snapshots = self.result_move_snapshots[0:snapshot.depth - 1]
+            self.closed_list_set.add(self._state_key(state_to_test))
+
+            # the root sits at depth 1 of the depth-limited search, and children that cannot
+            # beat the shortest solution found so far are not worth uncovering
+            if depth + 1 >= self.max_depth \
+                    or (shortest_node >= 0 and depth + 1 >= self.search_tree.get_depth(shortest_node)):
                 continue
+
+            start = time.perf_counter()
+            children = []  # type: List[Tuple[int, int]]
+
+            # uncover children, touching a token is a single XOR with its mask
+            if self.expander is not None:
+                _, move_indices, new_states, _ = self.expander.expand([state_to_test], self.closed_list_set,
+                                                                      self._state_key if self.symmetry else None)
+                children = list(zip(new_states, move_indices))
             else:
-                self.result_move_snapshots.append(snapshot)
-                self.current_depth += 1
-
-            children: List[Tuple[Board, MoveSnapshot]] = []
-
-            # uncover children
-            for x_token in range(board.size):
-                for y_token in range(board.size):
-
-                    new_board = Board(board_to_test.get_state_stream(), board.size)
-                    token_to_test = new_board.content[x_token][y_token]
-
-                    x = token_to_test.x
-                    y = token_to_test.y
-
-                    # change state after touch
-                    new_board.content[x][y].flip()
-                    if x > 0:
-                        new_board.content[x - 1][y].flip()
-                    if x < (len(new_board.content) - 1):
-                        new_board.content[x + 1][y].flip()
-                    if y > 0:
-                        new_board.content[x][y - 1].flip()
-                    if y < (len(new_board.content[x]) - 1):
-                        new_board.content[x][y + 1].flip()
-
-                    if new_board.get_state_stream() not in self.closed_list_set:
-                        children.insert(0, (
-                            new_board,
-                            MoveSnapshot(token_to_test.get_identifier(), new_board.__str__(), self.current_depth)
-                        ))
-
-            # sort children according to first occurrence of a white
+                for move_index, toggle_mask in enumerate(toggle_masks):
+                    new_state = state_to_test ^ toggle_mask
+
+                    if self._state_key(new_state) not in self.closed_list_set:
+                        children.append((new_state, move_index))
+
+            # sort children according to first occurrence of a white, packed states
+            # compare like their state streams
             children = sorted(children,
-                              key=lambda _board_snapshot_tuple: _board_snapshot_tuple[0],
+                              key=lambda _state_move_tuple: _state_move_tuple[0],
                               reverse=True)
-            # print(children)
-            self.open_list += children
+            self.open_list += [(new_state, self.search_tree.add(node, move_index))
+                               for new_state, move_index in children]
+
+            self.metrics.n_expanded += 1
+            self.metrics.n_generated += len(toggle_masks)
+            self.metrics.n_duplicates += len(toggle_masks) - len(children)
+            self.metrics.pushed(len(self.open_list), len(children))
+            self.metrics.phase_times[EXPANSION] += time.perf_counter() - start
+
+        shortest_moves = None if shortest_node < 0 else self.search_tree.get_path_moves(shortest_node)
+        if len(subtrees) != 0:
+            subtree_moves = self.__search_subtrees(
+                subtrees, NO_SHORTEST if shortest_node < 0 else self.search_tree.get_depth(shortest_node), size)
+            if subtree_moves is not None:
+                shortest_moves = subtree_moves
 
-        self.__alert_end()
+        if shortest_moves is not None:
+            self.shortest_move_snapshots = SearchTree.replay_moves(shortest_moves, initial_state, size)
+
+        self._alert_end()
+        self._remove_checkpoint()
 
 
 class HeuristicSearchStrategy(SearchStrategy):
     """
-    Strategy model that holds the heuristic function used for heuristic-based search
+    Strategy model that holds the heuristic function used for heuristic-based search, picked by
+    name from HEURISTICS
+    The open list is either a MappedQueue (binary heap) or a BucketQueue, which fits the small
+    integer priorities of the searches. Only the BucketQueue breaks ties, optionally in favour
+    of the deepest node.
+    When vectorized is set, up to batch_size nodes are polled per iteration and their children
+    are uncovered and evaluated at once by the NumPy VectorizedExpander. Polling more than one
+    node at a time may expand a node before a better child of the previous one.
+    When symmetry is set, the open and closed lists hold one board per class of symmetric boards.
+    Checkpoints are taken between two batches, see SearchCheckpoint.
     """
 
-    def __init__(self, game: Game):
+    def __init__(self, game: Game, open_list_type: str = MAPPED_QUEUE, prefer_deeper: bool = False,
+                 vectorized: bool = False, batch_size: int = 1, symmetry: bool = False, heuristic: str = CHECKERED,
+                 trace: str = TRACE_TEXT, checkpoint_interval: float = None, resume: bool = False):
         self.game = game
-        self.current_depth = -1
-        self.open_list = MappedQueue()  # type: MappedQueue[OpenListSnapshot]
-        self.open_list_dict = {}  # type: {str: int}
-        self.closed_list_set = set()  # type: Set[str]
+        self.symmetry = symmetry
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.search_tree = SearchTree()
+        self.open_list_type = open_list_type
+        self.prefer_deeper = prefer_deeper
+        self.open_list = self._build_open_list(open_list_type, prefer_deeper)
+        self.heuristic = build_heuristic(heuristic, game.size)
+        self.expander = VectorizedExpander(game.size, self.heuristic) if vectorized else None
+        self.batch_size = max(batch_size, 1) if vectorized else 1
+        self.open_list_dict = {}  # type: {int: int}
+        self.closed_list_set = set()  # type: Set[int]
         self.result_move_snapshots = []  # type: List[MoveSnapshot]
-        self.search_path_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=True)
 
     @property
     @abstractmethod
     def name(self):
         pass
 
-    @abstractmethod
-    def _build_new_open_list_snapshot(self, new_board: Board, token_to_test: Token) -> OpenListSnapshot:
+    def cache_class(self) -> str:
+        # ties are broken by the open list, and batches may change the order of the expansions
+        return '{}/{}/{}/{}/{}'.format(SearchStrategy.cache_class(self), self.heuristic.name, self.open_list_type,
+                                       int(self.prefer_deeper), self.batch_size)
+
+    def _build_open_list(self, open_list_type: str, prefer_deeper: bool):
         """
-        Defines the parameters of the priority with which the move is added to the priority queue
-        :param new_board:
-        :param token_to_test:
+        Builds the priority queue backing the open list
+        :param open_list_type: MAPPED_QUEUE or BUCKET_QUEUE
+        :param prefer_deeper: among equal priorities, poll the deepest node first (BUCKET_QUEUE only)
         :return:
         """
+        if open_list_type == BUCKET_QUEUE:
+            tie_breaker = None
+            if prefer_deeper:
+                tie_breaker = lambda _open_list_snapshot: -self.search_tree.get_depth(_open_list_snapshot.node)
+            return BucketQueue(tie_breaker=tie_breaker)
+        elif open_list_type == MAPPED_QUEUE:
+            return MappedQueue()
+
+        raise ValueError('Unknown open list type {}'.format(open_list_type))
+
+    @abstractmethod
+    def _path_cost(self, depth: int) -> int:
+        """
+        Defines the parameters of the priority with which the move is added to the priority queue,
+        the priority being f(n) = g(n) + h(n)
+        :param depth: depth of the new state in the search tree
+        :return: g(n)
+        """
         pass
 
     def _generate_output(self, no_solution=False):
         """
         Generates the solution and search files
         """
+        with self.metrics.timing(OUTPUT):
+            self._write_solution([] if no_solution else self.result_move_snapshots)
+            self.trace.close()
 
-        cur_dir = os.path.dirname(__file__)
-        # solution file
-        abs_sol_path = os.path.join(cur_dir, REL_PATH_TO_SOLUTION.format(self.game.game_id, self.name))
-        sol_f = open(abs_sol_path, "w+")
-        if no_solution:
-            sol_f.write(NO_SOLUTION)
-        else:
-            for result_move_snapshot in self.result_move_snapshots:
-                sol_f.write(result_move_snapshot.__str__() + '\n')
-        sol_f.close()
-
-        # search file
-        abs_srch_path = os.path.join(cur_dir, REL_PATH_TO_SEARCH.format(self.game.game_id, self.name))
-        srch_f = open(abs_srch_path, "w+")
-        for search_path_snapshot in self.search_path_snapshots:
-            srch_f.write('{}\t{}\t{}\t{}\n'
-                         .format(search_path_snapshot.f_of_n,
-                                 search_path_snapshot.g_of_n,
-                                 search_path_snapshot.h_of_n,
-                                 search_path_snapshot.__str__())
-                         )
-        srch_f.close()
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.result_move_snapshots
+
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.result_move_snapshots = move_snapshots
 
     def _alert_end(self, no_solution=False):
         """
@@ -232,204 +636,936 @@ class HeuristicSearchStrategy(SearchStrategy):
         self._generate_output(no_solution)
         pass
 
-    def _is_even(self, number: int) -> bool:
+    def _uncover_children(self, batch: List[OpenListSnapshot], toggle_masks: List[int]):
         """
-        Helper to determine if a number is even
-        :param number:
-        :return:
+        Uncovers the children of a batch of polled nodes that are not in the closed list
+        :param batch: polled open list snapshots
+        :param toggle_masks:
+        :return: generator of parent snapshot, touched token, packed state, key and h(n) of every child
+        The time spent in the heuristic is only measured apart when children are uncovered one at a time
         """
-        return number % 2 == 0
+        if self.expander is not None:
+            parent_positions, move_indices, new_states, h_values = self.expander.expand(
+                [open_list_snapshot.board_state for open_list_snapshot in batch], self.closed_list_set,
+                self._state_key if self.symmetry else None)
+            for parent_position, move_index, new_state, h_of_n in zip(parent_positions, move_indices,
+                                                                      new_states, h_values):
+                yield batch[parent_position], move_index, new_state, self._state_key(new_state), h_of_n
+            return
+
+        for open_list_snapshot in batch:
+            state_to_test = open_list_snapshot.board_state
+            children = []  # type: List[Tuple[int, int, int]]
+            for move_index, toggle_mask in enumerate(toggle_masks):
+                new_state = state_to_test ^ toggle_mask
+                new_key = self._state_key(new_state)
+
+                if new_key not in self.closed_list_set:
+                    children.append((move_index, new_state, new_key))
+
+            # evaluated at once, so that the heuristic is timed once per parent
+            start = time.perf_counter()
+            h_values = [self.heuristic.evaluate_child(state_to_test, open_list_snapshot.h_of_n, move_index, new_state)
+                        for move_index, new_state, _ in children]
+            self.metrics.phase_times[HEURISTIC] += time.perf_counter() - start
+
+            for (move_index, new_state, new_key), h_of_n in zip(children, h_values):
+                yield open_list_snapshot, move_index, new_state, new_key, h_of_n
+
+    def execute(self, board: Board):
+        size = board.size
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        initial_state = BitBoard.from_board(board)
+        checkpoint = self._read_checkpoint(initial_state)
+        if checkpoint is not None:
+            # pushed in the order they are polled, which the open list keeps
+            for state, node, priority, g_of_n, h_of_n in checkpoint.open_entries:
+                self.open_list.push(OpenListSnapshot(state, node, priority, g_of_n, h_of_n, self._state_key(state)))
+            self.open_list_dict = checkpoint.open_priorities
+        else:
+            self.open_list.push(OpenListSnapshot(initial_state, self.search_tree.add_root(), 0,
+                                                 0, self.heuristic.evaluate(initial_state),
+                                                 self._state_key(initial_state)))
+            self.metrics.pushed(len(self.open_list))
+        solution_node = -1
+        iteration = 0
+
+        try:
+            while self.open_list.__len__() != 0 and solution_node < 0:
+                iteration += 1
+                if self._checkpoint_due(iteration):
+                    self._write_checkpoint(initial_state,
+                                           [(open_list_snapshot.board_state, open_list_snapshot.node,
+                                             open_list_snapshot.priority, open_list_snapshot.g_of_n,
+                                             open_list_snapshot.h_of_n) for open_list_snapshot in self.open_list],
+                                           self.open_list_dict)
+                batch = []  # type: List[OpenListSnapshot]
+
+                while self.open_list.__len__() != 0 and len(batch) < self.batch_size:
+                    self._check_cancelled(len(self.trace))
+                    open_list_snapshot: OpenListSnapshot = self.open_list.pop()  # poll from priority queue
+                    self.metrics.n_pops += 1
+                    state_to_test: int = open_list_snapshot.get_board_state()
+                    node: int = open_list_snapshot.get_node()
+
+                    self._record_node(self.search_tree, state_to_test, node,
+                                      open_list_snapshot.g_of_n, open_list_snapshot.h_of_n)
+
+                    # check for end conditions, the path is only rebuilt once the goal is reached
+                    if state_to_test == 0:
+                        solution_node = node
+                        break
+                    elif len(self.trace) > self.game.max_length:
+                        raise ExceedingSearchPathLengthError("Assuming no solution for BFS")
+
+                    self.closed_list_set.add(open_list_snapshot.key)
+                    batch.append(open_list_snapshot)
+
+                if solution_node >= 0:
+                    break
+
+                start = time.perf_counter()
+                n_removes = self.metrics.n_removes
+                open_list_size = self.open_list.__len__()
+                for parent_snapshot, move_index, new_state, new_key, h_of_n in self._uncover_children(batch,
+                                                                                                      toggle_masks):
+                    depth = self.search_tree.get_depth(parent_snapshot.node) + 1
+                    g_of_n = self._path_cost(depth)
+                    new_priority = g_of_n + h_of_n
+
+                    if new_key in self.open_list_dict:
+                        if self.open_list_dict[new_key] <= new_priority:
+                            continue
+                        # removal matches the queued snapshot holding the same key
+                        self.open_list.remove(OpenListSnapshot(new_state, -1, new_priority, key=new_key))
+                        self.metrics.n_removes += 1
+
+                    self.open_list.push(OpenListSnapshot(new_state,
+                                                         self.search_tree.add(parent_snapshot.node, move_index),
+                                                         new_priority,
+                                                         g_of_n,
+                                                         h_of_n,
+                                                         new_key))
+                    self.open_list_dict[new_key] = new_priority
+
+                # children are either pushed or rejected, by the closed list or by a better queued duplicate,
+                # and the open list only grew since the nodes were polled
+                n_pushes = self.open_list.__len__() - open_list_size + self.metrics.n_removes - n_removes
+                self.metrics.pushed(self.open_list.__len__(), n_pushes)
+                self.metrics.n_expanded += len(batch)
+                self.metrics.n_generated += len(batch) * len(toggle_masks)
+                self.metrics.n_duplicates += len(batch) * len(toggle_masks) - n_pushes
+                self.metrics.phase_times[EXPANSION] += time.perf_counter() - start
+
+            if solution_node >= 0:
+                self.result_move_snapshots = self.search_tree.build_move_snapshots(solution_node, initial_state, size)
+            self._alert_end(solution_node < 0)
+
+        except ExceedingSearchPathLengthError:
+            self._alert_end(True)
+
+        self._remove_checkpoint()
+
 
-    def _build_expected_even_stream(self, n: int, start_char: str) -> List[str]:
+class BestFirstSearchStrategy(HeuristicSearchStrategy):
+    """
+    Best-first search strategy
+    Follows the concept of a heuristic search, while choosing the smallest
+    return value for a heuristic function from the open list
+    """
+
+    name = BeFS
+
+    def __init__(self, game: Game, open_list_type: str = MAPPED_QUEUE, prefer_deeper: bool = False,
+                 vectorized: bool = False, batch_size: int = 1, symmetry: bool = False, heuristic: str = CHECKERED,
+                 trace: str = TRACE_TEXT, checkpoint_interval: float = None, resume: bool = False):
+        HeuristicSearchStrategy.__init__(self, game, open_list_type, prefer_deeper, vectorized, batch_size,
+                                         symmetry, heuristic, trace, checkpoint_interval, resume)
+
+    def _path_cost(self, depth: int) -> int:
         """
-        Builds the expected stream of characters expected for the even case of checkered-state
-        :param n:
-        :param start_char:
+        Adds to priority queue solely with knowledge of heuristic function h(n)
+        :param depth:
         :return:
         """
-        row_switcher = '1' if start_char == '1' else '0'
-        expected_stream = []
+        return 0
+
+
+class AStarSearchStrategy(HeuristicSearchStrategy):
+    """
+    A* search strategy, assumes heuristic function is admissible,
+    where h(n) <= h*(n)
+    """
 
-        for x in range(n):
-            switcher = '1' if row_switcher == '1' else '0'
-            for y in range(n):
-                expected_stream.append(switcher)
-                switcher = '0' if switcher == '1' else '1'
-            row_switcher = '0' if row_switcher == '1' else '1'
+    name = ASTAR
 
-        return expected_stream
+    def __init__(self, game: Game, open_list_type: str = MAPPED_QUEUE, prefer_deeper: bool = False,
+                 vectorized: bool = False, batch_size: int = 1, symmetry: bool = False, heuristic: str = CHECKERED,
+                 trace: str = TRACE_TEXT, checkpoint_interval: float = None, resume: bool = False):
+        HeuristicSearchStrategy.__init__(self, game, open_list_type, prefer_deeper, vectorized, batch_size,
+                                         symmetry, heuristic, trace, checkpoint_interval, resume)
+        # solutions are the shortest ones with an admissible heuristic, when nodes are polled one at a time
+        self.is_optimal = self.heuristic.admissible and self.batch_size == 1
 
-    def checkered_heuristic(self, board: Board) -> int:
+    def _path_cost(self, depth: int) -> int:
         """
-        Looks for the number of inconsistencies from an expected state where all the tokens are
-        positioned in a checkered position relative to one another.
-        Assumed to be admissible, see report for example
-        :param board:
+        Adds to priority queue with heuristic function h(n) but also with actual cost
+        function g(n)
+        :param depth:
         :return:
         """
-        board_state_stream: str = board.get_state_stream()
-        inconsistencies = 0
+        start_to_current: int = depth  # g(n)
+        return start_to_current
+
+
+class HashDistributedAStarStrategy(SearchStrategy):
+    """
+    Hash-distributed A* (HDA*) search strategy
+    Every board is owned by one of workers processes, picked by a hash of the board, which keeps
+    it in its own open list and closed list. Workers expand their best nodes and send the children
+    they do not own to their owners, in batches over queues, so node throughput grows with the
+    number of cores.
+    The search ends once every worker waits with an empty open list and every child sent was
+    received, the counters of all workers being read at once. Workers drop the nodes whose f(n)
+    is not below the best solution found, so with an admissible heuristic no shorter solution
+    is left when the search ends, and the solution is the shortest one.
+    The search stops without solution once max_length nodes were expanded, as for A*. The search
+    file holds the boards along the solution path, as the expansions happen in several processes.
+    """
 
-        # if board is perfect set to max priority
-        if board.is_final_state():
-            return 0
+    name = HDASTAR
 
-        if self._is_even(board.size):
-            expected_stream = self._build_expected_even_stream(board.size, board_state_stream[0])
-            actual_stream = list(board_state_stream)
+    def __init__(self, game: Game, workers: int = None, symmetry: bool = False, heuristic: str = CHECKERED,
+                 trace: str = TRACE_TEXT):
+        if workers is not None and workers < 1:
+            raise ValueError('HDA* needs at least one worker, not {}'.format(workers))
+        self.game = game
+        self.symmetry = symmetry
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.heuristic = build_heuristic(heuristic, game.size)
+        # the workers build the heuristic the strategy fell back on, if any
+        self.heuristic_name = self.heuristic.name
+        self.is_optimal = self.heuristic.admissible
+        self.n_expanded = 0
+        self.result_move_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=True)
 
-            if len(expected_stream) != len(actual_stream):
-                raise Exception('Board state length does not match expected state length')
+    def cache_class(self) -> str:
+        return '{}/{}'.format(SearchStrategy.cache_class(self), self.heuristic.name)
 
-            inconsistencies = sum(1 for i, j in zip(expected_stream, actual_stream) if i != j)
+    def _generate_output(self):
+        """
+        Generates the solution and search files, in the format of BeFS and A*
+        """
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(self.result_move_snapshots)
+            self._record_path(self.result_move_snapshots)
+            self.trace.close()
 
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.result_move_snapshots
+
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.result_move_snapshots = move_snapshots
+
+    def _alert_end(self):
+        """
+        Prints to console the resulting sequence
+        """
+        if len(self.result_move_snapshots) != 0:
+            print("\n{}\n".format(FOUND_SOLUTION))
+            for result_move_snapshot in self.result_move_snapshots:
+                print(result_move_snapshot)
         else:
-            # TODO: could be generator
-            switcher = '1' if board_state_stream.startswith('1') else '0'
+            print("\n{}".format(NO_SOLUTION))
+        self._generate_output()
 
-            for char in board_state_stream:
-                if char != switcher:
-                    inconsistencies += 1
-                switcher = '0' if switcher == '1' else '1'
+    def __search(self, initial_state: int, size: int) -> Optional[int]:
+        """
+        Runs the workers until the search ends
+        :param initial_state:
+        :param size:
+        :return: touched tokens of the solution, bit i standing for token i, None if there is none
+        """
+        inboxes = [multiprocessing.Queue() for _ in range(self.workers)]
+        results = multiprocessing.Queue()
+        status = multiprocessing.Array('q', self.workers * STATUS_FIELDS)
+        expanded = multiprocessing.Value('q', 0)
+        incumbent = multiprocessing.Value('i', NO_INCUMBENT)
+        stop_event = multiprocessing.Event()
+
+        # the root counts as a child sent by the strategy
+        inboxes[owner_of(self._state_key(initial_state), self.workers)].put(
+            [(initial_state, 0, self.heuristic.evaluate(initial_state), 0)])
+        n_sent = 1
+
+        processes = [multiprocessing.Process(target=run_worker,
+                                             args=(index, self.workers, size, self.heuristic_name, self.symmetry,
+                                                   inboxes, results, status, expanded, incumbent, stop_event),
+                                             daemon=True)
+                     for index in range(self.workers)]
+
+        try:
+            for process in processes:
+                process.start()
+
+            while True:
+                self._check_cancelled(0)
+                if expanded.value > self.game.max_length:
+                    raise ExceedingSearchPathLengthError("Assuming no solution for HDA*")
+
+                with status.get_lock():
+                    snapshot = status[:]
+                if all(snapshot[STATUS_IDLE::STATUS_FIELDS]) \
+                        and n_sent + sum(snapshot[STATUS_SENT::STATUS_FIELDS]) == sum(
+                            snapshot[STATUS_RECEIVED::STATUS_FIELDS]):
+                    break
 
-        return inconsistencies
+                if not all(process.is_alive() for process in processes):
+                    raise Exception('A worker of HDA* ended before the search')
+                time.sleep(IDLE_WAIT)
+
+        finally:
+            stop_event.set()
+            for process in processes:
+                if process.pid is None:
+                    # not started
+                    continue
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+            self.n_expanded = expanded.value
+            # every expansion generates all the children, the workers count nothing else
+            self.metrics.n_expanded = self.n_expanded
+            self.metrics.n_generated = self.n_expanded * size * size
+
+        solution = None
+        while not results.empty():
+            g_of_n, touched = results.get()
+            if solution is None or g_of_n < solution[0]:
+                solution = (g_of_n, touched)
+        return solution[1] if solution is not None else None
 
     def execute(self, board: Board):
-        self.open_list.push(OpenListSnapshot(board, MoveSnapshot('0 ', board.__str__()), 0))
+        size = board.size
+        initial_state = BitBoard.from_board(board)
 
         try:
-            while self.open_list.__len__() != 0:
-                open_list_snapshot: OpenListSnapshot = self.open_list.pop()  # poll from priority queue
-                board_to_test: Board = open_list_snapshot.get_board()
-                snapshot: MoveSnapshot = open_list_snapshot.get_move_snapshot()
-                self.search_path_snapshots.append(snapshot)
-
-                # handle an element polled from priority queue that does not follow current solution path
-                if snapshot.depth != self.current_depth:
-                    self.current_depth = snapshot.depth
-                    self.result_move_snapshots = self.result_move_snapshots[0:snapshot.depth+1]
-
-                # check for end conditions
-                if board_to_test.is_final_state():
-                    self.result_move_snapshots.append(snapshot)
-                    break
-                elif len(self.search_path_snapshots) > self.game.max_length:
-                    raise ExceedingSearchPathLengthError("Assuming no solution for BFS")
-                self.current_depth += 1
+            touched = 0 if initial_state == 0 else self.__search(initial_state, size)
+            if touched is not None:
+                self.result_move_snapshots = SearchTree.replay_moves(
+                    [move_index for move_index in range(size * size) if touched >> move_index & 1],
+                    initial_state, size)
+        except ExceedingSearchPathLengthError:
+            pass
 
-                # add board to test to potential solution and uncover its children
-                self.result_move_snapshots.append(snapshot)
-                self.closed_list_set.add(board_to_test.get_state_stream())
+        self._alert_end()
 
-                for x_token in range(board.size):
-                    for y_token in range(board.size):
 
-                        new_board = Board(board_to_test.get_state_stream(), board.size)
-                        token_to_test = new_board.content[x_token][y_token]
+class LinearAlgebraStrategy(SearchStrategy):
+    """
+    Exact solver using Gaussian elimination over GF(2)
+    Touching a token twice cancels out and touches commute, so a solution is a set of tokens x
+    such that A x = b, where column j of A is the toggle mask of token j and b is the board.
+    Every solution is the particular one plus a vector of the null space of A, the null space is
+    enumerated to keep the one touching the fewest tokens.
+    A only depends on the size, so its pseudo-inverse comes from the shared SolveBasisCache.
+    No board is explored, symmetry is accepted like for the searches but has nothing to deduplicate.
+    """
 
-                        x = token_to_test.x
-                        y = token_to_test.y
+    name = GF2
+    is_optimal = True
+    is_complete = True
 
-                        new_board.content[x][y].flip()
-                        if x > 0:
-                            new_board.content[x - 1][y].flip()
-                        if x < (len(new_board.content) - 1):
-                            new_board.content[x + 1][y].flip()
-                        if y > 0:
-                            new_board.content[x][y - 1].flip()
-                        if y < (len(new_board.content[x]) - 1):
-                            new_board.content[x][y + 1].flip()
+    def __init__(self, game: Game, symmetry: bool = False, trace: str = TRACE_TEXT):
+        self.game = game
+        self.symmetry = symmetry
+        self.solution_move_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=False)
 
-                        new_open_list_snapshot = self._build_new_open_list_snapshot(new_board, token_to_test)
+    def _generate_output(self):
+        """
+        Generates the solution and search files
+        The search file holds the boards along the solution path, as no state space is explored
+        """
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(self.solution_move_snapshots)
+            self._record_path(self.solution_move_snapshots)
+            self.trace.close()
 
-                        if new_open_list_snapshot is not None:
-                            new_priority = new_open_list_snapshot.priority
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.solution_move_snapshots
 
-                            if new_board.get_state_stream() in self.open_list_dict:
-                                old_priority = self.open_list_dict[new_board.get_state_stream()]
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.solution_move_snapshots = move_snapshots
 
-                                if old_priority > new_priority:
-                                    self.open_list.remove(new_open_list_snapshot)
-                                    self.open_list.push(new_open_list_snapshot)
-                                    self.open_list_dict[new_board.get_state_stream()] = new_priority
-                            else:
-                                self.open_list.push(new_open_list_snapshot)
-                                self.open_list_dict[new_board.get_state_stream()] = new_priority
+    def cache_class(self) -> str:
+        # the limits of the game and the symmetry play no part
+        return self.name
 
-            self._alert_end(False)
+    def _alert_end(self):
+        """
+        Prints to console the resulting sequence
+        """
+        if len(self.solution_move_snapshots) != 0:
+            print("\n{}\n".format(FOUND_SOLUTION))
+            for solution_move_snapshot in self.solution_move_snapshots:
+                print(solution_move_snapshot)
+        else:
+            print("\n{}".format(NO_SOLUTION))
+        self._generate_output()
 
-        except ExceedingSearchPathLengthError:
-            self._alert_end(True)
+    def _touched_tokens(self, initial_state: int, size: int) -> Optional[int]:
+        """
+        :param initial_state: packed state of the initial board
+        :param size:
+        :return: tokens to touch packed like a board state, None if the board cannot be solved
+        """
+        return SolveBasisCache.get_default().get_basis(size).solve(initial_state)
 
+    def execute(self, board: Board):
+        size = board.size
+        n_cells = size * size
+        last_bit = n_cells - 1
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        identifiers = BitBoard.get_identifiers(size)
+        initial_state = BitBoard.from_board(board)
 
-class BestFirstSearchStrategy(HeuristicSearchStrategy):
+        touched = self._touched_tokens(initial_state, size)
+
+        if touched is not None:
+            state = initial_state
+            self.solution_move_snapshots.append(MoveSnapshot('0 ', state, size))
+
+            for index in range(n_cells):
+                if touched >> (last_bit - index) & 1:
+                    state ^= toggle_masks[index]
+                    self.solution_move_snapshots.append(
+                        MoveSnapshot(identifiers[index], state, size, len(self.solution_move_snapshots)))
+
+        self._alert_end()
+
+
+class LightChasingStrategy(LinearAlgebraStrategy):
     """
-    Best-first search strategy
-    Follows the concept of a heuristic search, while choosing the smallest
-    return value for a heuristic function from the open list
+    Constructive strategy for the boards too large to search
+    The LightChaser of the size touches the token below every black token row by row, then
+    fixes the last row with the top row touches read from its table, and chases again. It takes
+    O(size^2) row operations whatever the board, the touched tokens are listed like for GF2 but
+    are not always the fewest.
     """
 
-    name = BeFS
+    name = CHASE
+    is_optimal = False
+    is_complete = True
+
+    def _touched_tokens(self, initial_state: int, size: int) -> Optional[int]:
+        return LightChaser.get(size).solve(initial_state)
+
 
-    def __init__(self, game: Game):
-        HeuristicSearchStrategy.__init__(self, game)
+class IterativeDeepeningSearchStrategy(DepthFirstSearchStrategy):
+    """
+    Iterative-deepening depth-first search strategy
+    Runs depth-limited searches allowing one more touch each time, up to max_depth, and stops at
+    the first solution, which is then a shortest one. Within an iteration, a transposition table
+    keeps the shallowest depth each board was reached at: a board reached again at the same depth
+    or deeper is pruned, a board reached shallower is explored again with its larger budget.
+    Only the current path is kept on the stack, the table is bounded by table_size boards.
+    """
+
+    name = IDDFS
+    is_optimal = True
+
+    def __init__(self, game: Game, table_size: int = TRANSPOSITION_TABLE_SIZE, replacement: str = REPLACE_DEEPEST,
+                 symmetry: bool = False, trace: str = TRACE_TEXT):
+        DepthFirstSearchStrategy.__init__(self, game, symmetry=symmetry, trace=trace)
+        self.transposition_table = TranspositionTable(table_size, replacement)
+
+    def cache_class(self) -> str:
+        # the replacements of the transposition table decide which boards are explored again
+        return '{}/{}/{}'.format(SearchStrategy.cache_class(self), self.transposition_table.capacity,
+                                 self.transposition_table.policy)
 
-    def _build_new_open_list_snapshot(self, new_board: Board, token_to_test: Token) -> OpenListSnapshot:
+    def __depth_limited_search(self, initial_state: int, limit: int, size: int) -> Optional[List[int]]:
         """
-        Adds to priority queue solely with knowledge of heuristic function h(n)
-        :param new_board:
-        :param token_to_test:
-        :return:
+        Depth-first search of the boards at most limit touches away from the initial board
+        :param initial_state:
+        :param limit: maximum number of touches
+        :param size:
+        :return: touched tokens of the first solution found, None if there is none within limit
         """
+        toggle_masks = BitBoard.get_toggle_masks(size)
+
+        self.transposition_table.clear()
+        self.transposition_table.visit(self._state_key(initial_state), 0)
+        root_record = self.trace.record(initial_state)
+        if initial_state == 0:
+            return []
+
+        # current path: the touched tokens and, for every board on it, its record and its children left to visit
+        path_moves = []  # type: List[int]
+        path_records = [root_record]
+        stack = [self.__sorted_children(initial_state, toggle_masks)]
+        # children left to visit along the path
+        n_open = len(stack[-1])
+        self.metrics.pushed(n_open, n_open)
+
+        while len(stack) != 0:
+            self._check_cancelled(len(self.trace))
+            children = stack[-1]
+            if len(children) == 0:
+                stack.pop()
+                path_records.pop()
+                if len(path_moves) != 0:
+                    path_moves.pop()
+                continue
+
+            new_state, move_index = children.pop()
+            n_open -= 1
+            self.metrics.n_pops += 1
+            depth = len(path_moves) + 1
+            if not self.transposition_table.visit(self._state_key(new_state), depth):
+                self.metrics.n_duplicates += 1
+                continue
 
-        if new_board.get_state_stream() not in self.closed_list_set:
-            estimate_current_to_finish = self.checkered_heuristic(new_board)  # h(n)
-            priority_val: int = estimate_current_to_finish
-            new_move_snapshot: MoveSnapshot = MoveSnapshot(token_to_test.get_identifier(),
-                                                           new_board.__str__(),
-                                                           self.current_depth)
-            new_move_snapshot.set_eval(0, estimate_current_to_finish)
-            return OpenListSnapshot(
-                new_board,
-                new_move_snapshot,
-                priority_val
-            )
+            record = self.trace.record(new_state, move_index, depth, parent=path_records[-1])
+            if new_state == 0:
+                return path_moves + [move_index]
+
+            if depth < limit:
+                path_moves.append(move_index)
+                path_records.append(record)
+                stack.append(self.__sorted_children(new_state, toggle_masks))
+                n_open += len(stack[-1])
+                self.metrics.pushed(n_open, len(stack[-1]))
 
         return None
 
+    def __sorted_children(self, state: int, toggle_masks: List[int]) -> List[Tuple[int, int]]:
+        """
+        Children of a board, the first to visit last, by first occurrence of a white like DFS
+        """
+        start = time.perf_counter()
+        children = sorted(((state ^ toggle_mask, move_index) for move_index, toggle_mask in enumerate(toggle_masks)),
+                          reverse=True)
+        self.metrics.n_expanded += 1
+        self.metrics.n_generated += len(children)
+        self.metrics.phase_times[EXPANSION] += time.perf_counter() - start
+        return children
 
-class AStarSearchStrategy(HeuristicSearchStrategy):
+    def execute(self, board: Board):
+        size = board.size
+        initial_state = BitBoard.from_board(board)
+
+        # the root sits at depth 1 of the depth-limited search, as for DFS
+        for limit in range(self.max_depth):
+            solution_moves = self.__depth_limited_search(initial_state, limit, size)
+            if solution_moves is not None:
+                self.shortest_move_snapshots = SearchTree.replay_moves(solution_moves, initial_state, size)
+                break
+
+        self._alert_end()
+
+
+class IterativeDeepeningAStarStrategy(SearchStrategy):
     """
-    A* search strategy, assumes heuristic function is admissible,
-    where h(n) <= h*(n)
+    IDA* search strategy
+    Runs depth-first searches bounded by f(n) = g(n) + h(n), starting with the bound h(root) and
+    raising it to the smallest f(n) that exceeded it until the goal is reached. Only the current
+    path and the children left to visit along it are kept, so memory grows with the depth of the
+    search rather than with its frontier. Boards on the current path are not revisited.
+    The heuristic is picked by name from HEURISTICS, solutions are the shortest ones when it is
+    admissible.
+    The search file holds every node visited, over all iterations, and the search stops without
+    solution once max_length nodes were visited, as for BeFS and A*.
+    When symmetry is set, a board symmetric to one on the current path is not revisited either.
     """
 
-    name = ASTAR
+    name = IDASTAR
+
+    def __init__(self, game: Game, heuristic: str = CHECKERED, symmetry: bool = False, trace: str = TRACE_TEXT):
+        self.game = game
+        self.symmetry = symmetry
+        self.heuristic = build_heuristic(heuristic, game.size)
+        self.is_optimal = self.heuristic.admissible
+        self.result_move_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=True)
 
-    def __init__(self, game: Game):
-        HeuristicSearchStrategy.__init__(self, game)
+    def cache_class(self) -> str:
+        return '{}/{}'.format(SearchStrategy.cache_class(self), self.heuristic.name)
 
-    def _build_new_open_list_snapshot(self, new_board: Board, token_to_test: Token) -> OpenListSnapshot:
+    def _generate_output(self):
         """
-        Adds to priority queue with heuristic function h(n) but also with actual cost
-        function g(n)
-        :param new_board:
-        :param token_to_test:
-        :return:
+        Generates the solution and search files, in the format of BeFS and A*
         """
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(self.result_move_snapshots)
+            self.trace.close()
 
-        if new_board.get_state_stream() not in self.closed_list_set:
-            estimate_current_to_finish: int = self.checkered_heuristic(new_board)  # h(n)
-            start_to_current: int = self.current_depth  # g(n)
-            priority_val: int = estimate_current_to_finish + start_to_current  # f(n)
-            new_move_snapshot: MoveSnapshot = MoveSnapshot(token_to_test.get_identifier(),
-                                                           new_board.__str__(),
-                                                           self.current_depth)
-            new_move_snapshot.set_eval(start_to_current, estimate_current_to_finish)
-            return OpenListSnapshot(
-                new_board,
-                new_move_snapshot,
-                priority_val
-            )
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.result_move_snapshots
 
-        return None
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.result_move_snapshots = move_snapshots
+
+    def _alert_end(self):
+        """
+        Prints to console the resulting sequence
+        """
+        if len(self.result_move_snapshots) != 0:
+            print("\n{}\n".format(FOUND_SOLUTION))
+            for result_move_snapshot in self.result_move_snapshots:
+                print(result_move_snapshot)
+        else:
+            print("\n{}".format(NO_SOLUTION))
+        self._generate_output()
+
+    def __visit(self, state: int, move_index: int, g_of_n: int, h_of_n: int, parent: int) -> int:
+        """
+        Records a visited node in the search path
+        :return: record id of the node
+        """
+        self._check_cancelled(len(self.trace))
+        if len(self.trace) >= self.game.max_length:
+            raise ExceedingSearchPathLengthError("Assuming no solution for IDA*")
+
+        return self.trace.record(state, move_index, g_of_n, h_of_n, parent)
+
+    def __bounded_search(self, initial_state: int, initial_h: int, bound: int,
+                         size: int) -> Tuple[Optional[List[int]], Optional[int]]:
+        """
+        Depth-first search of the nodes whose f(n) does not exceed bound
+        :param initial_state:
+        :param initial_h: h(n) of the initial board
+        :param bound:
+        :param size:
+        :return: touched tokens of the first solution found, None if there is none within bound,
+        and the bound of the next iteration, None if no node exceeded bound
+        """
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        next_bound = None
+
+        root_record = self.__visit(initial_state, ROOT_MOVE, 0, initial_h, NO_PARENT)
+        if initial_state == 0:
+            return [], None
+
+        # current path: the touched tokens, its boards, their records and, for every board, its
+        # children left to visit
+        path_moves = []  # type: List[int]
+        path_records = [root_record]
+        path_keys = [self._state_key(initial_state)]
+        path_key_set = set(path_keys)
+        stack = [[]]  # type: List[List[Tuple[int, int, int]]]
+        # children left to visit along the path
+        n_open = 0
+
+        parent_state, parent_h = initial_state, initial_h
+        while True:
+            if parent_state is not None:
+                # uncover the children within bound, the most promising one visited first
+                start = time.perf_counter()
+                g_of_n = len(path_moves) + 1
+                candidates = [(move_index, parent_state ^ toggle_mask)
+                              for move_index, toggle_mask in enumerate(toggle_masks)
+                              if self._state_key(parent_state ^ toggle_mask) not in path_key_set]
+                self.metrics.n_duplicates += len(toggle_masks) - len(candidates)
+                heuristic_start = time.perf_counter()
+                h_values = [self.heuristic.evaluate_child(parent_state, parent_h, move_index, new_state)
+                            for move_index, new_state in candidates]
+                self.metrics.phase_times[HEURISTIC] += time.perf_counter() - heuristic_start
+
+                children = []  # type: List[Tuple[int, int, int]]
+                for (move_index, new_state), h_of_n in zip(candidates, h_values):
+                    if g_of_n + h_of_n > bound:
+                        if next_bound is None or g_of_n + h_of_n < next_bound:
+                            next_bound = g_of_n + h_of_n
+                        continue
+                    children.append((h_of_n, new_state, move_index))
+
+                stack[-1] = sorted(children, reverse=True)
+                parent_state = None
+                n_open += len(children)
+                self.metrics.n_expanded += 1
+                self.metrics.n_generated += len(toggle_masks)
+                self.metrics.pushed(n_open, len(children))
+                self.metrics.phase_times[EXPANSION] += time.perf_counter() - start
+
+            children = stack[-1]
+            if len(children) == 0:
+                stack.pop()
+                if len(stack) == 0:
+                    return None, next_bound
+                path_moves.pop()
+                path_records.pop()
+                path_key_set.discard(path_keys.pop())
+                continue
+
+            h_of_n, new_state, move_index = children.pop()
+            n_open -= 1
+            self.metrics.n_pops += 1
+            g_of_n = len(path_moves) + 1
+            record = self.__visit(new_state, move_index, g_of_n, h_of_n, path_records[-1])
+            if new_state == 0:
+                return path_moves + [move_index], None
+
+            path_moves.append(move_index)
+            path_records.append(record)
+            path_keys.append(self._state_key(new_state))
+            path_key_set.add(path_keys[-1])
+            stack.append([])
+            parent_state, parent_h = new_state, h_of_n
+
+    def execute(self, board: Board):
+        size = board.size
+        initial_state = BitBoard.from_board(board)
+        initial_h = self.heuristic.evaluate(initial_state)
+        bound = initial_h
+
+        try:
+            while bound is not None:
+                solution_moves, bound = self.__bounded_search(initial_state, initial_h, bound, size)
+                if solution_moves is not None:
+                    self.result_move_snapshots = SearchTree.replay_moves(solution_moves, initial_state, size)
+                    break
+        except ExceedingSearchPathLengthError:
+            pass
+
+        self._alert_end()
+
+
+class BidirectionalSearchStrategy(SearchStrategy):
+    """
+    Bidirectional breadth-first search strategy
+    Touching a token twice cancels out, so the boards one touch away from a board are its
+    predecessors as well as its children, and the search can grow a second frontier backwards
+    from the final state. The smaller frontier is expanded a whole layer at a time, each side
+    keeping the boards it reached in a hash map, until a child is found in the map of the other
+    side. The shortest path through the meetings of that layer is a shortest solution, rebuilt
+    from the path of each side to the meeting board. Two frontiers of depth d/2 are much smaller
+    than the frontier of depth d a unidirectional breadth-first search would need.
+    The search file holds the boards in the order they were expanded, from both sides, and the
+    search stops without solution once max_length boards were expanded.
+    When symmetry is set, the sides meet on symmetric boards and the backward path is mapped
+    through the symmetry relating them.
+    """
+
+    name = BIDIRECTIONAL
+    is_optimal = True
+
+    def __init__(self, game: Game, symmetry: bool = False, trace: str = TRACE_TEXT):
+        self.game = game
+        self.symmetry = symmetry
+        # forward from the initial board, backward from the final state
+        self.search_trees = (SearchTree(), SearchTree())
+        self.reached = ({}, {})  # type: Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]]
+        self.result_move_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=False)
+
+    def _generate_output(self):
+        """
+        Generates the solution and search files, in the format of DFS
+        """
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(self.result_move_snapshots)
+            self.trace.close()
+
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.result_move_snapshots
+
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.result_move_snapshots = move_snapshots
+
+    def _alert_end(self):
+        """
+        Prints to console the resulting sequence
+        """
+        if len(self.result_move_snapshots) != 0:
+            print("\n{}\n".format(FOUND_SOLUTION))
+            for result_move_snapshot in self.result_move_snapshots:
+                print(result_move_snapshot)
+        else:
+            print("\n{}".format(NO_SOLUTION))
+        self._generate_output()
+
+    def __expand_layer(self, direction: int, frontier: List[Tuple[int, int]], size: int,
+                       meeting: Tuple) -> Tuple[List[Tuple[int, int]], Tuple]:
+        """
+        Expands every board of a frontier
+        :param direction: 0 forward, 1 backward
+        :param frontier: packed state and node of every board of the layer
+        :param size:
+        :param meeting: shortest meeting so far, None if the sides have not met
+        :return: the next layer and the shortest meeting, as length, then the forward and the
+        backward board and node
+        """
+        toggle_masks = BitBoard.get_toggle_masks(size)
+        search_tree, other_search_tree = self.search_trees[direction], self.search_trees[1 - direction]
+        reached, other_reached = self.reached[direction], self.reached[1 - direction]
+        next_frontier = []  # type: List[Tuple[int, int]]
+
+        for state, node in frontier:
+            self._check_cancelled(len(self.trace))
+            if len(self.trace) >= self.game.max_length:
+                raise ExceedingSearchPathLengthError("Assuming no solution for bidirectional search")
+            self._record_node(search_tree, state, node, search_tree.get_depth(node))
+            self.metrics.n_pops += 1
+
+            start = time.perf_counter()
+            n_next = len(next_frontier)
+            for move_index, toggle_mask in enumerate(toggle_masks):
+                new_state = state ^ toggle_mask
+                new_key = self._state_key(new_state)
+                if new_key in reached:
+                    self.metrics.n_duplicates += 1
+                    continue
+
+                new_node = search_tree.add(node, move_index)
+                reached[new_key] = (new_state, new_node)
+                next_frontier.append((new_state, new_node))
+
+                if new_key in other_reached:
+                    other_state, other_node = other_reached[new_key]
+                    length = search_tree.get_depth(new_node) + other_search_tree.get_depth(other_node)
+                    if meeting is None or length < meeting[0]:
+                        meeting = (length, new_state, new_node, other_state, other_node) if direction == 0 \
+                            else (length, other_state, other_node, new_state, new_node)
+
+            self.metrics.n_expanded += 1
+            self.metrics.n_generated += len(toggle_masks)
+            self.metrics.pushed(len(next_frontier), len(next_frontier) - n_next)
+            self.metrics.phase_times[EXPANSION] += time.perf_counter() - start
+
+        return next_frontier, meeting
+
+    def __solution_moves(self, meeting: Tuple, size: int) -> List[int]:
+        """
+        Joins the forward path to the meeting board and the backward path from it
+        :param meeting: length, then the forward and the backward board and node
+        :param size:
+        :return: touched tokens, from the initial board to the final state
+        """
+        _, forward_state, forward_node, backward_state, backward_node = meeting
+        # the backward path reaches the meeting board from the final state, touching the same
+        # tokens in reverse order goes back
+        backward_moves = self.search_trees[1].get_path_moves(backward_node)
+        backward_moves.reverse()
+
+        if forward_state != backward_state:
+            # both boards have the same canonical form, the backward path is carried over from
+            # one to the other through it
+            _, forward_symmetry = BitBoard.canonical_form(forward_state, size)
+            _, backward_symmetry = BitBoard.canonical_form(backward_state, size)
+            to_forward = BitBoard.SYMMETRY_INVERSES[forward_symmetry]
+            backward_moves = [BitBoard.transform_move(BitBoard.transform_move(move_index, size, backward_symmetry),
+                                                      size, to_forward)
+                              for move_index in backward_moves]
+
+        return self.search_trees[0].get_path_moves(forward_node) + backward_moves
+
+    def execute(self, board: Board):
+        size = board.size
+        initial_state = BitBoard.from_board(board)
+        frontiers = []  # type: List[List[Tuple[int, int]]]
+        meeting = None
+
+        for direction, root_state in enumerate((initial_state, 0)):
+            root_node = self.search_trees[direction].add_root()
+            self.reached[direction][self._state_key(root_state)] = (root_state, root_node)
+            frontiers.append([(root_state, root_node)])
+        if self._state_key(initial_state) in self.reached[1]:
+            meeting = (0, initial_state, 0, 0, 0)
+
+        try:
+            # a side with an empty frontier has reached every board it can, without meeting the other
+            while meeting is None and len(frontiers[0]) != 0 and len(frontiers[1]) != 0:
+                direction = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+                frontiers[direction], meeting = self.__expand_layer(direction, frontiers[direction], size, meeting)
+        except ExceedingSearchPathLengthError:
+            meeting = None
+
+        if meeting is not None:
+            self.result_move_snapshots = SearchTree.replay_moves(self.__solution_moves(meeting, size),
+                                                                 initial_state, size)
+
+        self._alert_end()
+
+
+class DistanceOracleStrategy(SearchStrategy):
+    """
+    Table lookup strategy for the small boards
+    The DistanceTable of the size gives the exact distance of every board, so a shortest solution
+    is read off greedily by always touching a token leading one touch closer, without any search.
+    Only the sizes of DISTANCE_TABLE_SIZES have a table, other boards are reported unsolved.
+    """
+
+    name = ORACLE
+
+    def __init__(self, game: Game, symmetry: bool = False, trace: str = TRACE_TEXT):
+        self.game = game
+        self.symmetry = symmetry
+        self.is_optimal = self.is_complete = game.size in DISTANCE_TABLE_SIZES
+        self.solution_move_snapshots = []  # type: List[MoveSnapshot]
+        self.metrics = SearchMetrics()
+        self.trace = self._open_trace(trace, evaluated=False)
+
+    def _generate_output(self):
+        """
+        Generates the solution and search files
+        The search file holds the boards along the solution path, as no state space is explored
+        """
+        with self.metrics.timing(OUTPUT):
+            self._write_solution(self.solution_move_snapshots)
+            self._record_path(self.solution_move_snapshots)
+            self.trace.close()
+
+    def get_solution(self) -> List[MoveSnapshot]:
+        return self.solution_move_snapshots
+
+    def _set_solution(self, move_snapshots: List[MoveSnapshot]):
+        self.solution_move_snapshots = move_snapshots
+
+    def cache_class(self) -> str:
+        # the limits of the game and the symmetry play no part
+        return self.name
+
+    def _alert_end(self):
+        """
+        Prints to console the resulting sequence
+        """
+        if len(self.solution_move_snapshots) != 0:
+            print("\n{}\n".format(FOUND_SOLUTION))
+            for solution_move_snapshot in self.solution_move_snapshots:
+                print(solution_move_snapshot)
+        else:
+            print("\n{}".format(NO_SOLUTION))
+        self._generate_output()
+
+    def execute(self, board: Board):
+        size = board.size
+        initial_state = BitBoard.from_board(board)
+
+        if size in DISTANCE_TABLE_SIZES:
+            solution_moves = DistanceTable.get(size).solution_moves(initial_state)
+            if solution_moves is not None:
+                self.solution_move_snapshots = SearchTree.replay_moves(solution_moves, initial_state, size)
+
+        self._alert_end()
+
+
+# strategies by name, to build them from a name in worker processes
+STRATEGIES = {
+    DFS: DepthFirstSearchStrategy,
+    BeFS: BestFirstSearchStrategy,
+    ASTAR: AStarSearchStrategy,
+    GF2: LinearAlgebraStrategy,
+    IDDFS: IterativeDeepeningSearchStrategy,
+    IDASTAR: IterativeDeepeningAStarStrategy,
+    BIDIRECTIONAL: BidirectionalSearchStrategy,
+    ORACLE: DistanceOracleStrategy,
+    CHASE: LightChasingStrategy,
+    HDASTAR: HashDistributedAStarStrategy,
+}
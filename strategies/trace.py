@@ -0,0 +1,427 @@
+"""
+Search files, streamed by the searches as they visit boards
+
+Usage, from the root of the project, to convert a binary search file to the text format:
+    python -m strategies.trace search_file.bin [search_file.txt]
+"""
+
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from constants.constants import TRACE_TEXT, TRACE_GZIP, TRACE_BINARY, TRACE_NONE, TRACE_FLUSH_RECORDS, \
+    TRACE_BUFFER_SIZE
+from models.game import BitBoard
+from models.search_tree import ROOT_MOVE
+from typing import Iterator, List, Optional, Tuple
+import gzip
+import mmap
+import os
+import shutil
+import struct
+import sys
+
+# parent of the records of the roots
+NO_PARENT = -1
+
+TRACE_MAGIC = b'IDPT'
+TRACE_VERSION = 1
+HEADER_FORMAT = '>4sHHH16s'  # magic, version, size, evaluated, strategy name
+# packed state on (size^2 + 7) // 8 bytes, then move index, g(n), h(n) and parent record
+RECORD_FORMAT = '>{}sBHHi'
+
+TraceRecord = namedtuple('TraceRecord', ['state', 'move_index', 'g', 'h', 'parent'])
+
+
+class TraceSink(ABC):
+    """
+    Receives the nodes visited by a search, in order, as they are visited
+    Every recorded node gets the next record id, starting from 0, which the searches pass as the
+    parent of the nodes uncovered from it. The number of recorded nodes is kept, searches compare
+    it to max_length.
+    """
+
+    def __init__(self):
+        self.n_records = 0
+
+    def __len__(self):
+        return self.n_records
+
+    @abstractmethod
+    def record(self, state: int, move_index: int = ROOT_MOVE, g: int = 0, h: int = 0,
+               parent: int = NO_PARENT) -> int:
+        """
+        Records a visited node
+        :param state: packed board state
+        :param move_index: index of the token touched to reach the node, ROOT_MOVE for a root
+        :param g: g(n)
+        :param h: h(n)
+        :param parent: record id of the node it was uncovered from, NO_PARENT for a root
+        :return: record id of the node
+        """
+        pass
+
+    def close(self):
+        """
+        Completes the trace once the search is over
+        """
+        pass
+
+    def discard(self):
+        """
+        Drops the trace of a search that did not end, e.g. cancelled or timed out
+        """
+        pass
+
+    def merge(self, part_path: str, n_records: int, parent: int = NO_PARENT):
+        """
+        Appends the records of a closed trace of the same mode, written by another process for a
+        part of the search, the part file is then removed
+        :param part_path: path of the part, the path of its sink
+        :param n_records: number of records of the part
+        :param parent: record id the roots of the part are linked to
+        :return:
+        """
+        self.n_records += n_records
+
+    def checkpoint(self) -> Tuple[Optional[str], int]:
+        """
+        Makes the records so far durable, for the search to be resumed from a checkpoint
+        :return: path and length in bytes of the file holding them, None and 0 if none is kept
+        """
+        return None, 0
+
+    def resume(self, tmp_path: Optional[str], length: int, n_records: int):
+        """
+        Continues the trace of a checkpointed search, after the records it held at the checkpoint
+        :param tmp_path: path returned by checkpoint
+        :param length: length returned by checkpoint, the records written since are dropped
+        :param n_records: number of records at the checkpoint
+        :return:
+        """
+        if tmp_path is not None:
+            raise ValueError('The checkpoint holds a search file, not kept in this mode')
+        self.n_records = n_records
+
+
+class NullTraceSink(TraceSink):
+    """
+    Only counts the visited nodes, for production runs that do not keep the search file
+    The search file of an earlier run, in any mode, is removed once the search is over, so that
+    it is not taken for the search file of the new solution file.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: path of the search file in the text format, None if there is none to remove
+        """
+        TraceSink.__init__(self)
+        self.path = path
+
+    def record(self, state: int, move_index: int = ROOT_MOVE, g: int = 0, h: int = 0,
+               parent: int = NO_PARENT) -> int:
+        self.n_records += 1
+        return self.n_records - 1
+
+    def close(self):
+        if self.path is None:
+            return
+        for stale_path in (self.path, self.path + '.gz', os.path.splitext(self.path)[0] + '.bin'):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+
+class FileTraceSink(TraceSink):
+    """
+    Streams a search file while the search runs
+    Records are rendered as nodes are recorded and written every flush_records nodes through a
+    large file buffer, so the memory taken by the trace does not grow with the search. They go to
+    a temporary file that is renamed over the search file once closed, so concurrent workers never
+    leave a partial file behind. Once checkpointed, the temporary file is kept when the trace is
+    discarded, for the search to be resumed.
+    """
+
+    # joins the rendered records of a flush
+    empty_chunk = ''
+
+    def __init__(self, path: str, flush_records: int = TRACE_FLUSH_RECORDS):
+        TraceSink.__init__(self)
+        self.path = path
+        self.flush_records = flush_records
+        self.chunks = []  # type: List
+        self.out_f = None
+        self.tmp_path = None
+        self.checkpointed = False
+
+    @abstractmethod
+    def _open(self, tmp_path: str, append: bool = False):
+        """
+        Opens the temporary file, and writes the header of the format if any
+        :param tmp_path:
+        :param append: append records to a checkpointed file, which has its header
+        :return: the opened file
+        """
+        pass
+
+    def _flush(self):
+        if self.out_f is None:
+            # opened on first write, in the process running the search
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+            self.out_f = self._open(self.tmp_path)
+
+        self.out_f.write(self.empty_chunk.join(self.chunks))
+        self.chunks.clear()
+
+    @abstractmethod
+    def _copy_part(self, part_path: str, parent: int):
+        """
+        Writes the records of a closed part, once the pending records were flushed
+        """
+        pass
+
+    def merge(self, part_path: str, n_records: int, parent: int = NO_PARENT):
+        self._flush()
+        self._copy_part(part_path, parent)
+        self.n_records += n_records
+        os.remove(part_path)
+
+    def checkpoint(self) -> Tuple[Optional[str], int]:
+        self._flush()
+        # closed so that the file ends with a complete record, or a complete gzip member
+        self.out_f.close()
+        with open(self.tmp_path, 'rb') as trace_f:
+            os.fsync(trace_f.fileno())
+        length = os.path.getsize(self.tmp_path)
+        self.out_f = self._open(self.tmp_path, True)
+        self.checkpointed = True
+        return self.tmp_path, length
+
+    def resume(self, tmp_path: Optional[str], length: int, n_records: int):
+        if tmp_path is None or os.path.basename(tmp_path).rsplit('.', 2)[0] != os.path.basename(self.path):
+            raise ValueError('The checkpoint holds no search file of this mode')
+        # next to the search file, wherever the project was when checkpointed
+        tmp_path = os.path.join(os.path.dirname(self.path), os.path.basename(tmp_path))
+        if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) < length:
+            raise ValueError('The search file {} of the checkpoint is missing or truncated'.format(tmp_path))
+
+        # the file is taken over by the process resuming the search
+        self.tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        if tmp_path != self.tmp_path:
+            os.replace(tmp_path, self.tmp_path)
+        os.truncate(self.tmp_path, length)
+        self.out_f = self._open(self.tmp_path, True)
+        self.checkpointed = True
+        self.n_records = n_records
+
+    def close(self):
+        self._flush()
+        self.out_f.close()
+        os.replace(self.tmp_path, self.path)
+        self.out_f = None
+
+    def discard(self):
+        self.chunks.clear()
+        if self.out_f is not None:
+            self.out_f.close()
+            self.out_f = None
+            # the search may have been interrupted while the file was renamed
+            if not self.checkpointed and os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+class TextTraceSink(FileTraceSink):
+    """
+    Search file as text, optionally gzip-compressed
+    Evaluated lines hold f(n), g(n), h(n), the touched token and the spaced board, the others
+    '0 0 0' and the board, as in the search files of the heuristic and the uninformed searches.
+    Parents are not kept.
+    """
+
+    def __init__(self, path: str, size: int, evaluated: bool, compress: bool = False,
+                 flush_records: int = TRACE_FLUSH_RECORDS):
+        FileTraceSink.__init__(self, path + '.gz' if compress else path, flush_records)
+        self.size = size
+        self.evaluated = evaluated
+        self.compress = compress
+        self.identifiers = BitBoard.get_identifiers(size)
+        self.stream_format = '0{}b'.format(size * size)
+
+    def _open(self, tmp_path: str, append: bool = False):
+        if self.compress:
+            # records appended after a checkpoint go to a new gzip member
+            return gzip.open(tmp_path, 'at' if append else 'wt', compresslevel=6)
+        return open(tmp_path, 'a' if append else 'w', buffering=TRACE_BUFFER_SIZE)
+
+    def _copy_part(self, part_path: str, parent: int):
+        # lines do not refer to their parent
+        with gzip.open(part_path, 'rt') if self.compress else open(part_path, 'r') as part_f:
+            shutil.copyfileobj(part_f, self.out_f, TRACE_BUFFER_SIZE)
+
+    def record(self, state: int, move_index: int = ROOT_MOVE, g: int = 0, h: int = 0,
+               parent: int = NO_PARENT) -> int:
+        self.n_records += 1
+        stream = format(state, self.stream_format)
+        if self.evaluated:
+            self.chunks.append('{}\t{}\t{}\t{}\t{}\n'.format(
+                g + h, g, h, '0 ' if move_index == ROOT_MOVE else self.identifiers[move_index], ' '.join(stream)))
+        else:
+            self.chunks.append('0\t0\t0\t{}\n'.format(stream))
+
+        if len(self.chunks) >= self.flush_records:
+            self._flush()
+        return self.n_records - 1
+
+
+class BinaryTraceSink(FileTraceSink):
+    """
+    Search file as fixed-width records, a few bytes per node instead of the size^2 characters of
+    a line of the text format, read back without parsing by a TraceReader
+    Layout: header, then one record per node in the order they were visited, see RECORD_FORMAT.
+    Record ids are the positions of the records, so the parents link every node to the root.
+    """
+
+    empty_chunk = b''
+
+    def __init__(self, path: str, size: int, evaluated: bool, strategy_name: str,
+                 flush_records: int = TRACE_FLUSH_RECORDS):
+        FileTraceSink.__init__(self, path, flush_records)
+        self.size = size
+        self.evaluated = evaluated
+        self.strategy_name = strategy_name
+        self.state_bytes = (size * size + 7) // 8
+        self.record_struct = struct.Struct(RECORD_FORMAT.format(self.state_bytes))
+
+    def _open(self, tmp_path: str, append: bool = False):
+        if append:
+            return open(tmp_path, 'ab', buffering=TRACE_BUFFER_SIZE)
+        trace_f = open(tmp_path, 'wb', buffering=TRACE_BUFFER_SIZE)
+        trace_f.write(struct.pack(HEADER_FORMAT, TRACE_MAGIC, TRACE_VERSION, self.size, self.evaluated,
+                                  self.strategy_name.encode()))
+        return trace_f
+
+    def _copy_part(self, part_path: str, parent: int):
+        # record ids of the part start after the records already written
+        offset = self.n_records
+        with TraceReader(part_path) as part_reader:
+            for state_bytes, move_index, g, h, part_parent in self.record_struct.iter_unpack(part_reader.records):
+                self.chunks.append(self.record_struct.pack(
+                    state_bytes, move_index, g, h, parent if part_parent == NO_PARENT else part_parent + offset))
+                if len(self.chunks) >= self.flush_records:
+                    self._flush()
+        self._flush()
+
+    def record(self, state: int, move_index: int = ROOT_MOVE, g: int = 0, h: int = 0,
+               parent: int = NO_PARENT) -> int:
+        self.n_records += 1
+        self.chunks.append(self.record_struct.pack(state.to_bytes(self.state_bytes, 'big'), move_index, g, h, parent))
+
+        if len(self.chunks) >= self.flush_records:
+            self._flush()
+        return self.n_records - 1
+
+
+class TraceReader:
+    """
+    Memory-mapped binary search file
+    Records are unpacked on access, by id or in order, the file is never loaded as a whole.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(self.path, 'rb') as trace_f:
+            try:
+                self.mapped = mmap.mmap(trace_f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError('Empty search file {}'.format(self.path))
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(self.mapped) < header_size:
+            raise ValueError('Not a binary search file {}'.format(self.path))
+
+        magic, version, self.size, evaluated, strategy_name = struct.unpack_from(HEADER_FORMAT, self.mapped, 0)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError('Not a binary search file {}'.format(self.path))
+        self.evaluated = evaluated != 0
+        self.strategy_name = strategy_name.rstrip(b'\0').decode()
+
+        self.record_struct = struct.Struct(RECORD_FORMAT.format((self.size * self.size + 7) // 8))
+        self.records = memoryview(self.mapped)[header_size:]
+        if len(self.records) % self.record_struct.size != 0:
+            raise ValueError('Truncated search file {}'.format(self.path))
+
+    def __len__(self):
+        return len(self.records) // self.record_struct.size
+
+    def __getitem__(self, record_id: int) -> TraceRecord:
+        if not 0 <= record_id < len(self):
+            raise IndexError(record_id)
+        state_bytes, move_index, g, h, parent = self.record_struct.unpack_from(
+            self.records, record_id * self.record_struct.size)
+        return TraceRecord(int.from_bytes(state_bytes, 'big'), move_index, g, h, parent)
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        for state_bytes, move_index, g, h, parent in self.record_struct.iter_unpack(self.records):
+            yield TraceRecord(int.from_bytes(state_bytes, 'big'), move_index, g, h, parent)
+
+    def get_path(self, record_id: int) -> List[TraceRecord]:
+        """
+        Records from the root to the given one, following the parents
+        :param record_id:
+        :return:
+        """
+        path = []
+        while record_id != NO_PARENT:
+            path.append(self[record_id])
+            record_id = path[-1].parent
+        path.reverse()
+        return path
+
+    def close(self):
+        self.records.release()
+        self.mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def convert_to_text(path: str, text_path: str = None) -> str:
+    """
+    Writes a binary search file in the text format, as the searches write it
+    :param path: binary search file
+    :param text_path: defaults to path, with a .txt extension
+    :return: path of the text search file
+    """
+    if text_path is None:
+        text_path = os.path.splitext(path)[0] + '.txt'
+
+    with TraceReader(path) as trace_reader:
+        text_trace = TextTraceSink(os.path.abspath(text_path), trace_reader.size, trace_reader.evaluated)
+        for trace_record in trace_reader:
+            text_trace.record(*trace_record)
+        text_trace.close()
+    return text_trace.path
+
+
+def open_trace(mode: str, path: str, size: int, evaluated: bool, strategy_name: str) -> TraceSink:
+    """
+    :param mode: TRACE_TEXT, TRACE_GZIP, TRACE_BINARY or TRACE_NONE
+    :param path: path of the search file in the text format, a binary one takes the .bin extension
+    :param size:
+    :param evaluated: whether lines hold f(n), g(n), h(n) and the touched token
+    :param strategy_name:
+    :return:
+    """
+    if mode == TRACE_NONE:
+        return NullTraceSink(path)
+    elif mode in (TRACE_TEXT, TRACE_GZIP):
+        return TextTraceSink(path, size, evaluated, mode == TRACE_GZIP)
+    elif mode == TRACE_BINARY:
+        return BinaryTraceSink(os.path.splitext(path)[0] + '.bin', size, evaluated, strategy_name)
+
+    raise ValueError('Unknown trace mode {}'.format(mode))
+
+
+if __name__ == '__main__':
+    print(convert_to_text(*sys.argv[1:3]))
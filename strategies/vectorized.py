@@ -0,0 +1,119 @@
+from constants.constants import CHECKERED
+from models.game import BitBoard
+from strategies.heuristics import Heuristic
+from typing import Callable, List, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only the vectorized expansion needs it
+    np = None
+
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+
+
+class VectorizedExpander:
+    """
+    NumPy-backed expansion engine
+    Expands a batch of frontier states in one pass: every toggle mask is XORed with every state,
+    children already in the closed set are filtered out and the heuristic is computed for the
+    whole batch. Packed states are split in 64-bit words, least significant word first, so
+    boards up to 8x8 take a single word and 9x9/10x10 take two.
+    """
+
+    def __init__(self, size: int, heuristic: Heuristic = None):
+        if np is None:
+            raise ImportError('NumPy is required for the vectorized expansion')
+
+        self.size = size
+        self.n_cells = size * size
+        self.n_words = (self.n_cells + WORD_BITS - 1) // WORD_BITS
+        self.heuristic = heuristic
+        self.toggle_masks = self.to_words(BitBoard.get_toggle_masks(size))
+        self.move_indices = np.arange(self.n_cells)
+        self.popcount_table = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+        if heuristic is not None and heuristic.name == CHECKERED:
+            first_bit = self.n_cells - 1
+            self.first_word, self.first_shift = divmod(first_bit, WORD_BITS)
+            self.first_checker = self.to_words([heuristic.first_checker])[0]
+            self.second_checker = self.to_words([heuristic.first_checker ^ heuristic.full_mask])[0]
+
+    def to_words(self, states: List[int]):
+        """
+        :param states: packed states
+        :return: array of shape (len(states), n_words)
+        """
+        return np.array([[(state >> (WORD_BITS * word)) & WORD_MASK for word in range(self.n_words)]
+                         for state in states], dtype=np.uint64).reshape(len(states), self.n_words)
+
+    def from_words(self, words) -> List[int]:
+        """
+        :param words: array of shape (n, n_words)
+        :return: packed states
+        """
+        if self.n_words == 1:
+            return words[:, 0].tolist()
+
+        states = []
+        for row in words.tolist():
+            state = 0
+            for word in reversed(row):
+                state = (state << WORD_BITS) | word
+            states.append(state)
+        return states
+
+    def popcount(self, words):
+        """
+        :param words: array of shape (n, n_words)
+        :return: number of set bits of every row
+        """
+        as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(len(words), -1)
+        return self.popcount_table[as_bytes].sum(axis=1, dtype=np.int64)
+
+    def evaluate(self, words, states: List[int]):
+        """
+        Heuristic value of every state, vectorized for the checkered heuristic
+        :param words: array of shape (n, n_words)
+        :param states: the same states, packed
+        :return:
+        """
+        if self.heuristic.name != CHECKERED:
+            return np.array([self.heuristic.evaluate(state) for state in states], dtype=np.int64)
+
+        first_token_set = ((words[:, self.first_word] >> np.uint64(self.first_shift)) & np.uint64(1)) == 1
+        expected = np.where(first_token_set[:, None], self.first_checker, self.second_checker)
+        inconsistencies = self.popcount(words ^ expected)
+        # if board is perfect set to max priority
+        return np.where((words == 0).all(axis=1), 0, inconsistencies)
+
+    def expand(self, states: List[int], closed_list_set: Set[int],
+               key: Callable[[int], int] = None) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Uncovers the children of every state of the batch that are not in the closed set
+        :param states: packed states of the batch
+        :param closed_list_set:
+        :param key: key of a state in the closed set, the state itself by default
+        :return: position of the parent in the batch, touched token, packed state and h(n) of every
+        child (h(n) is 0 without heuristic), in the order of the batch then of the tokens
+        """
+        parents = self.to_words(states)
+        children = (parents[:, None, :] ^ self.toggle_masks[None, :, :]).reshape(-1, self.n_words)
+        child_states = self.from_words(children)
+
+        if key is not None:
+            keep = np.fromiter((key(child_state) not in closed_list_set for child_state in child_states),
+                               dtype=bool, count=len(child_states))
+        else:
+            keep = np.fromiter((child_state not in closed_list_set for child_state in child_states),
+                               dtype=bool, count=len(child_states))
+        parent_positions = np.repeat(np.arange(len(states)), self.n_cells)[keep]
+        move_indices = np.tile(self.move_indices, len(states))[keep]
+        kept_states = [child_state for child_state, kept in zip(child_states, keep.tolist()) if kept]
+
+        if self.heuristic is None or len(kept_states) == 0:
+            h_values = [0] * len(kept_states)
+        else:
+            h_values = self.evaluate(children[keep], kept_states).tolist()
+
+        return parent_positions.tolist(), move_indices.tolist(), kept_states, h_values
@@ -0,0 +1,52 @@
+from constants.constants import ASTAR, BeFS, EXACT_DISTANCE, HDASTAR, IDASTAR, PERFECT_CODE, TRACE_NONE, \
+    REL_PATH_TO_SOLUTION
+from models.game import BitBoard, Game
+from strategies.heuristics import PerfectCodeHeuristic, build_heuristic
+from strategies.strategies import STRATEGIES
+from contextlib import redirect_stdout
+import io
+import os
+import unittest
+
+GAME_ID = 'test_heuristics'
+
+
+class ExactDistanceFallbackTest(unittest.TestCase):
+    """
+    The exact distances are only tabulated for the sizes of DISTANCE_TABLE_SIZES
+    """
+
+    def setUp(self):
+        toggle_masks = BitBoard.get_toggle_masks(6)
+        # two touches away from the solved board
+        state = toggle_masks[7] ^ toggle_masks[20]
+        self.game = Game(6, 8, 20000, format(state, '036b'), GAME_ID)
+        self.strategies = []
+
+    def tearDown(self):
+        for strategy in self.strategies:
+            solution_path = strategy._output_path(REL_PATH_TO_SOLUTION)
+            if os.path.exists(solution_path):
+                os.remove(solution_path)
+
+    def test_build_heuristic_falls_back_on_perfect_code(self):
+        heuristic = build_heuristic(EXACT_DISTANCE, 6)
+        self.assertIsInstance(heuristic, PerfectCodeHeuristic)
+        self.assertTrue(heuristic.admissible)
+
+    def test_strategies_solve_without_distance_table(self):
+        for strategy_name in (ASTAR, BeFS, IDASTAR, HDASTAR):
+            options = {'heuristic': EXACT_DISTANCE, 'trace': TRACE_NONE}
+            if strategy_name == HDASTAR:
+                options['workers'] = 2
+            strategy = STRATEGIES[strategy_name](self.game, **options)
+            self.strategies.append(strategy)
+            self.assertEqual(strategy.heuristic.name, PERFECT_CODE)
+
+            with redirect_stdout(io.StringIO()):
+                strategy.execute(self.game.get_game_board())
+            self.assertEqual(len(strategy.get_solution()), 3, strategy_name)
+
+
+if __name__ == '__main__':
+    unittest.main()